@@ -0,0 +1,199 @@
+from collections import defaultdict
+import config
+from sketches import HyperLogLog, HeavyHitters
+
+# Поля состояния разработчика, объединяемые суммированием
+SUMMED_FIELDS = [
+    'total_commits', 'substantial_commits', 'lines_added', 'lines_removed',
+    'commit_impact', 'code_churn', 'net_contribution', 'reverts_count', 'merge_count',
+]
+
+# Поля-счетчики (словари), объединяемые поэлементным суммированием
+COUNTER_FIELDS = [
+    'file_categories', 'commit_distribution', 'time_of_day_distribution',
+    'most_modified_files', 'commit_sizes',
+]
+
+# Поля-множества; хранятся как dict с ключами в порядке первого появления,
+# чтобы порядок элементов после объединения совпадал с однопроходным анализом
+ORDERED_SET_FIELDS = ['files_modified', 'file_types_modified']
+
+# Поля-списки, объединяемые конкатенацией в порядке истории
+LIST_FIELDS = ['commit_subjects', 'commits', 'commit_timestamps']
+
+# Поле приближенного режима: расширение -> HyperLogLog различных файлов с этим расширением
+FILE_TYPE_SKETCHES_FIELD = 'file_type_files'
+
+def new_distinct_sketch():
+    """Создает HyperLogLog с точностью из настроек приближенного режима."""
+    return HyperLogLog(getattr(config, 'APPROXIMATE_DISTINCT_ERROR', 0.01))
+
+def new_developer_stats():
+    """
+    Создает пустое состояние статистики разработчика.
+    
+    В приближенном режиме (APPROXIMATE_FILE_STATS) множество измененных файлов
+    заменяется на HyperLogLog, а счетчик файлов - на HeavyHitters, поэтому
+    память на разработчика ограничена независимо от количества путей.
+    """
+    stats = {
+        'name': '',
+        'email': '',
+        'first_commit_date': None,  # Строки дат формируются при завершении анализа
+        'last_commit_date': None,
+        'first_commit_timestamp': None,
+        'last_commit_timestamp': None,
+        'active_days': 0,
+        'total_commits': 0,
+        'substantial_commits': 0,
+        'lines_added': 0,
+        'lines_removed': 0,
+        'files_modified': {},
+        'file_types_modified': {},
+        'file_categories': defaultdict(int),
+        'commit_impact': 0,
+        'commit_distribution': defaultdict(int),  # Распределение по месяцам/годам
+        'time_of_day_distribution': defaultdict(int),  # Распределение по времени суток
+        'code_churn': 0,  # Добавленные + удаленные строки
+        'net_contribution': 0,  # Добавленные - удаленные строки
+        'commit_subjects': [],
+        'average_commit_size': 0,
+        'reverts_count': 0,
+        'merge_count': 0,  # Количество merge-коммитов
+        'most_modified_files': defaultdict(int),
+        'squash_count': 0,  # Примерное количество squash-коммитов
+        'commits': [],  # Сохраняем ID коммитов для дополнительного анализа
+        'commit_timestamps': [],  # Время коммитов для расширенных метрик
+        'commit_sizes': defaultdict(int),  # Количество коммитов по размеру (small/medium/large)
+    }
+    if getattr(config, 'APPROXIMATE_FILE_STATS', False):
+        stats['files_modified'] = new_distinct_sketch()
+        stats['most_modified_files'] = HeavyHitters(getattr(config, 'APPROXIMATE_TOP_FILES_ERROR', 0.001))
+        stats[FILE_TYPE_SKETCHES_FIELD] = {}
+    return stats
+
+class DeveloperStatsMap(dict):
+    """Словарь состояний разработчиков, создающий состояние при первом обращении."""
+
+    def __missing__(self, dev_id):
+        stats = self[dev_id] = new_developer_stats()
+        return stats
+
+class AnalysisState:
+    """
+    Промежуточное состояние анализа, которое можно объединять.
+
+    В отличие от результата analyze(), состояние не теряет данных: темы коммитов
+    не обрезаются, счетчики файлов хранятся полностью, множества не
+    преобразуются в списки. Поэтому историю можно анализировать частями
+    (по диапазонам коммитов или временным окнам, в том числе в разных процессах)
+    и объединять состояния через merge(). Пустое состояние - нейтральный элемент.
+
+    Порядок элементов (темы коммитов, порядок разработчиков) совпадает
+    с однопроходным анализом, если части объединяются в порядке истории:
+    a.merge(b), где a предшествует b в выводе git log.
+    """
+
+    def __init__(self, developer_stats=None, developer_info=None):
+        self.developer_stats = DeveloperStatsMap(developer_stats or {})
+        self.developer_info = dict(developer_info or {})
+        # Агрегаты колоночного анализа (CommitTable) для этого состояния;
+        # после объединения недействительны и вычисляются заново при завершении
+        self.columnar_metrics = None
+
+    def __len__(self):
+        return len(self.developer_stats)
+
+    def merge(self, other):
+        """
+        Объединяет два состояния.
+
+        Args:
+            other: состояние, следующее за текущим в порядке истории
+
+        Returns:
+            AnalysisState: новое состояние (исходные не изменяются)
+        """
+        merged = AnalysisState()
+        for state in (self, other):
+            for dev_id, stats in state.developer_stats.items():
+                if dev_id in merged.developer_stats:
+                    _merge_developer_stats(merged.developer_stats[dev_id], stats)
+                else:
+                    merged.developer_stats[dev_id] = _copy_developer_stats(stats)
+            for email, info in state.developer_info.items():
+                _merge_developer_info(merged.developer_info, email, info)
+        return merged
+
+    @classmethod
+    def merge_all(cls, states):
+        """Объединяет последовательность состояний в порядке истории."""
+        merged = cls()
+        for state in states:
+            merged = merged.merge(state)
+        return merged
+
+def _copy_developer_stats(stats):
+    """Копирует состояние разработчика так, чтобы изменяемые поля не были общими."""
+    copied = dict(stats)
+    for field in COUNTER_FIELDS:
+        value = stats[field]
+        copied[field] = value.copy() if isinstance(value, HeavyHitters) else defaultdict(int, value)
+    for field in ORDERED_SET_FIELDS:
+        value = stats[field]
+        copied[field] = value.copy() if isinstance(value, HyperLogLog) else dict(value)
+    for field in LIST_FIELDS:
+        copied[field] = list(stats[field])
+    if FILE_TYPE_SKETCHES_FIELD in stats:
+        copied[FILE_TYPE_SKETCHES_FIELD] = {
+            ext: sketch.copy() for ext, sketch in stats[FILE_TYPE_SKETCHES_FIELD].items()
+        }
+    return copied
+
+def _merge_developer_stats(target, source):
+    """Добавляет состояние source (более позднее в порядке истории) к target."""
+    if source['name']:
+        target['name'] = source['name']
+        target['email'] = source['email']
+
+    for field in ('first_commit_timestamp', 'last_commit_timestamp'):
+        value = source[field]
+        if value is None:
+            continue
+        current = target[field]
+        if current is None:
+            target[field] = value
+        elif field == 'first_commit_timestamp':
+            target[field] = min(current, value)
+        else:
+            target[field] = max(current, value)
+
+    for field in SUMMED_FIELDS:
+        target[field] += source[field]
+    for field in COUNTER_FIELDS:
+        counter = target[field]
+        if isinstance(counter, HeavyHitters):
+            counter.merge(source[field])
+            continue
+        for key, count in source[field].items():
+            counter[key] += count
+    for field in ORDERED_SET_FIELDS:
+        target[field].update(source[field])
+    for field in LIST_FIELDS:
+        target[field].extend(source[field])
+    if FILE_TYPE_SKETCHES_FIELD in source:
+        target_sketches = target[FILE_TYPE_SKETCHES_FIELD]
+        for ext, sketch in source[FILE_TYPE_SKETCHES_FIELD].items():
+            if ext in target_sketches:
+                target_sketches[ext].update(sketch)
+            else:
+                target_sketches[ext] = sketch.copy()
+
+def _merge_developer_info(developer_info, email, info):
+    """Объединяет сведения о разработчике (имя первого коммита, границы активности)."""
+    current = developer_info.get(email)
+    if current is None:
+        developer_info[email] = info.copy()
+        return
+    current['first_commit_timestamp'] = min(current['first_commit_timestamp'], info['first_commit_timestamp'])
+    current['last_commit_timestamp'] = max(current['last_commit_timestamp'], info['last_commit_timestamp'])
@@ -1,65 +1,175 @@
-from collections import defaultdict
-from datetime import datetime
-import os
 import re
 import config
+from utils import update_developer_info, local_seconds, local_time_keys, format_month_key, format_timestamp
+from profiling import profiler
+from commit_table import CommitTable, commit_size
+from analysis_state import AnalysisState, FILE_TYPE_SKETCHES_FIELD, new_distinct_sketch
+from sketches import HyperLogLog
+from interning import developer_id
+from path_classifier import classify_path, extension_category
+from commit_classifier import default_classifier
 
 class DevActivityAnalyzer:
-    def __init__(self, git_data):
+    def __init__(self, git_data=None):
+        # Без данных анализатор используется для потоковой обработки (analyze_stream)
+        if git_data is None:
+            git_data = {'commits': [], 'commit_details': {}, 'file_changes': {}, 'developer_info': {}}
         self.git_data = git_data
         self.commits = git_data['commits']
         self.commit_details = git_data['commit_details']
         self.file_changes = git_data['file_changes']
         self.developer_info = git_data['developer_info']
+        self._commit_index = None
+        self._columnar_metrics = None
         
     def analyze(self):
         """Анализ данных из Git и возврат статистики по разработчикам."""
         print("Анализируем активность разработчиков...")
+        return self.finalize(self.build_state())
+    
+    def analyze_stream(self, records):
+        """
+        Потоковый анализ: каждая запись коммита сразу учитывается в статистике
+        разработчика и после этого не хранится.
+        
+        Args:
+            records: итерируемый источник кортежей (commit, commit_detail, file_changes),
+                     например GitDataCollector.iter_records()
+            
+        Returns:
+            dict: статистика по разработчикам в том же формате, что и analyze()
+        """
+        print("Потоковый анализ активности разработчиков...")
+        return self.finalize(self.build_stream_state(records))
+    
+    def build_state(self):
+        """
+        Анализирует собранные данные без завершения статистики.
+        
+        Returns:
+            AnalysisState: объединяемое состояние анализа (см. finalize)
+        """
+        state = AnalysisState(developer_info=self.developer_info)
+        
+        if getattr(config, 'COLUMNAR_ANALYSIS', False):
+            self._analyze_columnar(state)
+        else:
+            # Анализируем каждый коммит
+            for commit in self.commits:
+                self._analyze_commit(commit, state.developer_stats)
+        
+        return state
+    
+    def build_stream_state(self, records):
+        """
+        Потоковый вариант build_state: записи коммитов учитываются по одной
+        и не сохраняются.
+        
+        Args:
+            records: итерируемый источник кортежей (commit, commit_detail, file_changes)
+            
+        Returns:
+            AnalysisState: объединяемое состояние анализа
+        """
+        state = AnalysisState()
+        for commit, commit_detail, commit_files in records:
+            self._fold_commit(commit, commit_detail or {}, commit_files or [], state.developer_stats)
+            update_developer_info(state.developer_info, commit)
+        return state
+    
+    def finalize(self, state):
+        """
+        Завершает анализ: рассчитывает производные метрики по состоянию.
+        
+        Состояние не изменяется, поэтому его можно продолжать объединять
+        с состояниями новых коммитов.
+        
+        Args:
+            state: AnalysisState (результат build_state, build_stream_state или merge)
+            
+        Returns:
+            dict: статистика по разработчикам
+        """
+        self.developer_info = state.developer_info
+        self._columnar_metrics = state.columnar_metrics
+        with profiler.stage('finalize_stats'):
+            return self._finalize_stats(state.developer_stats)
+    
+    def _analyze_columnar(self, state):
+        """
+        Анализ через колоночную таблицу коммитов (CommitTable).
+        
+        Изменения файлов и темы коммитов учитываются при проходе по коммитам,
+        а счетчики, распределения по месяцам и времени суток, размеры коммитов,
+        интервалы и дневная вариативность вычисляются групповыми операциями
+        над таблицей.
+        """
+        developer_stats = state.developer_stats
+        table = CommitTable()
+        with profiler.stage('build_commit_table'):
+            for commit in self.commits:
+                commit_hash = commit['hash']
+                dev_id = developer_id(commit['author_email'])
+                dev_stats = developer_stats[dev_id]
+                
+                dev_stats['name'] = commit['author_name']
+                dev_stats['email'] = commit['author_email']
+                dev_stats['commits'].append(commit_hash)
+                dev_stats['commit_subjects'].append(commit['subject'])
+                dev_stats['commit_timestamps'].append(commit['timestamp'])
+                
+                substantial_change = self._fold_file_changes(dev_stats, self.file_changes.get(commit_hash, []))
+                stats = self.commit_details.get(commit_hash, {}).get('stats', {})
+                table.append(dev_id, commit['timestamp'], stats, commit['is_revert'],
+                             commit.get('is_merge', False), substantial_change)
+        
+        with profiler.stage('columnar_aggregation'):
+            aggregates = table.aggregate()
         
-        # Инициализируем структуры данных
-        developer_stats = defaultdict(lambda: {
-            'name': '',
-            'email': '',
-            'first_commit_date': None,
-            'last_commit_date': None,
-            'active_days': 0,
-            'total_commits': 0,
-            'substantial_commits': 0,
-            'lines_added': 0,
-            'lines_removed': 0,
-            'files_modified': set(),
-            'file_types_modified': set(),
-            'file_categories': defaultdict(int),
-            'commit_impact': 0,
-            'commit_distribution': defaultdict(int),  # Распределение по месяцам/годам
-            'time_of_day_distribution': defaultdict(int),  # Распределение по времени суток
-            'code_churn': 0,  # Добавленные + удаленные строки
-            'net_contribution': 0,  # Добавленные - удаленные строки
-            'commit_subjects': [],
-            'average_commit_size': 0,
-            'reverts_count': 0,
-            'merge_count': 0,  # Количество merge-коммитов
-            'most_modified_files': defaultdict(int),
-            'squash_count': 0,  # Примерное количество squash-коммитов
-            'commits': []  # Сохраняем ID коммитов для дополнительного анализа
-        })
-        
-        # Анализируем каждый коммит
-        for commit in self.commits:
-            self._analyze_commit(commit, developer_stats)
+        state.columnar_metrics = {}
+        for dev_id, aggregate in aggregates.items():
+            dev_stats = developer_stats[dev_id]
+            for key in ('total_commits', 'reverts_count', 'merge_count', 'substantial_commits',
+                        'lines_added', 'lines_removed', 'commit_impact'):
+                dev_stats[key] = aggregate[key]
+            dev_stats['code_churn'] = aggregate['lines_added'] + aggregate['lines_removed']
+            dev_stats['net_contribution'] = aggregate['lines_added'] - aggregate['lines_removed']
+            dev_stats['first_commit_timestamp'] = aggregate['first_timestamp']
+            dev_stats['last_commit_timestamp'] = aggregate['last_timestamp']
+            dev_stats['commit_distribution'].update(aggregate['commit_distribution'])
+            dev_stats['time_of_day_distribution'].update(aggregate['time_of_day_distribution'])
+            dev_stats['commit_sizes'].update(aggregate['commit_sizes'])
+            state.columnar_metrics[dev_id] = aggregate
+    
+    def _finalize_stats(self, developer_stats):
+        """
+        Рассчитывает производные метрики и завершает статистику разработчиков.
+        
+        Исходные состояния разработчиков не изменяются: изменяемые поля
+        заменяются в копии новыми объектами.
+        """
+        results = {}
+        for dev_id, state_stats in developer_stats.items():
+            stats = dict(state_stats)
+            results[dev_id] = stats
             
-        # Рассчитываем производные метрики и завершаем статистику
-        for dev_id, stats in developer_stats.items():
             # Используем информацию о разработчике
             dev_info = self.developer_info.get(dev_id, {})
             
             # Устанавливаем даты первого и последнего коммита
+            first_timestamp = stats.pop('first_commit_timestamp')
+            last_timestamp = stats.pop('last_commit_timestamp')
             if dev_info:
-                stats['first_commit_date'] = dev_info.get('first_commit_date', stats['first_commit_date'])
-                stats['last_commit_date'] = dev_info.get('last_commit_date', stats['last_commit_date'])
+                first_timestamp = dev_info.get('first_commit_timestamp', first_timestamp)
+                last_timestamp = dev_info.get('last_commit_timestamp', last_timestamp)
+            if first_timestamp is not None and last_timestamp is not None:
+                stats['first_commit_date'] = format_timestamp(first_timestamp)
+                stats['last_commit_date'] = format_timestamp(last_timestamp)
             
-            # Преобразуем множества файлов в списки для JSON-сериализации
-            stats['files_modified'] = list(stats['files_modified'])
+            # Преобразуем множества файлов (упорядоченные dict) в списки для JSON-сериализации;
+            # в приближенном режиме остается HyperLogLog (количество файлов - len())
+            if not isinstance(stats['files_modified'], HyperLogLog):
+                stats['files_modified'] = list(stats['files_modified'])
             stats['file_types_modified'] = list(stats['file_types_modified'])
             
             # Наиболее часто изменяемые файлы (топ-10)
@@ -75,12 +185,9 @@ class DevActivityAnalyzer:
                 
             # Рассчитываем нормализованные метрики на основе активного периода
             if stats['first_commit_date'] and stats['last_commit_date']:
-                # Получаем объекты даты
-                first_date = datetime.strptime(stats['first_commit_date'], '%Y-%m-%d %H:%M:%S')
-                last_date = datetime.strptime(stats['last_commit_date'], '%Y-%m-%d %H:%M:%S')
-                
-                # Рассчитываем активный период в днях
-                active_days = (last_date - first_date).days + 1  # +1, чтобы избежать деления на ноль для коммитов в один день
+                # Рассчитываем активный период в днях (по местному времени)
+                period_seconds = local_seconds(last_timestamp) - local_seconds(first_timestamp)
+                active_days = period_seconds // 86400 + 1  # +1, чтобы избежать деления на ноль для коммитов в один день
                 stats['active_days'] = active_days
                 
                 if active_days > 0:
@@ -90,15 +197,20 @@ class DevActivityAnalyzer:
                     stats['commits_per_day'] = stats['total_commits']
                     stats['lines_per_day'] = stats['lines_added'] + stats['lines_removed']
             
-            # Преобразуем defaultdict в обычный dict для JSON-сериализации
-            stats['commit_distribution'] = dict(stats['commit_distribution'])
+            # Преобразуем defaultdict в обычный dict для JSON-сериализации,
+            # ключи месяцев форматируются в строки 'YYYY-MM'
+            stats['commit_distribution'] = {
+                format_month_key(month): count for month, count in stats['commit_distribution'].items()
+            }
+            stats['commit_sizes'] = dict(stats['commit_sizes'])
             stats['time_of_day_distribution'] = dict(stats['time_of_day_distribution'])
             stats['file_categories'] = dict(stats['file_categories'])
             
             # Обнаруживаем потенциальные squash-коммиты
             # (простая эвристика: коммиты с большим количеством файлов и изменений)
-            potential_squashes = sum(1 for subject in stats['commit_subjects'] 
-                                    if ('merge' in subject.lower() or 'squash' in subject.lower()))
+            classify = default_classifier().classify
+            potential_squashes = sum(1 for subject in stats['commit_subjects']
+                                     if classify(subject).has_any(('merge', 'squash')))
             stats['squash_count'] = potential_squashes
             
             # Ограничиваем количество сохраняемых тем коммитов (чтобы не перегружать JSON)
@@ -107,13 +219,36 @@ class DevActivityAnalyzer:
             
             # Рассчитываем расширенные метрики, если эта опция включена
             if hasattr(config, 'ADVANCED_CHANGE_ANALYSIS') and config.ADVANCED_CHANGE_ANALYSIS:
-                stats['advanced_metrics'] = self.get_advanced_metrics(stats)
+                with profiler.timer('advanced_metrics'):
+                    stats['advanced_metrics'] = self.get_advanced_metrics(stats)
+            
+            # Данные для расширенных метрик не входят в результат
+            del stats['commit_timestamps']
+            del stats['commit_sizes']
+            stats.pop(FILE_TYPE_SKETCHES_FIELD, None)
 
-        return dict(developer_stats)
+        return results
     
     def _analyze_commit(self, commit, developer_stats):
         """Анализ одного коммита и обновление статистики разработчика."""
-        dev_id = commit['author_email'].lower()  # Используем email как ID разработчика
+        # Получаем детали коммита и изменения файлов
+        commit_hash = commit['hash']
+        commit_detail = self.commit_details.get(commit_hash, {})
+        commit_files = self.file_changes.get(commit_hash, [])
+        
+        self._fold_commit(commit, commit_detail, commit_files, developer_stats)
+    
+    def _fold_commit(self, commit, commit_detail, commit_files, developer_stats):
+        """
+        Учитывает коммит, его детали и изменения файлов в статистике разработчика.
+        
+        Args:
+            commit: запись коммита
+            commit_detail: детали коммита (словарь со статистикой 'stats')
+            commit_files: список изменений файлов коммита
+            developer_stats: статистика по разработчикам (изменяется на месте)
+        """
+        dev_id = developer_id(commit['author_email'])  # Используем email как ID разработчика
         
         # Получаем или инициализируем статистику разработчика
         dev_stats = developer_stats[dev_id]
@@ -139,20 +274,19 @@ class DevActivityAnalyzer:
         # Обновляем темы коммитов
         dev_stats['commit_subjects'].append(commit['subject'])
         
-        # Обновляем даты коммитов
-        commit_date = commit['date']
-        if not dev_stats['first_commit_date'] or commit_date < dev_stats['first_commit_date']:
-            dev_stats['first_commit_date'] = commit_date
-        if not dev_stats['last_commit_date'] or commit_date > dev_stats['last_commit_date']:
-            dev_stats['last_commit_date'] = commit_date
+        # Обновляем время первого и последнего коммита
+        timestamp = commit['timestamp']
+        dev_stats['commit_timestamps'].append(timestamp)
+        if dev_stats['first_commit_timestamp'] is None or timestamp < dev_stats['first_commit_timestamp']:
+            dev_stats['first_commit_timestamp'] = timestamp
+        if dev_stats['last_commit_timestamp'] is None or timestamp > dev_stats['last_commit_timestamp']:
+            dev_stats['last_commit_timestamp'] = timestamp
             
         # Обновляем распределение коммитов (по месяцам/годам)
-        commit_date_obj = datetime.strptime(commit_date, '%Y-%m-%d %H:%M:%S')
-        month_year = commit_date_obj.strftime('%Y-%m')
-        dev_stats['commit_distribution'][month_year] += 1
+        _, month, hour = local_time_keys(timestamp)
+        dev_stats['commit_distribution'][month] += 1
         
         # Обновляем распределение по времени суток
-        hour = commit_date_obj.hour
         if 6 <= hour < 12:
             time_period = 'morning'    # Утро (6-12)
         elif 12 <= hour < 18:
@@ -163,59 +297,83 @@ class DevActivityAnalyzer:
             time_period = 'night'      # Ночь (23-6)
         dev_stats['time_of_day_distribution'][time_period] = dev_stats['time_of_day_distribution'].get(time_period, 0) + 1
         
-        # Получаем детали коммита и изменения файлов
-        commit_hash = commit['hash']
-        commit_detail = self.commit_details.get(commit_hash, {})
-        commit_files = self.file_changes.get(commit_hash, [])
-        
         # Обновляем добавленные/удаленные строки
         stats = commit_detail.get('stats', {})
-        dev_stats['lines_added'] += stats.get('insertions', 0)
-        dev_stats['lines_removed'] += stats.get('deletions', 0)
+        insertions = stats.get('insertions', 0)
+        deletions = stats.get('deletions', 0)
+        dev_stats['lines_added'] += insertions
+        dev_stats['lines_removed'] += deletions
         
         # Обновляем code churn и net contribution
-        dev_stats['code_churn'] += stats.get('insertions', 0) + stats.get('deletions', 0)
-        dev_stats['net_contribution'] += stats.get('insertions', 0) - stats.get('deletions', 0)
+        dev_stats['code_churn'] += insertions + deletions
+        dev_stats['net_contribution'] += insertions - deletions
+        dev_stats['commit_sizes'][commit_size(insertions + deletions)] += 1
+        
+        if self._fold_file_changes(dev_stats, commit_files):
+            dev_stats['substantial_commits'] += 1
+            
+        # Рассчитываем влияние коммита (может быть уточнено более сложными метриками)
+        # Простая формула: (изменено файлов) * (добавлено + удалено строк)
+        impact = stats.get('files_changed', 0) * (insertions + deletions)
+        dev_stats['commit_impact'] += impact
+
+    def _fold_file_changes(self, dev_stats, commit_files):
+        """
+        Учитывает изменения файлов коммита в статистике разработчика.
         
-        # Проверяем, является ли этот коммит существенным
+        Returns:
+            bool: True, если хотя бы одно изменение существенное
+        """
         substantial_change = False
+        # В приближенном режиме файлы учитываются в скетчах (HyperLogLog и HeavyHitters)
+        file_type_sketches = dev_stats.get(FILE_TYPE_SKETCHES_FIELD)
         for file_change in commit_files:
-            # Добавляем файл в модифицированные файлы
             file_path = file_change['file_path']
-            dev_stats['files_modified'].add(file_path)
-            
-            # Обновляем счетчик изменений для этого файла
-            dev_stats['most_modified_files'][file_path] += 1
-            
-            # Извлекаем расширение файла
             ext = file_change.get('file_ext', '')
+            if file_type_sketches is None:
+                # Добавляем файл в модифицированные файлы
+                dev_stats['files_modified'][file_path] = None
+                
+                # Обновляем счетчик изменений для этого файла
+                dev_stats['most_modified_files'][file_path] += 1
+            else:
+                dev_stats['files_modified'].add(file_path)
+                dev_stats['most_modified_files'].add(file_path)
+                sketch = file_type_sketches.get(ext or '.other')
+                if sketch is None:
+                    sketch = file_type_sketches[ext or '.other'] = new_distinct_sketch()
+                sketch.add(file_path)
+            
+            # Учитываем расширение файла
             if ext:
-                dev_stats['file_types_modified'].add(ext)
+                dev_stats['file_types_modified'][ext] = None
                 
                 # Определяем категорию файла
-                if ext in config.CODE_FILE_EXTENSIONS:
-                    dev_stats['file_categories']['code'] += 1
-                elif ext in config.MARKUP_FILE_EXTENSIONS:
-                    dev_stats['file_categories']['markup'] += 1
-                elif ext in config.STYLE_FILE_EXTENSIONS:
-                    dev_stats['file_categories']['style'] += 1
-                elif ext in config.CONFIG_FILE_EXTENSIONS:
-                    dev_stats['file_categories']['config'] += 1
-                else:
-                    dev_stats['file_categories']['other'] += 1
+                dev_stats['file_categories'][extension_category(ext)] += 1
                 
             # Проверяем, является ли изменение существенным
             if file_change.get('is_substantial', False):
                 substantial_change = True
                 
-        if substantial_change:
-            dev_stats['substantial_commits'] += 1
-            
-        # Рассчитываем влияние коммита (может быть уточнено более сложными метриками)
-        # Простая формула: (изменено файлов) * (добавлено + удалено строк)
-        impact = stats.get('files_changed', 0) * (stats.get('insertions', 0) + stats.get('deletions', 0))
-        dev_stats['commit_impact'] += impact
+        return substantial_change
 
+    def _get_commit_index(self):
+        """
+        Возвращает индекс коммитов по хэшу.
+        
+        Индекс строится один раз и перестраивается, если список коммитов
+        заменен другим или изменилась его длина (например, при потоковом анализе).
+        """
+        if (self._commit_index is None or self._commit_index[0] is not self.commits
+                or self._commit_index[1] != len(self.commits)):
+            index = {}
+            for commit in self.commits:
+                # При повторах хэша используется первый коммит, как при линейном поиске
+                index.setdefault(commit['hash'], commit)
+            # Ссылка на список хранится, чтобы сравнение по identity было надежным
+            self._commit_index = (self.commits, len(self.commits), index)
+        return self._commit_index[2]
+    
     def get_advanced_metrics(self, dev_stats):
         """
         Рассчитывает расширенные метрики для разработчика.
@@ -233,12 +391,17 @@ class DevActivityAnalyzer:
         
         # Распределение по типам файлов
         file_types = {}
-        for file_path in dev_stats['files_modified']:
-            ext = os.path.splitext(file_path)[1].lower()
-            if not ext:
-                ext = '.other'
-            
-            file_types[ext] = file_types.get(ext, 0) + 1
+        if FILE_TYPE_SKETCHES_FIELD in dev_stats:
+            # Приближенный режим: оценка количества различных файлов каждого типа
+            for ext, sketch in dev_stats[FILE_TYPE_SKETCHES_FIELD].items():
+                file_types[ext] = len(sketch)
+        else:
+            for file_path in dev_stats['files_modified']:
+                ext = classify_path(file_path).ext
+                if not ext:
+                    ext = '.other'
+                
+                file_types[ext] = file_types.get(ext, 0) + 1
         
         metrics['file_type_distribution'] = file_types
         
@@ -254,20 +417,32 @@ class DevActivityAnalyzer:
         else:
             metrics['time_distribution'] = time_distribution
         
+        # В колоночном режиме метрики по коммитам уже вычислены групповыми операциями
+        if self._columnar_metrics is not None:
+            aggregate = self._columnar_metrics.get(developer_id(dev_stats['email']))
+            if aggregate:
+                return self._columnar_commit_metrics(metrics, aggregate, dev_stats)
+        
+        # Время коммитов разработчика в местных секундах: из состояния анализа
+        # или поиском по индексу (без перебора всех коммитов)
+        if 'commit_timestamps' in dev_stats:
+            commit_times = [local_seconds(timestamp) for timestamp in dev_stats['commit_timestamps']]
+        else:
+            commit_index = self._get_commit_index()
+            commit_times = []
+            for commit_hash in dev_stats.get('commits', []):
+                commit = commit_index.get(commit_hash)
+                if commit:
+                    commit_times.append(local_seconds(commit['timestamp']))
+        
         # Среднее время между коммитами (в рабочие часы)
         if len(dev_stats.get('commits', [])) > 1:
-            commit_dates = []
-            for commit_hash in dev_stats['commits']:
-                commit = next((c for c in self.commits if c['hash'] == commit_hash), None)
-                if commit:
-                    commit_dates.append(datetime.strptime(commit['date'], '%Y-%m-%d %H:%M:%S'))
+            sorted_times = sorted(commit_times)
             
-            if commit_dates:
-                commit_dates.sort()
+            if sorted_times:
                 intervals = []
-                for i in range(1, len(commit_dates)):
-                    delta = commit_dates[i] - commit_dates[i-1]
-                    hours = delta.total_seconds() / 3600
+                for i in range(1, len(sorted_times)):
+                    hours = (sorted_times[i] - sorted_times[i-1]) / 3600
                     
                     # Игнорируем интервалы больше 16 часов (считаем перерывами в работе)
                     if hours < 16:
@@ -280,11 +455,9 @@ class DevActivityAnalyzer:
         if dev_stats.get('active_days', 0) > 0:
             # Считаем коммиты за каждый день
             daily_commits = {}
-            for commit_hash in dev_stats['commits']:
-                commit = next((c for c in self.commits if c['hash'] == commit_hash), None)
-                if commit:
-                    date = commit['date'].split(' ')[0]  # YYYY-MM-DD
-                    daily_commits[date] = daily_commits.get(date, 0) + 1
+            for commit_time in commit_times:
+                day = commit_time // 86400
+                daily_commits[day] = daily_commits.get(day, 0) + 1
             
             # Считаем среднее и стандартное отклонение
             commit_counts = list(daily_commits.values())
@@ -305,17 +478,14 @@ class DevActivityAnalyzer:
             'large': 0,    # > 50 строк
         }
         
-        for commit_hash in dev_stats['commits']:
-            commit_detail = self.commit_details.get(commit_hash, {})
-            stats = commit_detail.get('stats', {})
-            changes = stats.get('insertions', 0) + stats.get('deletions', 0)
-            
-            if changes < 10:
-                commit_sizes['small'] += 1
-            elif changes < 50:
-                commit_sizes['medium'] += 1
-            else:
-                commit_sizes['large'] += 1
+        if 'commit_sizes' in dev_stats:
+            for size in commit_sizes:
+                commit_sizes[size] = dev_stats['commit_sizes'].get(size, 0)
+        else:
+            for commit_hash in dev_stats['commits']:
+                commit_detail = self.commit_details.get(commit_hash, {})
+                stats = commit_detail.get('stats', {})
+                commit_sizes[commit_size(stats.get('insertions', 0) + stats.get('deletions', 0))] += 1
         
         if total_commits > 0:
             metrics['commit_size_distribution'] = {
@@ -327,6 +497,27 @@ class DevActivityAnalyzer:
         
         return metrics
 
+    def _columnar_commit_metrics(self, metrics, aggregate, dev_stats):
+        """Дополняет расширенные метрики агрегатами колоночной таблицы коммитов."""
+        total_commits = dev_stats['total_commits']
+        
+        if total_commits > 1 and aggregate['avg_commit_interval_hours'] is not None:
+            metrics['avg_commit_interval_hours'] = round(aggregate['avg_commit_interval_hours'], 2)
+        
+        if dev_stats.get('active_days', 0) > 0 and aggregate['daily_variability'] is not None:
+            metrics['commit_variability'] = round(aggregate['daily_variability'], 2)
+        
+        commit_sizes = aggregate['commit_sizes']
+        if total_commits > 0:
+            metrics['commit_size_distribution'] = {
+                size: round(count / total_commits * 100, 2)
+                for size, count in commit_sizes.items()
+            }
+        else:
+            metrics['commit_size_distribution'] = dict(commit_sizes)
+        
+        return metrics
+
     def _calculate_file_complexity(self, file_path):
         """
         Рассчитывает примерную сложность файла на основе его типа.
@@ -336,7 +527,7 @@ class DevActivityAnalyzer:
         complexity = 1.0
         
         # Настраиваем на основе типа файла
-        ext = os.path.splitext(file_path)[1].lower()
+        ext = classify_path(file_path).ext
         
         # Считаем определенные типы файлов более сложными, чем другие
         complexity_multipliers = {
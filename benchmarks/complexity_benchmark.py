@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Микро-бенчмарк оценки сложности изменений (ChangeAnalyzer._analyze_complexity).
+
+Тексты diff берутся из истории указанного репозитория (git log -p), после чего
+сравниваются построчная проверка индикаторов отдельными вызовами re.search
+(прежняя реализация) и однопроходный ComplexityScanner. Перед замером
+проверяется, что оценки сложности совпадают для всех diff.
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+
+# Добавляем корневую директорию проекта в путь для импорта модулей
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+from change_analyzer import ChangeAnalyzer
+
+def load_diffs(repo_path, max_commits):
+    """Возвращает тексты diff отдельных файлов из последних max_commits коммитов."""
+    output = subprocess.run(
+        ['git', 'log', '-p', '--no-color', '--format=', f'-n{max_commits}'],
+        cwd=repo_path, capture_output=True, check=True
+    ).stdout.decode('utf-8', errors='replace')
+    return ['diff --git ' + chunk for chunk in ('\n' + output).split('\ndiff --git ')[1:]]
+
+def reference_complexity(analyzer, diff):
+    """Прежняя реализация: каждый индикатор проверяется на каждой добавленной строке."""
+    if not diff:
+        return 0
+    added_lines = [line[1:] for line in diff.split('\n')
+                   if line.startswith('+') and not line.startswith('+++')]
+    unique_indicators = set()
+    for line in added_lines:
+        for pattern in analyzer.complexity_indicators:
+            if re.search(pattern, line):
+                unique_indicators.add(pattern)
+    complexity_score = len(added_lines) * 0.1 + len(unique_indicators) * 0.5
+    return max(analyzer.MIN_COMPLEXITY, min(analyzer.MAX_COMPLEXITY, 0.5 + complexity_score / 10))
+
+def best_time(func, diffs, repeat):
+    """Минимальное время обработки всех diff из repeat запусков."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for diff in diffs:
+            func(diff)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Микро-бенчмарк оценки сложности изменений',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument('--repo-path', default=PROJECT_ROOT, help='Репозиторий, из истории которого берутся diff')
+    parser.add_argument('--max-commits', type=int, default=500, help='Количество последних коммитов')
+    parser.add_argument('--repeat', type=int, default=5, help='Количество повторов замера')
+    args = parser.parse_args()
+
+    diffs = load_diffs(args.repo_path, args.max_commits)
+    analyzer = ChangeAnalyzer()
+    print(f"Diff: {len(diffs)}, добавленных строк: "
+          f"{sum(1 for diff in diffs for line in diff.split(chr(10)) if line.startswith('+'))}")
+
+    mismatches = [diff for diff in diffs
+                  if reference_complexity(analyzer, diff) != analyzer._analyze_complexity(diff)]
+    if mismatches:
+        print(f"Оценки сложности различаются для {len(mismatches)} diff")
+        return 1
+
+    reference = best_time(lambda diff: reference_complexity(analyzer, diff), diffs, args.repeat)
+    scanner = best_time(analyzer._analyze_complexity, diffs, args.repeat)
+    print(f"re.search по строкам: {reference:.4f} с")
+    print(f"ComplexityScanner:    {scanner:.4f} с")
+    print(f"Ускорение: {reference / scanner:.1f}x")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
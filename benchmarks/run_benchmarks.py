@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Замер производительности этапов анализа на синтетическом репозитории.
+
+Для каждого этапа (сбор данных, анализ, формирование JSON, генерация HTML)
+измеряются время выполнения и пиковый объем памяти Python (tracemalloc).
+Результаты записываются в JSON-файл для сравнения между версиями.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime
+
+# Добавляем корневую директорию проекта в путь для импорта модулей
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+import config
+from git_collector import GitDataCollector
+from analyzer import DevActivityAnalyzer
+from output_generator import JSONOutputGenerator
+from html_generator import HTMLGenerator
+from benchmarks.synthetic_repo import generate_repo
+
+# Настройки config, значения которых сохраняются вместе с результатами
+RECORDED_SETTINGS = [
+    'COLLECTION_MODE', 'OBJECT_BACKEND', 'COLLECTION_WORKERS', 'CACHE_ENABLED',
+    'STREAMING_ANALYSIS', 'COMPACT_COLLECTION', 'NUMSTAT_FAST_PATH', 'COLUMNAR_ANALYSIS',
+    'ADVANCED_CHANGE_ANALYSIS', 'MIN_CODE_CHANGE_SIZE', 'IGNORE_WHITESPACE_ONLY',
+]
+
+def measure(stage, func, results, quiet=True):
+    """
+    Выполняет этап, замеряя время и пиковый объем памяти.
+
+    Returns:
+        результат func()
+    """
+    tracemalloc.reset_peak()
+    start_memory = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    if quiet:
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            value = func()
+    else:
+        value = func()
+    elapsed = time.perf_counter() - start
+    current_memory, peak_memory = tracemalloc.get_traced_memory()
+
+    results[stage] = {
+        'seconds': round(elapsed, 4),
+        'peak_memory_bytes': peak_memory,
+        'retained_memory_bytes': current_memory - start_memory,
+    }
+    print(f"{stage}: {elapsed:.3f} с, пик памяти {peak_memory / 1024 / 1024:.1f} МБ")
+    return value
+
+def run_pipeline(repo_path, work_dir, quiet=True):
+    """
+    Выполняет все этапы анализа репозитория с замерами.
+
+    Returns:
+        tuple: (результаты замеров по этапам, сводка по данным)
+    """
+    stages = {}
+    output_file = os.path.join(work_dir, 'developer_stats.json')
+
+    tracemalloc.start()
+    try:
+        collector = GitDataCollector(repo_path)
+        if getattr(config, 'STREAMING_ANALYSIS', False):
+            # В потоковом режиме сбор и анализ выполняются одним проходом
+            analyzer = DevActivityAnalyzer()
+            analysis_results = measure('collect_and_analyze',
+                                       lambda: analyzer.analyze_stream(collector.iter_records()),
+                                       stages, quiet)
+            commit_count = sum(stats['total_commits'] for stats in analysis_results.values())
+        else:
+            git_data = measure('collect_data', collector.collect_data, stages, quiet)
+            commit_count = len(git_data['commits'])
+            analyzer = DevActivityAnalyzer(git_data)
+            analysis_results = measure('analyze', analyzer.analyze, stages, quiet)
+
+        output_generator = JSONOutputGenerator(analysis_results)
+        measure('generate_output', lambda: output_generator.generate_output(output_file), stages, quiet)
+
+        report_dir = os.path.join(work_dir, 'report')
+        measure('html_generate', lambda: HTMLGenerator(output_file, report_dir).generate(), stages, quiet)
+    finally:
+        tracemalloc.stop()
+
+    summary = {
+        'commits_collected': commit_count,
+        'developers': len(analysis_results),
+    }
+    return stages, summary
+
+def project_version():
+    """Возвращает текущую версию проекта (git describe) или None."""
+    result = subprocess.run(['git', 'describe', '--always', '--dirty'], cwd=PROJECT_ROOT,
+                            capture_output=True, text=True)
+    return result.stdout.strip() if result.returncode == 0 else None
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Замер производительности анализатора на синтетическом репозитории',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument('--output', default='benchmark_results.json', help='JSON-файл для результатов')
+    parser.add_argument('--repo-path', help='Использовать существующий репозиторий вместо синтетического')
+    parser.add_argument('--keep-repo', action='store_true', help='Не удалять синтетический репозиторий')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Показывать вывод этапов анализа')
+
+    repo_group = parser.add_argument_group('Параметры синтетического репозитория')
+    repo_group.add_argument('--commits', type=int, default=1000, help='Количество коммитов')
+    repo_group.add_argument('--developers', type=int, default=10, help='Количество разработчиков')
+    repo_group.add_argument('--files-per-commit', type=int, default=3, help='Количество файлов в коммите')
+    repo_group.add_argument('--diff-lines', type=int, default=20, help='Количество изменяемых строк в файле')
+    repo_group.add_argument('--merge-ratio', type=float, default=0.05, help='Доля merge-коммитов')
+    repo_group.add_argument('--revert-ratio', type=float, default=0.02, help='Доля revert-коммитов')
+    repo_group.add_argument('--file-pool', type=int, default=200, help='Количество различных файлов')
+    repo_group.add_argument('--seed', type=int, default=0, help='Начальное значение генератора случайных чисел')
+
+    settings_group = parser.add_argument_group('Параметры анализатора')
+    settings_group.add_argument('--collection-mode', choices=['per_commit', 'streaming', 'native'],
+                                default=config.COLLECTION_MODE, help='Режим сбора данных')
+    settings_group.add_argument('--object-backend', choices=['show', 'cat-file', 'native'],
+                                default=config.OBJECT_BACKEND, help='Источник содержимого файлов')
+    settings_group.add_argument('--workers', type=int, default=config.COLLECTION_WORKERS,
+                                help='Количество процессов сбора данных')
+    settings_group.add_argument('--streaming-analysis', action='store_true', help='Потоковый анализ')
+    settings_group.add_argument('--compact', action='store_true', help='Компактное представление данных')
+    settings_group.add_argument('--numstat-fast-path', action='store_true', help='Быстрый режим numstat')
+    settings_group.add_argument('--columnar', action='store_true', help='Колоночный анализ')
+    args = parser.parse_args()
+
+    config.COLLECTION_MODE = args.collection_mode
+    config.OBJECT_BACKEND = args.object_backend
+    config.COLLECTION_WORKERS = args.workers
+    config.STREAMING_ANALYSIS = args.streaming_analysis
+    config.COMPACT_COLLECTION = args.compact
+    config.NUMSTAT_FAST_PATH = args.numstat_fast_path
+    config.COLUMNAR_ANALYSIS = args.columnar
+
+    work_dir = tempfile.mkdtemp(prefix='git_analyzer_bench_')
+    try:
+        repository = {'path': args.repo_path}
+        repo_path = args.repo_path
+        if repo_path is None:
+            repo_path = os.path.join(work_dir, 'repo')
+            start = time.perf_counter()
+            repository = generate_repo(repo_path, args.commits, args.developers, args.files_per_commit,
+                                       args.diff_lines, args.merge_ratio, args.revert_ratio,
+                                       args.file_pool, args.seed)
+            repository['seed'] = args.seed
+            repository['generation_seconds'] = round(time.perf_counter() - start, 4)
+            print(f"Синтетический репозиторий создан за {repository['generation_seconds']} с: {repo_path}")
+
+        stages, summary = run_pipeline(repo_path, work_dir, quiet=not args.verbose)
+
+        results = {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'version': project_version(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repository': repository,
+            'settings': {name: getattr(config, name, None) for name in RECORDED_SETTINGS},
+            'stages': stages,
+            'total_seconds': round(sum(stage['seconds'] for stage in stages.values()), 4),
+            'summary': summary,
+        }
+
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"Результаты сохранены в {args.output}")
+    finally:
+        if args.keep_repo and args.repo_path is None:
+            print(f"Синтетический репозиторий сохранен: {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
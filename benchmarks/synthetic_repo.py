@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Генератор синтетических Git-репозиториев для измерения производительности.
+
+История создается одним потоком `git fast-import`, поэтому даже репозитории
+на десятки тысяч коммитов строятся за секунды. Параметры позволяют задать
+количество коммитов и разработчиков, число файлов в коммите, размер изменений,
+а также долю merge- и revert-коммитов.
+"""
+
+import argparse
+import os
+import random
+import subprocess
+
+# Начало синтетической истории (2022-01-01 00:00:00 UTC)
+START_TIMESTAMP = 1640995200
+
+# Расширения файлов синтетического проекта
+FILE_EXTENSIONS = ['.py', '.js', '.java', '.md', '.json', '.css', '.html']
+
+# Шаблоны строк кода, часть из которых содержит индикаторы сложности
+LINE_TEMPLATES = [
+    'value_{n} = compute({k})',
+    'def handler_{n}(request):',
+    '    if (request.size > {k}) return None',
+    '    for (item in items_{n}) process(item)',
+    'import module_{k}',
+    'result_{n} = service.call({k})',
+    '    return value_{n}',
+    '# comment {n}',
+]
+
+def generate_repo(path, commits=1000, developers=10, files_per_commit=3, diff_lines=20,
+                  merge_ratio=0.05, revert_ratio=0.02, file_pool=200, seed=0):
+    """
+    Создает синтетический репозиторий.
+
+    Args:
+        path: каталог нового репозитория (не должен содержать .git)
+        commits: количество коммитов в основной ветке
+        developers: количество разработчиков
+        files_per_commit: количество изменяемых файлов в обычном коммите
+        diff_lines: количество изменяемых строк в каждом файле
+        merge_ratio: доля merge-коммитов (каждый добавляет коммит во вспомогательной ветке)
+        revert_ratio: доля revert-коммитов, отменяющих предыдущий коммит
+        file_pool: количество различных файлов в проекте
+        seed: начальное значение генератора случайных чисел
+
+    Returns:
+        dict: фактические параметры созданной истории
+    """
+    if os.path.exists(os.path.join(path, '.git')):
+        raise ValueError(f"{path} уже содержит Git-репозиторий")
+
+    os.makedirs(path, exist_ok=True)
+    subprocess.run(['git', 'init', '-q', path], check=True)
+
+    rng = random.Random(seed)
+    authors = [(f'Developer {i}', f'dev{i}@example.com') for i in range(developers)]
+    paths = [f'src/module_{i // 20}/file_{i}{rng.choice(FILE_EXTENSIONS)}' for i in range(file_pool)]
+
+    process = subprocess.Popen(['git', 'fast-import', '--quiet'], cwd=path, stdin=subprocess.PIPE)
+    writer = _FastImportWriter(process.stdin)
+
+    contents = {}
+    timestamp = START_TIMESTAMP
+    mark = 0
+    previous = None  # (mark, subject, старое содержимое файлов) последнего обычного коммита
+    summary = {'commits': 0, 'merges': 0, 'reverts': 0, 'side_commits': 0}
+
+    try:
+        for index in range(commits):
+            timestamp += rng.randint(60, 6 * 3600)
+            author = rng.choice(authors)
+            roll = rng.random()
+
+            if roll < revert_ratio and previous is not None:
+                # Revert восстанавливает содержимое файлов до предыдущего коммита
+                _, subject, old_contents = previous
+                files = {}
+                for file_path, old_lines in old_contents.items():
+                    # Файлы, созданные отменяемым коммитом, удаляются
+                    files[file_path] = old_lines or None
+                    if old_lines:
+                        contents[file_path] = old_lines
+                    else:
+                        contents.pop(file_path, None)
+                mark += 1
+                writer.commit('refs/heads/master', mark, author, timestamp, f'Revert "{subject}"', files)
+                previous = None
+                summary['reverts'] += 1
+
+            elif roll < revert_ratio + merge_ratio and index > 0:
+                # Коммит во вспомогательной ветке и его слияние в основную
+                side_files = _change_files(rng, contents, paths, files_per_commit, diff_lines, index)
+                mark += 1
+                side_mark = mark
+                writer.commit('refs/heads/feature', side_mark, author, timestamp - 30,
+                              f'feat: side change {index}', side_files, parent=f':{mark - 1}')
+                mark += 1
+                writer.commit('refs/heads/master', mark, author, timestamp,
+                              f"Merge branch 'feature' ({index})", side_files,
+                              parent=f':{side_mark - 1}', merge=f':{side_mark}')
+                summary['merges'] += 1
+                summary['side_commits'] += 1
+
+            else:
+                old_contents = {}
+                files = _change_files(rng, contents, paths, files_per_commit, diff_lines, index, old_contents)
+                subject = f'{rng.choice(["feat", "fix", "refactor", "docs", "chore"])}: change {index}'
+                mark += 1
+                writer.commit('refs/heads/master', mark, author, timestamp, subject, files)
+                previous = (mark, subject, old_contents)
+
+            summary['commits'] += 1
+
+        writer.close()
+    finally:
+        process.stdin.close()
+        process.wait()
+
+    if process.returncode != 0:
+        raise RuntimeError("git fast-import завершился с ошибкой")
+
+    subprocess.run(['git', 'checkout', '-q', 'master'], cwd=path, check=True)
+    summary.update({'developers': developers, 'files_per_commit': files_per_commit,
+                    'diff_lines': diff_lines, 'file_pool': file_pool})
+    return summary
+
+def _change_files(rng, contents, paths, files_per_commit, diff_lines, index, old_contents=None):
+    """Изменяет случайные файлы проекта и возвращает их новое содержимое."""
+    files = {}
+    for file_path in rng.sample(paths, min(files_per_commit, len(paths))):
+        lines = list(contents.get(file_path, []))
+        if old_contents is not None:
+            old_contents[file_path] = contents.get(file_path, [])
+
+        for i in range(diff_lines):
+            line = rng.choice(LINE_TEMPLATES).format(n=index * diff_lines + i, k=rng.randint(0, 999))
+            if lines and rng.random() < 0.5:
+                lines[rng.randrange(len(lines))] = line
+            else:
+                lines.append(line)
+
+        contents[file_path] = lines
+        files[file_path] = lines
+    return files
+
+class _FastImportWriter:
+    """Формирует поток команд git fast-import."""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def commit(self, ref, mark, author, timestamp, subject, files, parent=None, merge=None):
+        """Записывает коммит; значение None в files означает удаление файла."""
+        name, email = author
+        message = subject.encode('utf-8')
+        out = [
+            f'commit {ref}\n'.encode('utf-8'),
+            f'mark :{mark}\n'.encode('utf-8'),
+            f'author {name} <{email}> {timestamp} +0000\n'.encode('utf-8'),
+            f'committer {name} <{email}> {timestamp} +0000\n'.encode('utf-8'),
+            f'data {len(message)}\n'.encode('utf-8'), message, b'\n',
+        ]
+        if parent is not None:
+            out.append(f'from {parent}\n'.encode('utf-8'))
+        if merge is not None:
+            out.append(f'merge {merge}\n'.encode('utf-8'))
+        for file_path, lines in files.items():
+            if lines is None:
+                out.append(f'D {file_path}\n'.encode('utf-8'))
+                continue
+            data = ''.join(line + '\n' for line in lines).encode('utf-8')
+            out.append(f'M 100644 inline {file_path}\n'.encode('utf-8'))
+            out.append(f'data {len(data)}\n'.encode('utf-8'))
+            out.append(data)
+            out.append(b'\n')
+        out.append(b'\n')
+        self.stream.write(b''.join(out))
+
+    def close(self):
+        self.stream.write(b'done\n')
+        self.stream.flush()
+
+def main():
+    parser = argparse.ArgumentParser(description='Генератор синтетических Git-репозиториев')
+    parser.add_argument('path', help='Каталог создаваемого репозитория')
+    parser.add_argument('--commits', type=int, default=1000, help='Количество коммитов')
+    parser.add_argument('--developers', type=int, default=10, help='Количество разработчиков')
+    parser.add_argument('--files-per-commit', type=int, default=3, help='Количество файлов в коммите')
+    parser.add_argument('--diff-lines', type=int, default=20, help='Количество изменяемых строк в файле')
+    parser.add_argument('--merge-ratio', type=float, default=0.05, help='Доля merge-коммитов')
+    parser.add_argument('--revert-ratio', type=float, default=0.02, help='Доля revert-коммитов')
+    parser.add_argument('--file-pool', type=int, default=200, help='Количество различных файлов')
+    parser.add_argument('--seed', type=int, default=0, help='Начальное значение генератора случайных чисел')
+    args = parser.parse_args()
+
+    summary = generate_repo(args.path, args.commits, args.developers, args.files_per_commit,
+                            args.diff_lines, args.merge_ratio, args.revert_ratio,
+                            args.file_pool, args.seed)
+    print(f"Создан репозиторий {args.path}: {summary}")
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,222 @@
 #!/usr/bin/env python3
 import re
-import os
+from functools import lru_cache
 import config
+from profiling import profiler
+from path_classifier import classify_path
+from commit_classifier import DEFAULT_COMMIT_TYPE_WEIGHTS, classifier_for
+from score_cache import DiffScore, DiffScoreCache, diff_fingerprint
+
+# Символы, после которых предыдущий литерал в регулярном выражении может отсутствовать
+_OPTIONAL_QUANTIFIERS = '*?{'
+
+def _required_literal(pattern):
+    """
+    Возвращает самую длинную подстроку, обязательно входящую в любое совпадение
+    с pattern, или None, если ее не удается выделить простым разбором
+    (альтернативы, группы, классы символов).
+    """
+    if any(char in pattern for char in '|()[]^$') and not _only_escaped(pattern, '|()[]^$'):
+        return None
+    runs = []
+    current = ''
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\' and i + 1 < len(pattern):
+            escaped = pattern[i + 1]
+            i += 2
+            if escaped.isalnum():
+                # Класс символов (\s, \w, \d...) прерывает литерал
+                runs.append(current)
+                current = ''
+            else:
+                current += escaped
+            continue
+        i += 1
+        if char == '.':
+            runs.append(current)
+            current = ''
+        elif char == '+':
+            # Литерал обязателен, но за ним может следовать его повтор
+            runs.append(current)
+            current = ''
+        elif char in _OPTIONAL_QUANTIFIERS and (char != '{' or pattern[i:i + 1].isdigit() or pattern[i:i + 1] == ','):
+            # Предыдущий символ необязателен
+            runs.append(current[:-1])
+            current = ''
+            if char == '{':
+                i = pattern.index('}', i) + 1
+        else:
+            current += char
+    runs.append(current)
+    literal = max(runs, key=len)
+    return literal or None
+
+def _only_escaped(pattern, chars):
+    """True, если все символы chars встречаются в pattern только экранированными."""
+    i = 0
+    while i < len(pattern):
+        if pattern[i] == '\\':
+            i += 2
+            continue
+        if pattern[i] in chars:
+            return False
+        i += 1
+    return True
+
+# Экранированные последовательности, которые могут совпасть с переводом строки
+_NEWLINE_ESCAPES = set('sWDnxuUN0')
+
+def _single_line_pattern(pattern):
+    """
+    Переписывает выражение так, чтобы совпадение не выходило за границы строки:
+    \\s вне классов символов заменяется на [^\\S\\n].
+    
+    Returns:
+        str или None, если выражение может совпасть с переводом строки иначе
+        (\\s, \\W, \\D внутри класса символов, отрицаемый класс, \\W, \\D, \\n
+        и коды символов, флаг s) - такие выражения проверяются по строкам
+    """
+    if '\n' in pattern or re.search(r'\(\?[aiLmux]*s', pattern):
+        return None
+    result = []
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            escaped = pattern[i + 1:i + 2]
+            if escaped in _NEWLINE_ESCAPES and (in_class or escaped != 's'):
+                return None
+            result.append('[^\\S\\n]' if escaped == 's' else pattern[i:i + 2])
+            i += 2
+            continue
+        if char == '[' and not in_class:
+            in_class = True
+            start = i + 1
+            if pattern[start:start + 1] == '^':
+                return None
+            # ']' сразу после '[' - символ класса, а не его конец
+            if pattern[start:start + 1] == ']':
+                result.append('[]')
+                i = start + 1
+                continue
+        elif char == ']' and in_class:
+            in_class = False
+        result.append(char)
+        i += 1
+    return ''.join(result)
+
+class ComplexityScanner:
+    """
+    Поиск индикаторов сложности во всех добавленных строках diff за один проход.
+    
+    Добавленные строки объединяются в один текст, и каждый индикатор ищется
+    в нем одним вызовом скомпилированного выражения (поиск останавливается
+    на первом совпадении). Чтобы совпадение не выходило за границы строки,
+    \\s в выражениях заменяется на пробельный символ, отличный от перевода
+    строки, а ^ и $ соответствуют границам строк (см. _single_line_pattern);
+    выражения, которые так переписать нельзя, проверяются по каждой строке.
+    Перед регулярным выражением проверяется обязательный литерал индикатора
+    (например, 'return' или '@'): если его нет в тексте, выражение не выполняется.
+    """
+    
+    def __init__(self, patterns):
+        self.indicators = []
+        for pattern in patterns:
+            single_line = _single_line_pattern(pattern)
+            if single_line is not None:
+                search = re.compile(single_line, re.MULTILINE).search
+            else:
+                search = _line_search(re.compile(pattern).search)
+            self.indicators.append((pattern, _required_literal(pattern), search))
+    
+    def find(self, text):
+        """Возвращает множество индикаторов, найденных в тексте (строки разделены '\\n')."""
+        found = set()
+        for pattern, literal, search in self.indicators:
+            if literal is not None and literal not in text:
+                continue
+            if search(text):
+                found.add(pattern)
+        return found
+
+def _line_search(search):
+    """Поиск выражения отдельно в каждой строке текста."""
+    return lambda text: any(search(line) for line in text.split('\n'))
+
+@lru_cache(maxsize=8)
+def _complexity_scanner(patterns):
+    return ComplexityScanner(patterns)
+
+# Строка diff, начинающаяся с '+' или '-': знак и содержимое строки
+_CHANGED_LINE = re.compile(r'^([+-])(.*)', re.MULTILINE)
+
+class DiffStatistics:
+    """
+    Построчная статистика diff, собираемая за один проход (см. diff_statistics).
+    
+    Строки, начинающиеся с '+++' или '---' (заголовки файла), не входят
+    в added/removed и учитываются отдельно в header_lines.
+    """
+    
+    __slots__ = ('added', 'removed', 'whitespace_only', 'header_lines', 'added_text')
+    
+    def __init__(self, added=0, removed=0, whitespace_only=0, header_lines=0, added_text=''):
+        self.added = added                      # Количество добавленных строк
+        self.removed = removed                  # Количество удаленных строк
+        self.whitespace_only = whitespace_only  # Добавленные/удаленные строки только из пробелов
+        self.header_lines = header_lines        # Строки '+++'/'---'
+        self.added_text = added_text            # Добавленные строки без '+', разделенные '\n'
+    
+    @property
+    def total(self):
+        """Количество добавленных и удаленных строк."""
+        return self.added + self.removed
+    
+    @property
+    def only_whitespace(self):
+        """True, если все строки с '+'/'-' (включая заголовки) изменяют только пробелы."""
+        return self.whitespace_only == self.added + self.removed + self.header_lines
+
+def diff_statistics(diff):
+    """
+    Разбирает текст diff за один проход.
+    
+    Строки с '+'/'-' выделяются одним вызовом скомпилированного выражения,
+    остальные строки (контекст, заголовки hunk) не копируются.
+    
+    Returns:
+        DiffStatistics: количество добавленных, удаленных и пробельных строк
+                        и текст добавленных строк
+    """
+    added_lines = []
+    removed = whitespace_only = header_lines = 0
+    for sign, content in _CHANGED_LINE.findall(diff):
+        if sign == '+':
+            if content.startswith('++'):
+                header_lines += 1
+                continue
+            added_lines.append(content)
+        else:
+            if content.startswith('--'):
+                header_lines += 1
+                continue
+            removed += 1
+        if not content or content.isspace():
+            whitespace_only += 1
+    return DiffStatistics(len(added_lines), removed, whitespace_only, header_lines, '\n'.join(added_lines))
 
 class ChangeAnalyzer:
     """
     Класс для анализа изменений в коммитах с продвинутой оценкой существенности.
     """
     
+    # Границы коэффициента сложности изменений
+    MIN_COMPLEXITY = 0.5
+    MAX_COMPLEXITY = 2.0
+    
     def __init__(self):
         # Словарь весов для различных типов файлов
         self.file_weights = {
@@ -64,19 +273,7 @@ class ChangeAnalyzer:
         }
         
         # Веса для типов коммитов на основе ключевых слов
-        self.commit_type_weights = {
-            'fix': 1.2,       # Исправления оцениваются выше
-            'bug': 1.2,       # Исправления багов
-            'hotfix': 1.3,    # Срочные исправления
-            'feat': 1.1,      # Новые функции
-            'feature': 1.1,   # Новые функции
-            'refactor': 1.0,  # Рефакторинг
-            'perf': 1.2,      # Оптимизация производительности
-            'test': 0.8,      # Тестирование
-            'docs': 0.7,      # Документация
-            'style': 0.6,     # Стилевые изменения
-            'chore': 0.5,     # Рутинные задачи
-        }
+        self.commit_type_weights = dict(DEFAULT_COMMIT_TYPE_WEIGHTS)
         
         # Индикаторы сложности изменений
         self.complexity_indicators = [
@@ -100,6 +297,11 @@ class ChangeAnalyzer:
         
         # Порог для определения существенности
         self.min_change_threshold = config.MIN_CODE_CHANGE_SIZE
+        
+        # Кэш оценок diff по отпечатку содержимого (None - кэш отключен);
+        # сборщик заменяет его кэшем с сохранением в SQLite, если это настроено
+        cache_size = getattr(config, 'DIFF_SCORE_CACHE_SIZE', 0)
+        self.score_cache = DiffScoreCache(cache_size) if cache_size > 0 else None
     
     def _is_binary_file(self, file_path):
         """
@@ -110,8 +312,7 @@ class ChangeAnalyzer:
                             '.bmp', '.ico', '.pdf', '.doc', '.docx', '.ppt', '.pptx', 
                             '.xls', '.xlsx', '.zip', '.tar', '.gz', '.rar', '.7z']
         
-        file_ext = os.path.splitext(file_path)[1].lower()
-        return file_ext in binary_extensions
+        return classify_path(file_path).ext in binary_extensions
     
     def _get_file_weight(self, file_path):
         """
@@ -120,59 +321,87 @@ class ChangeAnalyzer:
         if not file_path:
             return 1.0
             
-        file_name = os.path.basename(file_path)
-        file_ext = os.path.splitext(file_path)[1].lower()
+        path_info = classify_path(file_path)
         
         weight = 1.0  # Вес по умолчанию
         
         # Проверяем расширение
-        if file_ext in self.file_weights:
-            weight = self.file_weights[file_ext]
+        if path_info.ext in self.file_weights:
+            weight = self.file_weights[path_info.ext]
         
         # Проверяем на тестовые файлы по имени
-        for test_pattern in ['test_', '_test', '.test', 'spec_', '_spec']:
-            if test_pattern in file_name.lower():
-                weight = min(weight, self.file_weights.get(test_pattern, 0.7))
-                break
+        if path_info.test_marker is not None:
+            weight = min(weight, self.file_weights.get(path_info.test_marker, 0.7))
         
         # Проверяем на расположение в тестовой директории
-        path_parts = file_path.lower().split(os.path.sep)
-        for part in path_parts:
-            if part in ['test', 'tests', 'testing', 'spec', 'specs']:
-                weight = min(weight, 0.7)
-                break
+        if path_info.in_test_dir:
+            weight = min(weight, 0.7)
         
         return weight
     
-    def _analyze_complexity(self, diff):
+    def _analyze_complexity(self, diff, stats=None):
         """
         Анализирует сложность изменений на основе содержимого.
+        
+        Если статистика diff (diff_statistics) уже получена, она передается
+        в stats, и текст diff повторно не разбирается.
         """
         if not diff:
             return 0
-            
-        complexity_score = 0
-        added_lines = [line[1:] for line in diff.split('\n') 
-                      if line.startswith('+') and not line.startswith('+++')]
+        if stats is None:
+            stats = diff_statistics(diff)
         
-        # Считаем уникальные индикаторы сложности
-        unique_indicators = set()
-        for line in added_lines:
-            for pattern in self.complexity_indicators:
-                if re.search(pattern, line):
-                    unique_indicators.add(pattern)
+        # Считаем уникальные индикаторы сложности (все строки проверяются за один проход)
+        scanner = _complexity_scanner(tuple(self.complexity_indicators))
+        unique_indicators = scanner.find(stats.added_text)
         
         # Базовая оценка - количество строк
-        complexity_score = len(added_lines) * 0.1
+        complexity_score = stats.added * 0.1
         
         # Добавляем бонус за наличие индикаторов сложности
         complexity_score += len(unique_indicators) * 0.5
         
         # Нормализуем к диапазону 0.5 - 2.0
-        complexity_score = max(0.5, min(2.0, 0.5 + complexity_score / 10))
+        complexity_score = max(self.MIN_COMPLEXITY, min(self.MAX_COMPLEXITY, 0.5 + complexity_score / 10))
         
         return complexity_score
     
+    @property
+    def classifier(self):
+        """
+        Классификатор тем коммитов по текущим ключам commit_type_weights.
+        
+        Классификаторы кэшируются по набору ключевых слов (classifier_for), поэтому
+        изменение весов учитывается сразу, а при неизменных ключах классификатор общий.
+        """
+        return classifier_for(tuple(self.commit_type_weights))
+    
+    def score_settings(self):
+        """Отпечаток настроек оценки сложности для постоянного кэша оценок diff."""
+        return DiffScoreCache.settings_fingerprint(self.complexity_indicators, self.MIN_COMPLEXITY, self.MAX_COMPLEXITY)
+    
+    def _score_diff(self, diff):
+        """
+        Оценивает содержимое diff (DiffScore): количество измененных строк,
+        изменение только пробелов и коэффициент сложности. Оценка берется из кэша
+        по отпечатку diff, если такое же изменение уже встречалось.
+        """
+        cache = self.score_cache
+        if cache is not None:
+            fingerprint = diff_fingerprint(diff)
+            score = cache.get(fingerprint)
+            if score is not None:
+                return score
+        
+        stats = diff_statistics(diff)
+        with profiler.timer('complexity_scoring'):
+            complexity = self._analyze_complexity(diff, stats)
+        score = DiffScore(stats.total, stats.only_whitespace, complexity)
+        
+        if cache is not None:
+            cache.put(fingerprint, score)
+        return score
+    
     def _get_commit_type_weight(self, commit_message):
         """
         Определяет вес коммита на основе сообщения.
@@ -180,24 +409,56 @@ class ChangeAnalyzer:
         if not commit_message:
             return 1.0
             
-        commit_message = commit_message.lower()
+        classification = self.classifier.classify(commit_message)
         
         # Конвенциональные коммиты (fix:, feat:, etc.)
-        match = re.match(r'^(\w+)(\([\w-]+\))?:', commit_message)
-        if match:
-            commit_type = match.group(1)
-            if commit_type in self.commit_type_weights:
-                return self.commit_type_weights[commit_type]
+        if classification.conventional_type in self.commit_type_weights:
+            return self.commit_type_weights[classification.conventional_type]
         
-        # Если нет явного указания типа, ищем ключевые слова
+        # Если нет явного указания типа, используем найденные ключевые слова
         weight = 1.0
-        for keyword, keyword_weight in self.commit_type_weights.items():
-            if keyword in commit_message:
+        for keyword in classification.keywords:
+            if keyword in self.commit_type_weights:
                 # Используем наибольший вес из найденных ключевых слов
-                weight = max(weight, keyword_weight)
+                weight = max(weight, self.commit_type_weights[keyword])
         
         return weight
     
+    def is_substantial_from_counts(self, total_changes, file_path, commit_message=None, load_diff=None):
+        """
+        Определяет существенность изменения по количеству измененных строк,
+        полученному от git (numstat), не разбирая текст diff.
+        
+        Текст diff нужен только для оценки сложности, поэтому он загружается,
+        лишь если результат не определяется границами коэффициента сложности.
+        
+        Args:
+            total_changes: количество добавленных и удаленных строк
+            file_path: путь к файлу
+            commit_message: сообщение коммита (опционально)
+            load_diff: функция без аргументов, возвращающая текст diff (опционально)
+            
+        Returns:
+            bool: True, если изменение существенное, иначе False
+        """
+        file_weight = self._get_file_weight(file_path)
+        commit_weight = self._get_commit_type_weight(commit_message) if commit_message else 1.0
+        
+        # Существенно даже при минимальной сложности
+        if total_changes * file_weight * self.MIN_COMPLEXITY * commit_weight >= self.min_change_threshold:
+            return True
+        # Несущественно даже при максимальной сложности
+        if total_changes * file_weight * self.MAX_COMPLEXITY * commit_weight < self.min_change_threshold:
+            return False
+        
+        diff = load_diff() if load_diff is not None else None
+        if not diff:
+            return False
+        
+        complexity_weight = self._score_diff(diff).complexity
+        weighted_changes = total_changes * file_weight * complexity_weight * commit_weight
+        return weighted_changes >= self.min_change_threshold
+    
     def is_substantial_change(self, diff, file_path, commit_message=None):
         """
         Определяет, является ли изменение существенным с учетом
@@ -218,34 +479,19 @@ class ChangeAnalyzer:
         if self._is_binary_file(file_path):
             return False
             
+        # Текст diff разбирается один раз для всех проверок (или оценка берется из кэша)
+        score = self._score_diff(diff)
+        
         # Если настроено игнорирование изменений только в пробелах, проверяем
-        if config.IGNORE_WHITESPACE_ONLY:
-            # Удаляем все строки, которые изменяют только пробелы
-            clean_diff = []
-            for line in diff.split('\n'):
-                if line.startswith('+') or line.startswith('-'):
-                    # Удаляем пробелы и проверяем, осталось ли что-то
-                    content_line = re.sub(r'\s', '', line[1:])
-                    if content_line:
-                        clean_diff.append(line)
-                else:
-                    clean_diff.append(line)
-                    
-            # Если не осталось существенных строк, это изменение только пробелов
-            if not any(line.startswith('+') or line.startswith('-') for line in clean_diff):
-                return False
+        if config.IGNORE_WHITESPACE_ONLY and score.only_whitespace:
+            return False
         
         # Проверяем, соответствует ли размер изменения минимальному порогу
-        added_lines = sum(1 for line in diff.split('\n') 
-                          if line.startswith('+') and not line.startswith('+++'))
-        removed_lines = sum(1 for line in diff.split('\n') 
-                            if line.startswith('-') and not line.startswith('---'))
-        
-        total_changes = added_lines + removed_lines
+        total_changes = score.total
         
         # Применяем веса и коэффициенты
         file_weight = self._get_file_weight(file_path)
-        complexity_weight = self._analyze_complexity(diff)
+        complexity_weight = score.complexity
         commit_weight = self._get_commit_type_weight(commit_message) if commit_message else 1.0
         
         # Вычисляем взвешенный размер изменения
@@ -5,13 +5,17 @@
 """
 
 import argparse
+import json
 import os
 import sys
 import logging
 from git_collector import GitDataCollector
 from analyzer import DevActivityAnalyzer
-from output_generator import JSONOutputGenerator
+from output_generator import JSONOutputGenerator, rerank_report, load_report
+from sensitivity import analyze_sensitivity, format_sensitivity, WEIGHT_PARAMS
 from html_generator import HTMLGenerator
+from progress import ProgressReporter, logging_sink
+from profiling import profiler, finish_profiling
 import config
 
 # Настройка логирования
@@ -25,8 +29,172 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Веса параметров рейтинга полезности: параметр -> (аргумент командной строки, значение по умолчанию, описание)
+WEIGHT_ARGUMENTS = {
+    'substantial_commits': ('--weight-substantial-commits', 0.3, 'Вес для существенных коммитов'),
+    'lines': ('--weight-lines', 0.15, 'Вес для общего количества строк'),
+    'impact': ('--weight-impact', 0.25, 'Вес для влияния коммитов'),
+    'substantive_ratio': ('--weight-substantive-ratio', 0.2, 'Вес для соотношения существенных коммитов'),
+    'revert_penalty': ('--weight-revert-penalty', -0.1, 'Вес для штрафа за revert-коммиты'),
+    'daily_activity': ('--weight-daily-activity', 0.2, 'Вес для ежедневной активности'),
+}
+
+def add_weight_arguments(parser, use_defaults=True):
+    """
+    Добавляет параметры весов рейтинга полезности.
+    
+    Args:
+        parser: парсер аргументов
+        use_defaults: подставлять веса по умолчанию; иначе незаданные веса равны None
+    """
+    parser.add_argument('--weights-file', help='JSON-файл с весами параметров')
+    weight_group = parser.add_argument_group('Параметры весов для расчета полезности')
+    for param, (option, default, help_text) in WEIGHT_ARGUMENTS.items():
+        weight_group.add_argument(option, type=float, default=default if use_defaults else None, help=help_text)
+
+def collect_custom_weights(args):
+    """
+    Собирает пользовательские веса: из файла --weights-file, затем из аргументов
+    командной строки, отличающихся от значений по умолчанию.
+    """
+    custom_weights = {}
+    if args.weights_file:
+        try:
+            with open(args.weights_file, 'r', encoding='utf-8') as f:
+                file_weights = json.load(f)
+                custom_weights.update(file_weights)
+                logger.info(f"Загружены веса из файла: {args.weights_file}")
+        except Exception as e:
+            logger.error(f"Ошибка при загрузке весов из файла: {str(e)}")
+    
+    # Веса из аргументов командной строки перезаписывают загруженные из файла
+    for param, (option, default, _) in WEIGHT_ARGUMENTS.items():
+        value = getattr(args, option[2:].replace('-', '_'))
+        if value is not None and value != default:
+            custom_weights[param] = value
+    
+    # Выводим информацию о пользовательских весах
+    if custom_weights:
+        logger.info("Используются пользовательские веса для расчета рейтинга полезности:")
+        for param, value in custom_weights.items():
+            logger.info(f"  - {param}: {value}")
+    else:
+        logger.info("Используются стандартные веса для расчета рейтинга полезности")
+    return custom_weights
+
+def generate_html_report(output_file, html_output_dir):
+    """Генерирует HTML-отчет по JSON-файлу (имя HTML-файла - по имени JSON-файла)"""
+    base_name = os.path.basename(output_file)
+    name_without_ext = os.path.splitext(base_name)[0]
+    html_filename = name_without_ext + ".html"
+    
+    logger.info(f"Генерируем HTML-отчет с именем {html_filename}")
+    
+    html_gen = HTMLGenerator(
+        output_file, 
+        html_output_dir,
+        html_filename=html_filename
+    )
+    with profiler.stage('generate_html'):
+        html_gen.generate()
+
+def rerank_main(argv):
+    """
+    Подкоманда rerank: пересчет рейтинга полезности и статистики команды
+    по сохраненному JSON-отчету без повторного сбора и анализа данных.
+    """
+    parser = argparse.ArgumentParser(
+        prog='cli.py rerank',
+        description='Пересчет рейтинга полезности по сохраненному отчету с новыми весами',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument('--input-file', default='developer_stats.json', help='Ранее созданный JSON-отчет')
+    parser.add_argument('--output-file', help='Путь к новому JSON-файлу (по умолчанию перезаписывается исходный)')
+    parser.add_argument('--exclude-developers', nargs='+',
+                       help='Список email разработчиков, которых нужно дополнительно исключить из отчета')
+    parser.add_argument('--generate-html', action='store_true', help='Генерировать HTML-отчет')
+    parser.add_argument('--html-output-dir', default='git_stats_report', help='Директория для сохранения HTML-отчета')
+    add_weight_arguments(parser, use_defaults=False)
+    args = parser.parse_args(argv)
+    
+    if not os.path.exists(args.input_file):
+        logger.error(f"Ошибка: файл отчета не существует: {args.input_file}")
+        return 1
+    output_file = args.output_file or args.input_file
+    
+    try:
+        custom_weights = collect_custom_weights(args)
+        rerank_report(args.input_file, output_file, custom_weights=custom_weights,
+                      excluded_developers=args.exclude_developers)
+        logger.info(f"Рейтинг пересчитан. Результаты сохранены в {output_file}")
+        
+        if args.generate_html:
+            generate_html_report(output_file, args.html_output_dir)
+        return 0
+    except Exception as e:
+        logger.error(f"Ошибка при пересчете рейтинга: {str(e)}", exc_info=True)
+        return 1
+
+def sensitivity_main(argv):
+    """
+    Подкоманда sensitivity: анализ устойчивости рейтинга полезности
+    к изменению весов по сохраненному JSON-отчету.
+    """
+    parser = argparse.ArgumentParser(
+        prog='cli.py sensitivity',
+        description='Анализ устойчивости рейтинга полезности к изменению весов',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument('--input-file', default='developer_stats.json', help='Ранее созданный JSON-отчет')
+    parser.add_argument('--output-file', help='Сохранить результаты анализа в JSON-файл')
+    parser.add_argument('--method', choices=['random', 'grid'], default='random',
+                       help='Случайная выборка векторов весов или сетка значений')
+    parser.add_argument('--samples', type=int, default=5000, help='Количество случайных векторов весов')
+    parser.add_argument('--grid-steps', type=int, default=3, help='Количество значений каждого веса в сетке')
+    parser.add_argument('--spread', type=float, default=0.5,
+                       help='Относительный диапазон изменения весов (0.5 - от 50%% до 150%% базового веса)')
+    parser.add_argument('--fixed', nargs='+', choices=WEIGHT_PARAMS, default=[],
+                       help='Параметры, веса которых не изменяются')
+    parser.add_argument('--top-n', type=int, default=3, help='Размер группы лидеров')
+    parser.add_argument('--seed', type=int, help='Зерно генератора случайных чисел')
+    add_weight_arguments(parser, use_defaults=False)
+    args = parser.parse_args(argv)
+    
+    if not os.path.exists(args.input_file):
+        logger.error(f"Ошибка: файл отчета не существует: {args.input_file}")
+        return 1
+    
+    try:
+        report = load_report(args.input_file)
+        # Базовые веса - веса отчета, переопределенные аргументами командной строки
+        weights = dict(report.get('weights_used', {}))
+        weights.update(collect_custom_weights(args))
+        
+        with profiler.stage('sensitivity'):
+            result = analyze_sensitivity(
+                report['developers'], weights, top_n=args.top_n,
+                spread=args.spread, samples=args.samples, method=args.method,
+                grid_steps=args.grid_steps, fixed=args.fixed, seed=args.seed
+            )
+        print(format_sensitivity(result))
+        
+        if args.output_file:
+            with open(args.output_file, 'w', encoding='utf-8') as f:
+                json.dump(result, f, indent=2, ensure_ascii=False)
+            logger.info(f"Результаты анализа устойчивости сохранены в {args.output_file}")
+        return 0
+    except Exception as e:
+        logger.error(f"Ошибка при анализе устойчивости рейтинга: {str(e)}", exc_info=True)
+        return 1
+
 def main():
     """Основная функция для запуска анализа через командную строку"""
+    # Подкоманды, работающие с готовым отчетом
+    if len(sys.argv) > 1 and sys.argv[1] == 'rerank':
+        return rerank_main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == 'sensitivity':
+        return sensitivity_main(sys.argv[2:])
+    
     parser = argparse.ArgumentParser(
         description='Git Developer Productivity Analyzer - CLI',
         formatter_class=argparse.ArgumentDefaultsHelpFormatter
@@ -41,6 +209,41 @@ def main():
     parser.add_argument('--start-date', help='Начальная дата для анализа (YYYY-MM-DD)')
     parser.add_argument('--end-date', help='Конечная дата для анализа (YYYY-MM-DD)')
     parser.add_argument('--min-changes', type=int, default=5, help='Минимальное количество изменений для существенного коммита')
+    parser.add_argument('--collection-mode', choices=['per_commit', 'streaming', 'native'], default=config.COLLECTION_MODE,
+                       help='Режим сбора данных: отдельные вызовы git show, один поток git log или чтение объектов без git '
+                           '(native - приближенный: количество строк может немного отличаться от git, '
+                           'переименования учитываются как удаление и добавление)')
+    parser.add_argument('--object-backend', choices=['show', 'cat-file', 'native'], default=config.OBJECT_BACKEND,
+                       help='Источник содержимого файлов для diff: git show на каждый файл, постоянный git cat-file --batch или чтение объектов без git')
+    parser.add_argument('--workers', type=int, default=config.COLLECTION_WORKERS,
+                       help='Количество процессов для параллельного сбора данных (0 - по количеству ядер)')
+    parser.add_argument('--cache', action='store_true',
+                       help='Использовать постоянный кэш и обрабатывать только новые коммиты')
+    parser.add_argument('--cache-path', help='Путь к файлу кэша (по умолчанию внутри каталога .git репозитория)')
+    parser.add_argument('--score-cache', action='store_true',
+                       help='Сохранять оценки diff между запусками (одинаковые изменения не оцениваются повторно)')
+    parser.add_argument('--score-cache-path', help='Путь к файлу кэша оценок diff (по умолчанию внутри каталога .git репозитория)')
+    parser.add_argument('--score-cache-size', type=int,
+                       help='Количество оценок diff в памяти (включает кэш оценок в пределах запуска; 0 - отключен)')
+    parser.add_argument('--streaming-analysis', action='store_true',
+                       help='Анализировать коммиты по мере сбора, не храня всю историю в памяти')
+    parser.add_argument('--compact', action='store_true',
+                       help='Не хранить сырой вывод git и тексты diff в собранных данных')
+    parser.add_argument('--diff-store', action='store_true',
+                       help='В компактном режиме сохранять тексты diff на диск с адресацией по хэшу')
+    parser.add_argument('--diff-store-path', help='Каталог хранилища diff (по умолчанию внутри каталога .git репозитория)')
+    parser.add_argument('--numstat-fast-path', action='store_true',
+                       help='В потоковом режиме определять существенность по git log --numstat без получения текста патчей')
+    parser.add_argument('--columnar', action='store_true',
+                       help='Колоночный анализ: метрики по коммитам вычисляются групповыми операциями над массивами')
+    parser.add_argument('--approximate-file-stats', action='store_true',
+                       help='Приближенная статистика файлов (HyperLogLog и Misra-Gries) с ограниченной памятью')
+    parser.add_argument('--distinct-error', type=float, default=0.01,
+                       help='Относительная ошибка оценки количества файлов в приближенном режиме (по умолчанию: 0.01)')
+    parser.add_argument('--top-files-error', type=float, default=0.001,
+                       help='Максимальное занижение частоты файла в приближенном режиме, доля изменений (по умолчанию: 0.001)')
+    parser.add_argument('--intern-paths', action='store_true',
+                       help='Записывать пути файлов в JSON один раз (таблица string_tables.paths), а в статистике - их id')
     
     # Параметры HTML-отчета
     parser.add_argument('--generate-html', action='store_true', help='Генерировать HTML-отчет')
@@ -56,23 +259,15 @@ def main():
     parser.add_argument('--verbose', '-v', action='store_true', help='Включить подробное логирование')
     parser.add_argument('--log-file', help='Файл для сохранения лога')
     
-    # Опция загрузки весов из файла
-    parser.add_argument('--weights-file', help='JSON-файл с весами параметров')
+    # Профилирование
+    parser.add_argument('--profile', action='store_true',
+                       help='Профилировать этапы анализа: время, пиковая память, запуски git и объем прочитанных данных')
+    parser.add_argument('--profile-output', help='Сохранить профиль cProfile в файл (включает --profile)')
+    parser.add_argument('--trace-output',
+                       help='Сохранить timeline этапов в формате Chrome trace_event JSON (включает --profile)')
     
-    # Веса параметров
-    weight_group = parser.add_argument_group('Параметры весов для расчета полезности')
-    weight_group.add_argument('--weight-substantial-commits', type=float, default=0.3,
-                            help='Вес для существенных коммитов')
-    weight_group.add_argument('--weight-lines', type=float, default=0.15,
-                            help='Вес для общего количества строк')
-    weight_group.add_argument('--weight-impact', type=float, default=0.25,
-                            help='Вес для влияния коммитов')
-    weight_group.add_argument('--weight-substantive-ratio', type=float, default=0.2,
-                            help='Вес для соотношения существенных коммитов')
-    weight_group.add_argument('--weight-revert-penalty', type=float, default=-0.1,
-                            help='Вес для штрафа за revert-коммиты')
-    weight_group.add_argument('--weight-daily-activity', type=float, default=0.2,
-                            help='Вес для ежедневной активности')
+    # Загрузка весов из файла и веса параметров
+    add_weight_arguments(parser)
     
     args = parser.parse_args()
     
@@ -101,6 +296,25 @@ def main():
     config.START_DATE = args.start_date
     config.END_DATE = args.end_date
     config.MIN_CODE_CHANGE_SIZE = args.min_changes
+    config.COLLECTION_MODE = args.collection_mode
+    config.COLLECTION_WORKERS = args.workers
+    config.OBJECT_BACKEND = args.object_backend
+    config.CACHE_ENABLED = args.cache
+    config.CACHE_PATH = args.cache_path
+    config.SCORE_CACHE_ENABLED = args.score_cache
+    config.SCORE_CACHE_PATH = args.score_cache_path
+    if args.score_cache_size is not None:
+        config.DIFF_SCORE_CACHE_SIZE = args.score_cache_size
+    config.STREAMING_ANALYSIS = args.streaming_analysis
+    config.COMPACT_COLLECTION = args.compact
+    config.DIFF_STORE_ENABLED = args.diff_store
+    config.DIFF_STORE_PATH = args.diff_store_path
+    config.NUMSTAT_FAST_PATH = args.numstat_fast_path
+    config.COLUMNAR_ANALYSIS = args.columnar
+    config.APPROXIMATE_FILE_STATS = args.approximate_file_stats
+    config.APPROXIMATE_DISTINCT_ERROR = args.distinct_error
+    config.APPROXIMATE_TOP_FILES_ERROR = args.top_files_error
+    config.INTERN_OUTPUT_PATHS = args.intern_paths
     
     # Создаем директорию для выходного файла, если она не существует
     output_dir = os.path.dirname(os.path.abspath(args.output_file))
@@ -109,84 +323,59 @@ def main():
     
     logger.info(f"Начинаем анализ репозитория: {args.repo_path}")
     
+    if args.profile or args.profile_output or args.trace_output:
+        profiler.enable(track_memory=True, cprofile=bool(args.profile_output))
+    
     try:
         # Собираем данные из Git
-        collector = GitDataCollector(args.repo_path)
-        git_data = collector.collect_data()
+        progress = ProgressReporter()
+        progress.subscribe(logging_sink(logger))
+        collector = GitDataCollector(args.repo_path, progress=progress)
         
-        logger.info(f"Собрано {len(git_data['commits'])} коммитов")
-        
-        # Анализируем данные
-        analyzer = DevActivityAnalyzer(git_data)
-        analysis_results = analyzer.analyze()
+        if config.STREAMING_ANALYSIS:
+            # Анализируем коммиты по мере их получения
+            analyzer = DevActivityAnalyzer()
+            with profiler.stage('collect_and_analyze'):
+                analysis_results = analyzer.analyze_stream(collector.iter_records())
+        else:
+            with profiler.stage('collect_data'):
+                git_data = collector.collect_data()
+            
+            logger.info(f"Собрано {len(git_data['commits'])} коммитов")
+            
+            # Анализируем данные
+            analyzer = DevActivityAnalyzer(git_data)
+            with profiler.stage('analyze'):
+                analysis_results = analyzer.analyze()
         
         logger.info(f"Проанализировано {len(analysis_results)} разработчиков")
         
-        # Загружаем веса из файла, если указан
-        custom_weights = {}
-        if args.weights_file:
-            try:
-                import json
-                with open(args.weights_file, 'r', encoding='utf-8') as f:
-                    file_weights = json.load(f)
-                    custom_weights.update(file_weights)
-                    logger.info(f"Загружены веса из файла: {args.weights_file}")
-            except Exception as e:
-                logger.error(f"Ошибка при загрузке весов из файла: {str(e)}")
-        
-        # Добавляем веса из аргументов командной строки (перезаписывают загруженные из файла)
-        if args.weight_substantial_commits != 0.3:
-            custom_weights['substantial_commits'] = args.weight_substantial_commits
-        if args.weight_lines != 0.15:
-            custom_weights['lines'] = args.weight_lines
-        if args.weight_impact != 0.25:
-            custom_weights['impact'] = args.weight_impact
-        if args.weight_substantive_ratio != 0.2:
-            custom_weights['substantive_ratio'] = args.weight_substantive_ratio
-        if args.weight_revert_penalty != -0.1:
-            custom_weights['revert_penalty'] = args.weight_revert_penalty
-        if args.weight_daily_activity != 0.2:
-            custom_weights['daily_activity'] = args.weight_daily_activity
-        
-        # Выводим информацию о пользовательских весах
-        if custom_weights:
-            logger.info("Используются пользовательские веса для расчета рейтинга полезности:")
-            for param, value in custom_weights.items():
-                logger.info(f"  - {param}: {value}")
-        else:
-            logger.info("Используются стандартные веса для расчета рейтинга полезности")
+        # Загружаем веса из файла и аргументов командной строки
+        custom_weights = collect_custom_weights(args)
         
         # Генерируем выходные данные
         output_generator = JSONOutputGenerator(analysis_results)
-        output_data = output_generator.generate_output(
-            args.output_file, 
-            custom_weights=custom_weights if custom_weights else None,
-            excluded_developers=args.exclude_developers
-        )
+        with profiler.stage('generate_output'):
+            output_data = output_generator.generate_output(
+                args.output_file, 
+                custom_weights=custom_weights if custom_weights else None,
+                excluded_developers=args.exclude_developers
+            )
         
         logger.info(f"Анализ завершен. Результаты сохранены в {args.output_file}")
         
         # Генерируем HTML-отчет, если это запрошено
         if args.generate_html:
-            # Определяем имя HTML-файла на основе имени JSON-файла
-            base_name = os.path.basename(args.output_file)
-            name_without_ext = os.path.splitext(base_name)[0]
-            html_filename = name_without_ext + ".html"
-            
-            logger.info(f"Генерируем HTML-отчет с именем {html_filename}")
-            
-            html_gen = HTMLGenerator(
-                args.output_file, 
-                args.html_output_dir,
-                html_filename=html_filename
-            )
-            html_gen.generate()
+            generate_html_report(args.output_file, args.html_output_dir)
         
         return 0
     
     except Exception as e:
         logger.error(f"Ошибка при выполнении анализа: {str(e)}", exc_info=True)
         return 1
+    
+    finally:
+        finish_profiling(args.profile_output, args.trace_output, log=logger.info)
 
 if __name__ == "__main__":
     sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+import sqlite3
+import config
+from records import CommitStats, CommitDetail, FileChange
+
+class CollectionCache:
+    """
+    Постоянное хранилище результатов сбора данных по коммитам на основе SQLite.
+
+    Записи хранятся по хэшу коммита и отпечатку настроек config, влияющих на
+    результат сбора, поэтому изменение настроек не приводит к использованию
+    устаревших оценок существенности.
+    """
+
+    # Версия формата записей; увеличивается при изменении структуры данных
+    SCHEMA_VERSION = 1
+
+    # Максимальное количество параметров в одном SQL-запросе
+    _QUERY_BATCH_SIZE = 500
+
+    def __init__(self, db_path, fingerprint=None):
+        self.db_path = db_path
+        self.fingerprint = fingerprint or self.config_fingerprint()
+
+        db_dir = os.path.dirname(os.path.abspath(db_path))
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+
+        self.connection = sqlite3.connect(db_path)
+        self.connection.execute('''
+            CREATE TABLE IF NOT EXISTS commits (
+                hash TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                metadata TEXT NOT NULL,
+                stats TEXT NOT NULL,
+                file_changes TEXT NOT NULL,
+                PRIMARY KEY (hash, fingerprint)
+            )
+        ''')
+        self.connection.commit()
+
+    @staticmethod
+    def default_path(repo_path):
+        """Возвращает путь к файлу кэша по умолчанию внутри каталога .git репозитория."""
+        return os.path.join(repo_path, '.git', 'dev_productivity_cache.sqlite')
+
+    @classmethod
+    def config_fingerprint(cls):
+        """Вычисляет отпечаток настроек, от которых зависят сохраняемые результаты."""
+        settings = {
+            'schema_version': cls.SCHEMA_VERSION,
+            'min_code_change_size': config.MIN_CODE_CHANGE_SIZE,
+            'ignore_whitespace_only': config.IGNORE_WHITESPACE_ONLY,
+            'advanced_change_analysis': getattr(config, 'ADVANCED_CHANGE_ANALYSIS', False),
+            'ignored_files': sorted(config.IGNORED_FILES),
+            'numstat_fast_path': getattr(config, 'NUMSTAT_FAST_PATH', False),
+            # Режим сбора и источник объектов влияют на текст diff и оценки существенности
+            # (переименования в режиме native, пути в кавычках, построение diff в Python)
+            'collection_mode': getattr(config, 'COLLECTION_MODE', 'per_commit'),
+            'object_backend': getattr(config, 'OBJECT_BACKEND', 'show'),
+        }
+        encoded = json.dumps(settings, sort_keys=True).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
+
+    def load(self, commit_hashes):
+        """
+        Загружает сохраненные результаты для указанных коммитов.
+
+        Args:
+            commit_hashes: список хэшей коммитов
+
+        Returns:
+            dict: хэш коммита -> (commit_detail, file_changes) для найденных коммитов
+        """
+        results = {}
+        for start in range(0, len(commit_hashes), self._QUERY_BATCH_SIZE):
+            batch = commit_hashes[start:start + self._QUERY_BATCH_SIZE]
+            placeholders = ','.join('?' * len(batch))
+            rows = self.connection.execute(
+                f'SELECT hash, stats, file_changes FROM commits '
+                f'WHERE fingerprint = ? AND hash IN ({placeholders})',
+                [self.fingerprint] + list(batch)
+            )
+            compact = getattr(config, 'COMPACT_COLLECTION', False)
+            for commit_hash, stats, file_changes in rows:
+                # Сырой вывод git и тексты diff в кэше не хранятся
+                stats = CommitStats.from_dict(json.loads(stats))
+                if compact:
+                    commit_detail = CommitDetail(stats)
+                    changes = [FileChange.from_dict(change) for change in json.loads(file_changes)]
+                else:
+                    commit_detail = CommitDetail(stats, raw_output='')
+                    changes = [FileChange.from_dict(dict(change, diff='')) for change in json.loads(file_changes)]
+                results[commit_hash] = (commit_detail, changes)
+        return results
+
+    def store(self, commits, commit_details, file_changes):
+        """
+        Сохраняет результаты сбора данных для коммитов.
+
+        Args:
+            commits: список записей коммитов
+            commit_details: словарь хэш -> детали коммита
+            file_changes: словарь хэш -> список изменений файлов
+        """
+        rows = []
+        for commit in commits:
+            commit_hash = commit['hash']
+            if commit_hash not in commit_details or commit_hash not in file_changes:
+                continue
+
+            changes = [
+                {key: value for key, value in change.items() if key != 'diff'}
+                for change in file_changes[commit_hash]
+            ]
+            rows.append((
+                commit_hash,
+                self.fingerprint,
+                json.dumps(dict(commit.items()), ensure_ascii=False),
+                json.dumps(dict(commit_details[commit_hash]['stats'].items())),
+                json.dumps(changes, ensure_ascii=False)
+            ))
+
+        with self.connection:
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO commits (hash, fingerprint, metadata, stats, file_changes) '
+                'VALUES (?, ?, ?, ?, ?)',
+                rows
+            )
+
+    def close(self):
+        """Закрывает соединение с базой данных."""
+        self.connection.close()
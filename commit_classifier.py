@@ -0,0 +1,137 @@
+import re
+from functools import lru_cache
+
+# Ключевые слова темы коммита, определяющие его признаки
+REVERT_KEYWORDS = ('revert',)
+MERGE_KEYWORDS = ('merge',)
+SQUASH_KEYWORDS = ('squash', 'merge', 'объединены изменения', 'combine')
+FLAG_KEYWORDS = tuple(dict.fromkeys(REVERT_KEYWORDS + MERGE_KEYWORDS + SQUASH_KEYWORDS))
+
+# Веса типов коммитов по ключевым словам (ChangeAnalyzer.commit_type_weights по умолчанию)
+DEFAULT_COMMIT_TYPE_WEIGHTS = {
+    'fix': 1.2,       # Исправления оцениваются выше
+    'bug': 1.2,       # Исправления багов
+    'hotfix': 1.3,    # Срочные исправления
+    'feat': 1.1,      # Новые функции
+    'feature': 1.1,   # Новые функции
+    'refactor': 1.0,  # Рефакторинг
+    'perf': 1.2,      # Оптимизация производительности
+    'test': 0.8,      # Тестирование
+    'docs': 0.7,      # Документация
+    'style': 0.6,     # Стилевые изменения
+    'chore': 0.5,     # Рутинные задачи
+}
+
+# Тип конвенционального коммита (fix:, feat(scope):, ...)
+_CONVENTIONAL_TYPE = re.compile(r'^(\w+)(\([\w-]+\))?:')
+
+def _trie_pattern(keywords):
+    """
+    Регулярное выражение, совпадающее с любым из keywords, построенное по префиксному
+    дереву: ветви выбираются по очередному символу, поэтому время проверки позиции
+    не растет линейно с количеством ключевых слов. Из слов с общим началом
+    выбирается самое длинное.
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = None  # Конец ключевого слова
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            return f'(?:{body})?'
+        return body
+
+    return build(trie)
+
+class KeywordMatcher:
+    """
+    Поиск всех ключевых слов набора в тексте за один проход.
+
+    Выражение из префиксного дерева (_trie_pattern) проверяется в каждой позиции
+    текста через опережающую проверку (?=...), поэтому находятся и перекрывающиеся
+    вхождения ('fix' внутри 'hotfix'). В позиции находится самое длинное слово,
+    более короткие слова с тем же началом добавляются по заранее вычисленной таблице.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = tuple(dict.fromkeys(keyword for keyword in keywords if keyword))
+        self._prefixes = {
+            keyword: tuple(other for other in self.keywords if keyword.startswith(other))
+            for keyword in self.keywords
+        }
+        self._finditer = re.compile(f'(?=({_trie_pattern(self.keywords)}))').finditer if self.keywords else None
+
+    def find(self, text):
+        """Возвращает множество ключевых слов, входящих в text."""
+        if self._finditer is None:
+            return frozenset()
+        found = set()
+        for match in self._finditer(text):
+            found.update(self._prefixes[match.group(1)])
+        return frozenset(found)
+
+class SubjectClassification:
+    """Результат классификации темы коммита (см. CommitClassifier)."""
+
+    __slots__ = ('keywords', 'conventional_type')
+
+    def __init__(self, keywords, conventional_type=None):
+        self.keywords = keywords                    # Найденные ключевые слова (frozenset)
+        self.conventional_type = conventional_type  # Тип конвенционального коммита или None
+
+    def has_any(self, keywords):
+        """True, если в теме найдено хотя бы одно из keywords."""
+        return not self.keywords.isdisjoint(keywords)
+
+    @property
+    def is_revert(self):
+        return self.has_any(REVERT_KEYWORDS)
+
+    @property
+    def is_merge(self):
+        return self.has_any(MERGE_KEYWORDS)
+
+    @property
+    def is_squash(self):
+        return self.has_any(SQUASH_KEYWORDS)
+
+class CommitClassifier:
+    """
+    Классификация тем коммитов одним автоматом ключевых слов.
+
+    Автомат ищет одновременно ключевые слова признаков (revert, merge, squash)
+    и ключевые слова типов коммитов type_keywords (например, ключи
+    ChangeAnalyzer.commit_type_weights). Поиск ведется без учета регистра;
+    результат для каждой темы кэшируется, поэтому тема, которую проверяют
+    сборщик, анализатор изменений и анализатор статистики, разбирается один раз.
+    """
+
+    def __init__(self, type_keywords=(), cache_size=65536):
+        self.type_keywords = tuple(keyword.lower() for keyword in type_keywords)
+        self.matcher = KeywordMatcher(FLAG_KEYWORDS + self.type_keywords)
+        self.classify = lru_cache(maxsize=cache_size)(self._classify)
+
+    def _classify(self, subject):
+        """Возвращает SubjectClassification для темы (или сообщения) коммита."""
+        text = subject.lower()
+        match = _CONVENTIONAL_TYPE.match(text)
+        return SubjectClassification(self.matcher.find(text), match.group(1) if match else None)
+
+@lru_cache(maxsize=8)
+def classifier_for(type_keywords):
+    """Общий классификатор для набора ключевых слов типов (кортеж)."""
+    return CommitClassifier(type_keywords)
+
+def default_classifier():
+    """
+    Классификатор с ключевыми словами DEFAULT_COMMIT_TYPE_WEIGHTS; его же использует
+    ChangeAnalyzer с весами по умолчанию, поэтому кэш классификации тем общий.
+    """
+    return classifier_for(tuple(DEFAULT_COMMIT_TYPE_WEIGHTS))
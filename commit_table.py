@@ -0,0 +1,294 @@
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен: без него используется реализация на циклах
+    np = None
+
+from utils import OFFSET_BUCKET_SECONDS, utc_offset, local_seconds, local_time_keys, month_of_day
+
+# Флаги коммита
+FLAG_REVERT = 1
+FLAG_MERGE = 2
+FLAG_SUBSTANTIAL = 4
+
+# Части суток в порядке идентификаторов и соответствие часа части суток
+TIME_PERIODS = ['morning', 'afternoon', 'evening', 'night']
+PERIOD_BY_HOUR = [3] * 6 + [0] * 6 + [1] * 6 + [2] * 5 + [3]  # Ночь (23-6), утро (6-12), день (12-18), вечер (18-23)
+
+# Размеры коммитов: < 10 строк, 10-50 строк, > 50 строк
+COMMIT_SIZES = ['small', 'medium', 'large']
+
+def commit_size(changes):
+    """Категория размера коммита по количеству измененных строк."""
+    return 'small' if changes < 10 else 'medium' if changes < 50 else 'large'
+
+# Интервалы между коммитами длиннее этого порога считаются перерывами в работе
+MAX_WORK_INTERVAL_HOURS = 16
+
+class CommitTable:
+    """
+    Колоночное представление истории коммитов.
+
+    Каждая колонка - массив (array или, при наличии, NumPy) с одним значением
+    на коммит: время, идентификатор разработчика, добавленные и удаленные строки,
+    количество файлов и флаги. Распределения и метрики по разработчикам
+    вычисляются групповыми операциями над колонками вместо обновления
+    словарей и разбора дат для каждого коммита.
+
+    Время группируется по местному времени, как и в построчном анализе.
+    """
+
+    def __init__(self):
+        self.developers = []  # Идентификатор разработчика -> ключ (email в нижнем регистре)
+        self._developer_ids = {}
+        self.timestamps = array('q')
+        self.developer_ids = array('l')
+        self.insertions = array('q')
+        self.deletions = array('q')
+        self.files_changed = array('q')
+        self.flags = array('B')
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def append(self, developer, timestamp, stats, is_revert=False, is_merge=False, is_substantial=False):
+        """
+        Добавляет коммит в таблицу.
+
+        Args:
+            developer: ключ разработчика
+            timestamp: время коммита (секунды от начала эпохи)
+            stats: статистика коммита (insertions, deletions, files_changed)
+            is_revert, is_merge, is_substantial: флаги коммита
+        """
+        developer_id = self._developer_ids.get(developer)
+        if developer_id is None:
+            developer_id = self._developer_ids[developer] = len(self.developers)
+            self.developers.append(developer)
+
+        self.timestamps.append(int(timestamp))
+        self.developer_ids.append(developer_id)
+        self.insertions.append(stats.get('insertions', 0))
+        self.deletions.append(stats.get('deletions', 0))
+        self.files_changed.append(stats.get('files_changed', 0))
+        self.flags.append(
+            (FLAG_REVERT if is_revert else 0) |
+            (FLAG_MERGE if is_merge else 0) |
+            (FLAG_SUBSTANTIAL if is_substantial else 0)
+        )
+
+    def aggregate(self):
+        """
+        Вычисляет агрегаты по разработчикам.
+
+        Returns:
+            dict: ключ разработчика -> словарь с полями total_commits, reverts_count,
+                  merge_count, substantial_commits, lines_added, lines_removed,
+                  commit_impact, first_timestamp, last_timestamp, commit_distribution,
+                  time_of_day_distribution, commit_sizes, avg_commit_interval_hours
+                  (None, если интервалов нет) и daily_variability
+        """
+        if not len(self):
+            return {}
+        if np is not None:
+            return self._aggregate_numpy()
+        return self._aggregate_python()
+
+    def _aggregate_python(self):
+        """Агрегация циклами по колонкам (без NumPy)."""
+        results = [self._empty_result() for _ in self.developers]
+        timelines = [[] for _ in self.developers]
+
+        for timestamp, developer_id, insertions, deletions, files_changed, flags in zip(
+                self.timestamps, self.developer_ids, self.insertions, self.deletions,
+                self.files_changed, self.flags):
+            result = results[developer_id]
+            changes = insertions + deletions
+
+            result['total_commits'] += 1
+            result['lines_added'] += insertions
+            result['lines_removed'] += deletions
+            result['commit_impact'] += files_changed * changes
+            if flags & FLAG_REVERT:
+                result['reverts_count'] += 1
+            if flags & FLAG_MERGE:
+                result['merge_count'] += 1
+            if flags & FLAG_SUBSTANTIAL:
+                result['substantial_commits'] += 1
+            if result['first_timestamp'] is None or timestamp < result['first_timestamp']:
+                result['first_timestamp'] = timestamp
+            if result['last_timestamp'] is None or timestamp > result['last_timestamp']:
+                result['last_timestamp'] = timestamp
+
+            _, month, hour = local_time_keys(timestamp)
+            distribution = result['commit_distribution']
+            distribution[month] = distribution.get(month, 0) + 1
+
+            period = TIME_PERIODS[PERIOD_BY_HOUR[hour]]
+            time_of_day = result['time_of_day_distribution']
+            time_of_day[period] = time_of_day.get(period, 0) + 1
+
+            result['commit_sizes'][commit_size(changes)] += 1
+
+            timelines[developer_id].append(local_seconds(timestamp))
+
+        for result, timeline in zip(results, timelines):
+            timeline.sort()
+            gaps = ((current - previous) / 3600 for previous, current in zip(timeline, timeline[1:]))
+            intervals = [hours for hours in gaps if hours < MAX_WORK_INTERVAL_HOURS]
+            if intervals:
+                result['avg_commit_interval_hours'] = sum(intervals) / len(intervals)
+
+            daily_commits = {}
+            for local_time in timeline:
+                day = local_time // 86400
+                daily_commits[day] = daily_commits.get(day, 0) + 1
+            result['daily_variability'] = self._variability(list(daily_commits.values()))
+
+        return dict(zip(self.developers, results))
+
+    def _aggregate_numpy(self):
+        """Векторизованная агрегация групповыми операциями NumPy."""
+        developer_count = len(self.developers)
+        developer_ids = np.frombuffer(self.developer_ids, dtype=np.dtype(f'i{self.developer_ids.itemsize}')).astype(np.int64)
+        timestamps = np.frombuffer(self.timestamps, dtype=np.int64)
+        insertions = np.frombuffer(self.insertions, dtype=np.int64)
+        deletions = np.frombuffer(self.deletions, dtype=np.int64)
+        files_changed = np.frombuffer(self.files_changed, dtype=np.int64)
+        flags = np.frombuffer(self.flags, dtype=np.uint8)
+        changes = insertions + deletions
+
+        def group_sum(values):
+            return np.bincount(developer_ids, weights=values, minlength=developer_count).astype(np.int64)
+
+        totals = np.bincount(developer_ids, minlength=developer_count)
+        lines_added = group_sum(insertions)
+        lines_removed = group_sum(deletions)
+        impact = group_sum(files_changed * changes)
+        reverts = group_sum((flags & FLAG_REVERT) != 0)
+        merges = group_sum((flags & FLAG_MERGE) != 0)
+        substantial = group_sum((flags & FLAG_SUBSTANTIAL) != 0)
+
+        first = np.full(developer_count, np.iinfo(np.int64).max, dtype=np.int64)
+        last = np.full(developer_count, np.iinfo(np.int64).min, dtype=np.int64)
+        np.minimum.at(first, developer_ids, timestamps)
+        np.maximum.at(last, developer_ids, timestamps)
+
+        # Местное время: смещение вычисляется один раз для каждого 15-минутного интервала
+        buckets, bucket_index = np.unique(timestamps // OFFSET_BUCKET_SECONDS, return_inverse=True)
+        offsets = np.array([utc_offset(int(bucket) * OFFSET_BUCKET_SECONDS) for bucket in buckets], dtype=np.int64)
+        local_times = timestamps + offsets[bucket_index.reshape(-1)]
+        days = local_times // 86400
+        hours = local_times % 86400 // 3600
+
+        # Месяцы: ключ вычисляется один раз для каждого уникального дня
+        unique_days, day_index = np.unique(days, return_inverse=True)
+        day_index = day_index.reshape(-1)
+        month_keys = []
+        month_ids = {}
+        day_months = np.empty(len(unique_days), dtype=np.int64)
+        for i, day in enumerate(unique_days):
+            key = month_of_day(int(day))
+            if key not in month_ids:
+                month_ids[key] = len(month_keys)
+                month_keys.append(key)
+            day_months[i] = month_ids[key]
+        months = day_months[day_index]
+
+        periods = np.array(PERIOD_BY_HOUR, dtype=np.int64)[hours]
+        sizes = np.where(changes < 10, 0, np.where(changes < 50, 1, 2))
+        size_counts = np.bincount(developer_ids * len(COMMIT_SIZES) + sizes,
+                                  minlength=developer_count * len(COMMIT_SIZES)).reshape(developer_count, -1)
+
+        distributions = self._ordered_pair_counts(developer_ids, months, len(month_keys), developer_count)
+        time_of_day = self._ordered_pair_counts(developer_ids, periods, len(TIME_PERIODS), developer_count)
+
+        # Интервалы между соседними по времени коммитами одного разработчика
+        order = np.lexsort((local_times, developer_ids))
+        sorted_ids = developer_ids[order]
+        sorted_times = local_times[order]
+        interval_hours = (sorted_times[1:] - sorted_times[:-1]) / 3600
+        within = (sorted_ids[1:] == sorted_ids[:-1]) & (interval_hours < MAX_WORK_INTERVAL_HOURS)
+        interval_ids = sorted_ids[1:][within]
+        interval_sums = np.bincount(interval_ids, weights=interval_hours[within], minlength=developer_count)
+        interval_counts = np.bincount(interval_ids, minlength=developer_count)
+
+        # Коэффициент вариации количества коммитов по дням
+        pairs, pair_counts = np.unique(developer_ids * len(unique_days) + day_index, return_counts=True)
+        pair_ids = pairs // len(unique_days)
+        active_days = np.bincount(pair_ids, minlength=developer_count)
+        daily_mean = np.bincount(pair_ids, weights=pair_counts, minlength=developer_count) / np.maximum(active_days, 1)
+        squared_diff = np.bincount(pair_ids, weights=(pair_counts - daily_mean[pair_ids]) ** 2, minlength=developer_count)
+
+        results = {}
+        for developer_id, developer in enumerate(self.developers):
+            result = self._empty_result()
+            result.update({
+                'total_commits': int(totals[developer_id]),
+                'reverts_count': int(reverts[developer_id]),
+                'merge_count': int(merges[developer_id]),
+                'substantial_commits': int(substantial[developer_id]),
+                'lines_added': int(lines_added[developer_id]),
+                'lines_removed': int(lines_removed[developer_id]),
+                'commit_impact': int(impact[developer_id]),
+                'first_timestamp': int(first[developer_id]),
+                'last_timestamp': int(last[developer_id]),
+                'commit_distribution': {month_keys[key]: count for key, count in distributions[developer_id]},
+                'time_of_day_distribution': {TIME_PERIODS[key]: count for key, count in time_of_day[developer_id]},
+                'commit_sizes': dict(zip(COMMIT_SIZES, (int(count) for count in size_counts[developer_id]))),
+            })
+            if interval_counts[developer_id]:
+                result['avg_commit_interval_hours'] = float(interval_sums[developer_id]) / int(interval_counts[developer_id])
+            mean = float(daily_mean[developer_id])
+            if active_days[developer_id] and mean > 0:
+                result['daily_variability'] = (float(squared_diff[developer_id]) / int(active_days[developer_id])) ** 0.5 / mean
+            results[developer] = result
+        return results
+
+    @staticmethod
+    def _ordered_pair_counts(developer_ids, keys, key_count, developer_count):
+        """
+        Считает пары (разработчик, ключ).
+
+        Returns:
+            list: для каждого разработчика список (ключ, количество) в порядке
+                  первого появления ключа у разработчика
+        """
+        pairs, first_index, counts = np.unique(developer_ids * key_count + keys,
+                                               return_index=True, return_counts=True)
+        result = [[] for _ in range(developer_count)]
+        for position in np.argsort(first_index, kind='stable'):
+            pair = int(pairs[position])
+            result[pair // key_count].append((pair % key_count, int(counts[position])))
+        return result
+
+    @staticmethod
+    def _variability(counts):
+        """Коэффициент вариации (стандартное отклонение / среднее) или None."""
+        if not counts:
+            return None
+        average = sum(counts) / len(counts)
+        if average <= 0:
+            return None
+        squared_diff = sum((count - average) ** 2 for count in counts)
+        return (squared_diff / len(counts)) ** 0.5 / average
+
+    @staticmethod
+    def _empty_result():
+        return {
+            'total_commits': 0,
+            'reverts_count': 0,
+            'merge_count': 0,
+            'substantial_commits': 0,
+            'lines_added': 0,
+            'lines_removed': 0,
+            'commit_impact': 0,
+            'first_timestamp': None,
+            'last_timestamp': None,
+            'commit_distribution': {},
+            'time_of_day_distribution': {},
+            'commit_sizes': {size: 0 for size in COMMIT_SIZES},
+            'avg_commit_interval_hours': None,
+            'daily_variability': None,
+        }
@@ -12,10 +12,88 @@ MIN_CODE_CHANGE_SIZE = 5  # Минимальное количество изме
 IGNORE_WHITESPACE_ONLY = True
 CONSIDER_FILE_COMPLEXITY = True
 
+# Настройки сбора данных
+# 'per_commit' - отдельные вызовы git show для каждого коммита,
+# 'streaming' - один поток git log --raw --numstat -p для всей истории,
+# 'native' - чтение .git/objects (loose-объекты и pack-файлы) внутри процесса без запуска git
+# Режимы 'per_commit' и 'streaming' дают одинаковые данные (для переименований оба оценивают
+# удаление файла по старому пути), кроме путей с не-ASCII символами: git выводит их в кавычках,
+# и покоммитный режим не находит diff по такому пути (изменение несущественно), а потоковый
+# берет diff из вывода git log. Режим 'native' приближенный: переименование учитывается как
+# удаление и добавление, а добавленные и удаленные строки считаются difflib и могут немного
+# отличаться от git --numstat (git выбирает другое выравнивание строк); пути записываются
+# так же, как в выводе git.
+COLLECTION_MODE = 'per_commit'
+
+# Параллельный сбор данных в пуле процессов
+COLLECTION_WORKERS = 1        # 1 - последовательный сбор, 0 - по количеству ядер процессора
+COLLECTION_CHUNK_SIZE = None  # Размер блока коммитов (None - выбирается автоматически)
+
+# Источник содержимого файлов для построения diff в покоммитном режиме:
+# 'show' - отдельный вызов git show на каждый файл,
+# 'cat-file' - постоянный процесс git cat-file --batch и построение diff в Python,
+# 'native' - чтение объектов напрямую из .git/objects
+OBJECT_BACKEND = 'show'
+
+# Ограничения кэшей встроенного чтения объектов
+NATIVE_DELTA_CACHE_SIZE = 64 * 1024 * 1024  # Суммарный размер базовых объектов delta-цепочек (байт)
+NATIVE_TREE_CACHE_SIZE = 4096               # Количество разобранных деревьев, общих для всех коммитов
+
+# Постоянный кэш результатов сбора данных по коммитам (SQLite)
+CACHE_ENABLED = False
+CACHE_PATH = None  # По умолчанию <репозиторий>/.git/dev_productivity_cache.sqlite
+
+# Кэш оценок diff по отпечатку содержимого: одинаковые изменения (cherry-pick,
+# backport) оцениваются один раз. По умолчанию отключен; включается размером кэша
+# в памяти или сохранением между запусками (тогда в памяти по умолчанию 65536 оценок)
+DIFF_SCORE_CACHE_SIZE = 0      # Количество оценок в памяти (0 - кэш отключен)
+SCORE_CACHE_ENABLED = False    # Сохранять оценки между запусками (SQLite)
+SCORE_CACHE_PATH = None        # По умолчанию <репозиторий>/.git/dev_productivity_scores.sqlite
+
+# Потоковый анализ: коммиты передаются анализатору по одному сразу после сбора,
+# без накопления всей истории (и текстов diff) в памяти
+STREAMING_ANALYSIS = False
+STREAMING_BATCH_SIZE = 500  # Размер блока коммитов в покоммитном режиме
+
+# Компактное представление собранных данных: вместо сырого вывода git и текстов diff
+# сохраняются только производные поля (статистика, флаги) и хэш diff.
+# При включенном DIFF_STORE_ENABLED тексты выгружаются на диск и доступны по хэшу
+COMPACT_COLLECTION = False
+DIFF_STORE_ENABLED = False
+DIFF_STORE_PATH = None  # По умолчанию <репозиторий>/.git/dev_productivity_diffs
+
+# Частота событий прогресса: не чаще одного раза в PROGRESS_INTERVAL секунд
+# или каждые PROGRESS_EVERY коммитов (0 - только по времени)
+PROGRESS_INTERVAL = 0.25
+PROGRESS_EVERY = 0
+
+# Быстрый режим потокового сбора: существенность изменений определяется по счетчикам
+# git log --numstat (с -w для изменений только в пробелах, "-" для бинарных файлов),
+# текст diff запрашивается только для файлов, требующих оценки сложности
+NUMSTAT_FAST_PATH = False
+
+# Колоночный анализ: счетчики, распределения и метрики по коммитам вычисляются
+# групповыми операциями над массивами (NumPy, если установлен, иначе array).
+# Не применяется к потоковому анализу
+COLUMNAR_ANALYSIS = False
+
+# Приближенная статистика файлов для очень больших репозиториев: количество
+# измененных файлов оценивается HyperLogLog, самые изменяемые файлы - скетчем
+# Misra-Gries; память на разработчика не зависит от количества путей.
+# В выводе files_modified и total_files_modified - оценки количества, а не списки
+# (при пересчете отчета с исключением разработчиков - total_files_modified_upper_bound)
+APPROXIMATE_FILE_STATS = False
+APPROXIMATE_DISTINCT_ERROR = 0.01     # Относительная стандартная ошибка количества файлов
+APPROXIMATE_TOP_FILES_ERROR = 0.001   # Максимальное занижение частоты файла (доля изменений файлов разработчика)
+
 # Настройки вывода
 OUTPUT_FILE = 'developer_stats.json'
 INCLUDE_DETAILED_STATS = True
 
+# Таблица путей в JSON: пути файлов записываются один раз в string_tables.paths,
+# а в files_modified, most_modified_files и total_files_modified - их id
+INTERN_OUTPUT_PATHS = False
+
 # Расширенные настройки анализа изменений
 ADVANCED_CHANGE_ANALYSIS = True  # Включает продвинутый анализ изменений
 DEBUG_MODE = False               # Режим отладки с выводом деталей расчета
@@ -0,0 +1,76 @@
+import hashlib
+import os
+import tempfile
+import zlib
+
+class DiffStore:
+    """
+    Хранилище текстов diff и сырого вывода git на диске с адресацией по содержимому.
+
+    Каждый текст сохраняется один раз в сжатом виде под именем, равным его
+    SHA-1, поэтому повторяющиеся diff (например, у сгенерированных файлов)
+    не дублируются. В собранных данных остается только хэш, а сам текст
+    загружается с диска по требованию.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def default_path(repo_path):
+        """Возвращает путь к хранилищу по умолчанию внутри каталога .git репозитория."""
+        return os.path.join(repo_path, '.git', 'dev_productivity_diffs')
+
+    @staticmethod
+    def digest(text):
+        """Вычисляет хэш текста, под которым он хранится."""
+        return hashlib.sha1(text.encode('utf-8', errors='replace')).hexdigest()
+
+    def put(self, text):
+        """
+        Сохраняет текст, если его еще нет в хранилище.
+
+        Returns:
+            str: хэш текста
+        """
+        digest = self.digest(text)
+        path = self._path(digest)
+        if os.path.exists(path):
+            return digest
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        # Пишем во временный файл и переименовываем, чтобы параллельные
+        # процессы сбора не увидели частично записанный объект
+        fd, temp_path = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(zlib.compress(text.encode('utf-8', errors='replace')))
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return digest
+
+    def get(self, digest):
+        """
+        Загружает текст по хэшу.
+
+        Returns:
+            str или None, если текст отсутствует в хранилище
+        """
+        try:
+            with open(self._path(digest), 'rb') as f:
+                return zlib.decompress(f.read()).decode('utf-8')
+        except FileNotFoundError:
+            return None
+
+    def __contains__(self, digest):
+        return os.path.exists(self._path(digest))
+
+    def _path(self, digest):
+        """Путь к файлу объекта: первые два символа хэша образуют подкаталог, как в .git/objects."""
+        return os.path.join(self.root, digest[:2], digest[2:])
@@ -1,22 +1,152 @@
 import os
 import subprocess
 import re
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, redirect_stdout
 from datetime import datetime
 import config
-import sys
 import threading
-from change_analyzer import ChangeAnalyzer
+from change_analyzer import ChangeAnalyzer, diff_statistics
+from path_classifier import classify_path
+from collection_cache import CollectionCache
+from score_cache import DiffScoreCache
+from interning import StringTable
+from diff_store import DiffStore
+from progress import ProgressReporter, console_sink
+from profiling import profiler
+from git_objects import CatFileReader, blob_diff
+from git_native import NativeObjectStore, GITLINK_MODE, quote_path
+from utils import update_developer_info
+from records import Commit, CommitStats, CommitDetail, FileChange
+
+# Нестандартные разделители, которые маловероятны в сообщениях коммитов
+FIELD_SEPARATOR = "<<__GIT_SEPARATOR__>>"
+COMMIT_MARKER = "<<__GIT_COMMIT__>>"
+
+# Поля заголовка коммита в потоковом выводе git log
+LOG_FIELDS = FIELD_SEPARATOR.join(['%H', '%P', '%an', '%ae', '%at', '%s'])
 
 class GitDataCollector:
-    def __init__(self, repo_path):
+    def __init__(self, repo_path, progress=None):
         self.repo_path = repo_path
         self.total_commits = 0  # Общее количество коммитов для отслеживания прогресса
         self.processed_commits = 0  # Количество обработанных коммитов
+        # Источник событий прогресса; по умолчанию прогресс выводится в консоль
+        if progress is None:
+            progress = ProgressReporter()
+            progress.subscribe(console_sink())
+        self.progress = progress
         # Инициализируем улучшенный анализатор изменений
         self.change_analyzer = ChangeAnalyzer()
+        if getattr(config, 'SCORE_CACHE_ENABLED', False):
+            # Оценки diff сохраняются между запусками
+            self.change_analyzer.score_cache = DiffScoreCache(
+                getattr(config, 'DIFF_SCORE_CACHE_SIZE', 0) or DiffScoreCache.DEFAULT_MAX_ENTRIES,
+                db_path=getattr(config, 'SCORE_CACHE_PATH', None) or DiffScoreCache.default_path(repo_path),
+                settings=self.change_analyzer.score_settings()
+            )
+        # Сервис чтения объектов Git, создается при первом обращении
+        self._object_reader = None
+        # Хранилище текстов diff на диске (компактный режим), создается при первом обращении
+        self._diff_store = None
+        # Таблицы строк: одинаковые пути файлов и email авторов хранятся одним объектом
+        self.paths = StringTable()
+        self.identities = StringTable()
+        
+    @property
+    def object_reader(self):
+        """
+        Читатель объектов репозитория: постоянный процесс git cat-file --batch
+        или встроенное чтение каталога .git/objects без запуска git.
+        """
+        if self._object_reader is None:
+            if self._use_native_objects():
+                self._object_reader = NativeObjectStore(
+                    self.repo_path,
+                    delta_cache_size=getattr(config, 'NATIVE_DELTA_CACHE_SIZE', 64 * 1024 * 1024),
+                    tree_cache_size=getattr(config, 'NATIVE_TREE_CACHE_SIZE', 4096)
+                )
+            else:
+                self._object_reader = CatFileReader(self.repo_path)
+        return self._object_reader
+    
+    @property
+    def diff_store(self):
+        """
+        Хранилище текстов diff на диске или None, если сохранение отключено
+        (в компактном режиме тексты тогда отбрасываются).
+        """
+        if self._diff_store is None and getattr(config, 'DIFF_STORE_ENABLED', False):
+            store_path = getattr(config, 'DIFF_STORE_PATH', None) or DiffStore.default_path(self.repo_path)
+            self._diff_store = DiffStore(store_path)
+        return self._diff_store
+    
+    def load_diff(self, file_change):
+        """
+        Возвращает текст diff изменения файла. В компактном режиме текст
+        загружается из хранилища по хэшу (None, если он не сохранялся).
+        """
+        if 'diff' in file_change:
+            return file_change['diff']
+        digest = file_change.get('diff_digest')
+        if digest is None or self.diff_store is None:
+            return None
+        return self.diff_store.get(digest)
+    
+    def _use_native_objects(self):
+        """Проверяет, включено ли чтение объектов без git."""
+        return (getattr(config, 'OBJECT_BACKEND', 'show') == 'native' or
+                getattr(config, 'COLLECTION_MODE', 'per_commit') == 'native')
+    
+    def close(self):
+        """Освобождает ресурсы коллектора (процессы чтения объектов, база кэша оценок diff)."""
+        if self._object_reader is not None:
+            self._object_reader.close()
+            self._object_reader = None
+        if self.change_analyzer.score_cache is not None:
+            self.change_analyzer.score_cache.close()
         
     def collect_data(self):
-        """Сбор данных из Git-репозитория."""
+        """Сбор данных из Git."""
+        commits = []
+        commit_details = {}
+        commit_file_changes = {}
+        
+        # Весь объем истории обрабатывается одним блоком
+        for commit, commit_detail, changes in self.iter_records(batch_size=None):
+            commits.append(commit)
+            if commit_detail is not None:
+                commit_details[commit['hash']] = commit_detail
+            if changes is not None:
+                commit_file_changes[commit['hash']] = changes
+        
+        # Получаем данные о разработчиках (даты прихода/ухода, др.)
+        developer_info = self._get_developer_info(commits)
+        
+        return {
+            'commits': commits,
+            'commit_details': commit_details,
+            'file_changes': commit_file_changes,
+            'developer_info': developer_info
+        }
+    
+    def iter_records(self, batch_size=0):
+        """
+        Последовательно выдает данные коммитов, не накапливая историю в памяти.
+        
+        В потоковом и встроенном режимах записи формируются по мере чтения истории.
+        В покоммитном режиме, а также при использовании кэша или пула процессов
+        коммиты обрабатываются блоками по batch_size, и в памяти одновременно
+        находятся diff только одного блока.
+        
+        Args:
+            batch_size: размер блока коммитов (0 - значение STREAMING_BATCH_SIZE из config,
+                        None - вся история одним блоком)
+            
+        Yields:
+            tuple: (commit, commit_detail, file_changes); commit_detail и file_changes
+                   равны None, если получить их для коммита не удалось
+        """
         print("Собираем данные из Git...")
         
         # Проверяем, что путь ведет к Git-репозиторию
@@ -24,27 +154,166 @@ class GitDataCollector:
             raise ValueError(f"{self.repo_path} не является Git-репозиторием")
         
         # Получаем общее количество коммитов для отслеживания прогресса
-        self._count_total_commits()
-        print(f"Всего коммитов в репозитории: {self.total_commits}")
+        # (во встроенном режиме количество определяется при обходе истории)
+        if getattr(config, 'COLLECTION_MODE', 'per_commit') != 'native':
+            self._count_total_commits()
+            print(f"Всего коммитов в репозитории: {self.total_commits}")
+        
+        if batch_size == 0:
+            batch_size = getattr(config, 'STREAMING_BATCH_SIZE', 500)
+        
+        self.progress.start('Сбор данных', self.total_commits)
+        cache = None
+        try:
+            if getattr(config, 'CACHE_ENABLED', False):
+                # Обрабатываем только коммиты, отсутствующие в кэше
+                cache = self._open_cache()
+            elif getattr(config, 'COLLECTION_MODE', 'per_commit') == 'streaming' and self._worker_count() <= 1:
+                # Получаем коммиты, статистику и изменения файлов одним потоком git log
+                yield from self._iter_log()
+                return
+            elif getattr(config, 'COLLECTION_MODE', 'per_commit') == 'native' and self._worker_count() <= 1:
+                # Обходим историю и деревья внутри процесса без запуска git
+                yield from self._iter_native()
+                return
+            
+            # Получаем все коммиты (только метаданные) и обрабатываем их блоками
+            with profiler.stage('git_log_commits'):
+                commits = self._get_commits()
+            batch_size = batch_size or max(1, len(commits))
+            for start in range(0, len(commits), batch_size):
+                batch = commits[start:start + batch_size]
+                if cache is not None:
+                    commit_details, commit_file_changes = self._collect_cached(cache, batch)
+                else:
+                    commit_details, commit_file_changes = self._collect_commit_data(batch)
+                for commit in batch:
+                    yield (commit, commit_details.get(commit['hash']),
+                           commit_file_changes.get(commit['hash']))
+        finally:
+            if cache is not None:
+                cache.close()
+            self.close()
+            self.progress.finish()
+    
+    def _collect_commit_data(self, commits):
+        """Получение деталей и изменений файлов для заданного списка коммитов."""
+        if self._worker_count() > 1 and len(commits) > 1:
+            # Счетчики дочерних процессов в профиль не попадают, учитывается общее время
+            with profiler.stage('parallel_collection'):
+                return self._collect_parallel(commits)
+        return self._collect_sequential(commits)
+    
+    def _worker_count(self):
+        """Возвращает количество процессов для параллельного сбора данных."""
+        workers = getattr(config, 'COLLECTION_WORKERS', 1)
+        if not workers or workers < 1:
+            workers = os.cpu_count() or 1
+        return workers
+    
+    def _collect_parallel(self, commits):
+        """
+        Параллельный сбор деталей и изменений файлов в пуле процессов.
+        
+        Список коммитов делится на блоки, которые обрабатываются независимо,
+        а результаты объединяются в исходном порядке блоков, поэтому итоговые
+        данные совпадают с последовательным сбором.
+        """
+        workers = self._worker_count()
+        chunk_size = getattr(config, 'COLLECTION_CHUNK_SIZE', None) or max(1, -(-len(commits) // (workers * 4)))
+        chunks = [commits[i:i + chunk_size] for i in range(0, len(commits), chunk_size)]
+        
+        print(f"\nПараллельный сбор данных: {len(commits)} коммитов, {len(chunks)} блоков, {workers} процессов...")
+        
+        # Передаем настройки явно: при запуске через spawn дочерние процессы не видят изменений config
+        settings = {name: getattr(config, name) for name in dir(config) if name.isupper()}
+        
+        commit_details = {}
+        commit_file_changes = {}
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_collect_chunk, self.repo_path, chunk, settings) for chunk in chunks]
+            for chunk, future in zip(chunks, futures):
+                chunk_details, chunk_file_changes = future.result()
+                for changes in chunk_file_changes.values():
+                    self._intern_paths(changes)
+                commit_details.update(chunk_details)
+                commit_file_changes.update(chunk_file_changes)
+                self._update_progress(len(chunk))
+        
+        print("\nПараллельный сбор данных завершен.")
+        return commit_details, commit_file_changes
+    
+    def _collect_sequential(self, commits):
+        """Последовательное получение деталей и изменений файлов для списка коммитов."""
+        if getattr(config, 'COLLECTION_MODE', 'per_commit') == 'streaming':
+            _, commit_details, commit_file_changes = self._materialize(self._iter_log(commits))
+            return commit_details, commit_file_changes
         
-        # Получаем все коммиты
-        commits = self._get_commits()
+        if getattr(config, 'COLLECTION_MODE', 'per_commit') == 'native':
+            _, commit_details, commit_file_changes = self._materialize(self._iter_native(commits))
+            return commit_details, commit_file_changes
         
         # Получаем детальную информацию по каждому коммиту
-        commit_details = self._get_commit_details(commits)
+        with profiler.stage('commit_details'):
+            commit_details = self._get_commit_details(commits)
         
         # Получаем изменения файлов для каждого коммита
-        commit_file_changes = self._get_file_changes(commits)
+        with profiler.stage('file_changes'):
+            commit_file_changes = self._get_file_changes(commits)
         
-        # Получаем данные о разработчиках (даты прихода/ухода, др.)
-        developer_info = self._get_developer_info(commits)
+        return commit_details, commit_file_changes
+    
+    @staticmethod
+    def _materialize(records):
+        """Собирает записи генератора в списки и словари формата collect_data."""
+        commits = []
+        commit_details = {}
+        file_changes = {}
+        for commit, commit_detail, changes in records:
+            commits.append(commit)
+            commit_details[commit['hash']] = commit_detail
+            file_changes[commit['hash']] = changes
+        return commits, commit_details, file_changes
+    
+    def _open_cache(self):
+        """Открывает постоянный кэш результатов сбора данных."""
+        cache_path = getattr(config, 'CACHE_PATH', None) or CollectionCache.default_path(self.repo_path)
+        return CollectionCache(cache_path)
+    
+    def _collect_cached(self, cache, commits):
+        """
+        Сбор данных с использованием постоянного кэша: коммиты, уже сохраненные
+        в кэше, не обрабатываются повторно.
         
-        return {
-            'commits': commits,
-            'commit_details': commit_details,
-            'file_changes': commit_file_changes,
-            'developer_info': developer_info
-        }
+        Returns:
+            tuple: (commit_details, file_changes) в порядке коммитов
+        """
+        cached = cache.load([commit['hash'] for commit in commits])
+        missing = [commit for commit in commits if commit['hash'] not in cached]
+        
+        print(f"Найдено в кэше: {len(cached)} коммитов, требуется обработать: {len(missing)}")
+        if cached:
+            self._update_progress(len(cached))
+        
+        new_details, new_file_changes = self._collect_commit_data(missing) if missing else ({}, {})
+        if missing:
+            cache.store(missing, new_details, new_file_changes)
+        
+        # Объединяем результаты в порядке коммитов
+        commit_details = {}
+        commit_file_changes = {}
+        for commit in commits:
+            commit_hash = commit['hash']
+            if commit_hash in cached:
+                commit_details[commit_hash], commit_file_changes[commit_hash] = cached[commit_hash]
+                self._intern_paths(commit_file_changes[commit_hash])
+                continue
+            if commit_hash in new_details:
+                commit_details[commit_hash] = new_details[commit_hash]
+            if commit_hash in new_file_changes:
+                commit_file_changes[commit_hash] = new_file_changes[commit_hash]
+        
+        return commit_details, commit_file_changes
     
     def _is_git_repo(self):
         """Проверка, что указанный путь - валидный Git-репозиторий."""
@@ -60,6 +329,7 @@ class GitDataCollector:
                 cmd.append(f'--until={config.END_DATE}')
                 
             result = subprocess.run(cmd, cwd=self.repo_path, capture_output=True, text=True)
+            profiler.record_subprocess(result.stdout)
             if result.returncode == 0:
                 self.total_commits = int(result.stdout.strip())
             else:
@@ -70,21 +340,13 @@ class GitDataCollector:
             self.total_commits = 1000  # Значение по умолчанию
     
     def _update_progress(self, increment=1):
-        """Обновляет и выводит прогресс обработки коммитов."""
+        """Учитывает обработанные коммиты в прогрессе текущего этапа."""
         self.processed_commits += increment
-        if self.total_commits > 0:
-            percentage = (self.processed_commits / self.total_commits) * 100
-            sys.stdout.write(f"\nПрогресс анализа: {percentage:.1f}% ({self.processed_commits}/{self.total_commits})")
-            sys.stdout.flush()
-            # Каждые 10% выводим новую строку для лучшей читаемости
-            if self.processed_commits % max(1, self.total_commits // 10) == 0:
-                print()
+        self.progress.advance(increment)
     
     def _get_commits(self):
         """Получение всех коммитов из репозитория."""
-        # Используем нестандартный разделитель, который маловероятен в сообщениях коммитов
-        separator = "<<__GIT_SEPARATOR__>>"
-        cmd = ['git', 'log', f'--pretty=format:%H{separator}%an{separator}%ae{separator}%at{separator}%s']
+        cmd = ['git', 'log', f'--pretty=format:%H{FIELD_SEPARATOR}%an{FIELD_SEPARATOR}%ae{FIELD_SEPARATOR}%at{FIELD_SEPARATOR}%s']
         
         # Добавляем диапазон дат, если указан
         if config.START_DATE:
@@ -93,6 +355,7 @@ class GitDataCollector:
             cmd.append(f'--until={config.END_DATE}')
         
         result = subprocess.run(cmd, cwd=self.repo_path, capture_output=True, text=True)
+        profiler.record_subprocess(result.stdout)
         
         if result.returncode != 0:
             raise Exception(f"Ошибка при получении коммитов: {result.stderr}")
@@ -103,87 +366,84 @@ class GitDataCollector:
                 continue
             
             # Используем максимальное количество разбиений - 4, чтобы сообщение коммита осталось целым
-            parts = line.split(separator, 4)
+            parts = line.split(FIELD_SEPARATOR, 4)
             if len(parts) < 5:
                 print(f"Предупреждение: пропуск строки с неполными данными: {line}")
                 continue
                 
-            commit_hash, author_name, author_email, timestamp, subject = parts
-            
-            # Проверяем, является ли коммит revert-коммитом или merge-коммитом
-            is_revert = subject.startswith('Revert "') or 'revert' in subject.lower()
-            is_merge = subject.startswith('Merge ') or subject.startswith('Merge: ') or 'merge' in subject.lower()
+            commit = self._build_commit(*parts)
+            if commit is not None:
+                commits.append(commit)
             
-            # Пропускаем revert-коммиты, если настроено их игнорирование
-            if is_revert and config.IGNORE_REVERTS:
-                continue
+        return commits
+    
+    def _build_commit(self, commit_hash, author_name, author_email, timestamp, subject):
+        """
+        Создает запись коммита из полей git log.
+        Возвращает None, если коммит должен быть пропущен согласно настройкам.
+        """
+        # Проверяем, является ли коммит revert-коммитом или merge-коммитом
+        # (тема классифицируется один раз, результат используется и при оценке изменений)
+        classification = self.change_analyzer.classifier.classify(subject)
+        is_revert = classification.is_revert
+        is_merge = classification.is_merge
+        
+        # Пропускаем revert-коммиты, если настроено их игнорирование
+        if is_revert and config.IGNORE_REVERTS:
+            return None
 
-            # Пропускаем merge-коммиты, если настроено их игнорирование
-            if is_merge and config.IGNORE_MERGES:
-                continue
-                
-            commits.append({
-                'hash': commit_hash,
-                'author_name': author_name,
-                'author_email': author_email,
-                'timestamp': int(timestamp),
-                'date': datetime.fromtimestamp(int(timestamp)).strftime('%Y-%m-%d %H:%M:%S'),
-                'subject': subject,
-                'is_revert': is_revert,
-                'is_merge': is_merge
-            })
+        # Пропускаем merge-коммиты, если настроено их игнорирование
+        if is_merge and config.IGNORE_MERGES:
+            return None
             
-        return commits
+        return Commit(commit_hash, self.identities.canonical(author_name), self.identities.canonical(author_email),
+                      int(timestamp), subject, is_revert, is_merge)
+    
+    def _intern_paths(self, changes):
+        """Заменяет пути в изменениях файлов (из кэша или дочерних процессов) общими объектами."""
+        for change in changes:
+            change['file_path'] = self.paths.canonical(change['file_path'])
     
     def _get_commit_details(self, commits):
-        """Получение детальной информации по каждому коммиту."""
-        commit_details = {}
-        total_commits = len(commits)
+        """
+        Получение детальной информации по каждому коммиту.
         
-        print(f"\nПолучение детальной информации по {total_commits} коммитам...")
+        Прогресс этапа сбора данных продвигается в _get_file_changes: коммит
+        считается обработанным после получения изменений его файлов.
+        """
+        commit_details = {}
         
-        for i, commit in enumerate(commits):
-            # Отображаем прогресс
-            percentage = ((i + 1) / total_commits) * 100
-            sys.stdout.write(f"\nПрогресс получения деталей: {percentage:.1f}% ({i+1}/{total_commits})")
-            sys.stdout.flush()
-            
+        for commit in commits:
             # Получаем метаданные коммита
             cmd = ['git', 'show', '--stat', '--format=fuller', commit['hash']]
             result = subprocess.run(cmd, cwd=self.repo_path, capture_output=True, text=True)
+            profiler.record_subprocess(result.stdout)
             
             if result.returncode != 0:
                 print(f"\nПредупреждение: Не удалось получить детали коммита {commit['hash']}: {result.stderr}")
                 continue
                 
             # Парсим детали коммита
-            commit_details[commit['hash']] = {
-                'raw_output': result.stdout,
-                'stats': self._parse_commit_stats(result.stdout)
-            }
+            commit_details[commit['hash']] = self._build_commit_detail(
+                result.stdout,
+                self._parse_commit_stats(result.stdout)
+            )
             
-        print("\nПолучение деталей коммитов завершено.")
         return commit_details
     
     def _get_file_changes(self, commits):
         """Получение изменений файлов для каждого коммита."""
         file_changes = {}
-        total_commits = len(commits)
-        
-        print(f"\nПолучение изменений файлов по {total_commits} коммитам...")
         
-        for i, commit in enumerate(commits):
-            # Отображаем прогресс
-            percentage = ((i + 1) / total_commits) * 100
-            sys.stdout.write(f"\nПрогресс получения изменений: {percentage:.1f}% ({i+1}/{total_commits})")
-            sys.stdout.flush()
-            
+        for commit in commits:
             # Получаем файлы, измененные в этом коммите
             cmd = ['git', 'show', '--name-status', '--pretty=format:', commit['hash']]
             result = subprocess.run(cmd, cwd=self.repo_path, capture_output=True, text=True)
+            profiler.record_subprocess(result.stdout)
             
             if result.returncode != 0:
                 print(f"\nПредупреждение: Не удалось получить изменения файлов для коммита {commit['hash']}: {result.stderr}")
+                self._update_progress()
                 continue
                 
             # Парсим изменения файлов
@@ -200,69 +460,534 @@ class GitDataCollector:
                 file_path = parts[1]
                 
                 # Пропускаем игнорируемые файлы
-                if os.path.basename(file_path) in config.IGNORED_FILES:
+                if classify_path(file_path).name in config.IGNORED_FILES:
                     continue
                 
                 # Получаем diff для этого файла в этом коммите
                 file_diff = self._get_file_diff(commit['hash'], file_path)
                 
-                # Используем улучшенный алгоритм для определения существенности изменений
-                if hasattr(config, 'ADVANCED_CHANGE_ANALYSIS') and config.ADVANCED_CHANGE_ANALYSIS:
-                    is_substantial = self.change_analyzer.is_substantial_change(
-                        file_diff, 
-                        file_path, 
-                        commit['subject']
-                    )
-                else:
-                    # Используем старый алгоритм если улучшенный анализ не включен
-                    is_substantial = self._is_substantial_change(file_diff, file_path)
-                
-                changes.append({
-                    'change_type': change_type,
-                    'file_path': file_path,
-                    'file_ext': os.path.splitext(file_path)[1].lower(),
-                    'diff': file_diff,
-                    'is_substantial': is_substantial
-                })
+                changes.append(self._build_file_change(change_type, file_path, file_diff, commit['subject']))
                 
             file_changes[commit['hash']] = changes
+            self._update_progress()
         
-        print("\nПолучение изменений файлов завершено.")
         return file_changes
     
+    def _build_file_change(self, change_type, file_path, file_diff, commit_subject):
+        """Создает запись об изменении файла с оценкой существенности."""
+        # Используем улучшенный алгоритм для определения существенности изменений
+        if hasattr(config, 'ADVANCED_CHANGE_ANALYSIS') and config.ADVANCED_CHANGE_ANALYSIS:
+            is_substantial = self.change_analyzer.is_substantial_change(
+                file_diff, 
+                file_path, 
+                commit_subject
+            )
+        else:
+            # Используем старый алгоритм если улучшенный анализ не включен
+            is_substantial = self._is_substantial_change(file_diff, file_path)
+        
+        return self._file_change_record(change_type, file_path, file_diff, is_substantial)
+    
+    def _file_change_record(self, change_type, file_path, file_diff, is_substantial):
+        """Формирует запись об изменении файла (в компактном режиме - без текста diff)."""
+        file_path = self.paths.canonical(file_path)
+        if getattr(config, 'COMPACT_COLLECTION', False):
+            # Сохраняем только хэш текста diff, сам текст отбрасываем или выгружаем на диск
+            return FileChange(change_type, file_path, classify_path(file_path).ext, is_substantial,
+                              diff_digest=self._spill_text(file_diff))
+        
+        return FileChange(change_type, file_path, classify_path(file_path).ext, is_substantial,
+                          diff=file_diff)
+    
+    def _build_commit_detail(self, raw_output, stats):
+        """Создает запись деталей коммита; в компактном режиме сырой вывод git не хранится в памяти."""
+        if getattr(config, 'COMPACT_COLLECTION', False):
+            commit_detail = CommitDetail(stats)
+            if self.diff_store is not None:
+                commit_detail['raw_digest'] = self.diff_store.put(raw_output)
+            return commit_detail
+        
+        return CommitDetail(stats, raw_output=raw_output)
+    
+    def _spill_text(self, text):
+        """Сохраняет текст в хранилище diff (если оно включено) и возвращает его хэш."""
+        if self.diff_store is not None:
+            return self.diff_store.put(text)
+        return DiffStore.digest(text)
+    
+    def _iter_streaming(self, commits=None):
+        """
+        Выдает коммиты, статистику и изменения файлов за один проход
+        `git log --raw --numstat -p` вместо отдельных вызовов git show на каждый коммит.
+        
+        Args:
+            commits: список коммитов для обработки (опционально). Если не указан,
+                     обрабатывается вся история с учетом диапазона дат.
+        
+        Yields:
+            tuple: (commit, commit_detail, file_changes) в том же формате,
+                   что и при покоммитном сборе
+        """
+        cmd = self._log_command(LOG_FIELDS, ['--raw', '--numstat', '-p', '--diff-merges=first-parent'], commits)
+        
+        print("\nПотоковое получение истории коммитов...")
+        
+        with self._git_log_output(cmd, commits) as lines:
+            for record in self._parse_log_stream(lines):
+                self._update_progress()
+                yield record
+        
+        print("\nПотоковое получение истории завершено.")
+    
+    def _iter_log(self, commits=None):
+        """Выбирает потоковый проход git log: с текстом патчей или быстрый режим по numstat."""
+        if getattr(config, 'NUMSTAT_FAST_PATH', False):
+            return self._iter_numstat(commits)
+        return self._iter_streaming(commits)
+    
+    @contextmanager
+    def _git_log_output(self, cmd, commits=None):
+        """
+        Запускает git log и предоставляет построчный доступ к его выводу.
+        
+        Args:
+            cmd: команда git log
+            commits: список коммитов, хэши которых передаются в stdin (для --stdin)
+        """
+        process = subprocess.Popen(cmd, cwd=self.repo_path, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE, text=True, encoding='utf-8', errors='replace')
+        
+        profiler.record_subprocess()
+        
+        # Запись в stdin выполняется в отдельном потоке, чтобы не заблокироваться на заполненном stdout
+        writer = threading.Thread(target=self._write_revisions, args=(process.stdin, commits or []))
+        writer.daemon = True
+        writer.start()
+        completed = False
+        try:
+            yield profiler.metered(process.stdout)
+            completed = True
+        finally:
+            if not completed:
+                # Потребитель прекратил чтение раньше времени
+                process.kill()
+            process.stdout.close()
+            writer.join()
+            stderr = process.stderr.read()
+            process.stderr.close()
+            process.wait()
+        
+        if process.returncode != 0:
+            raise Exception(f"Ошибка при получении коммитов: {stderr}")
+    
+    def _log_command(self, log_format, options, commits=None):
+        """Формирует команду git log с диапазоном дат или чтением хэшей коммитов из stdin."""
+        cmd = ['git', 'log'] + options + [f'--format={COMMIT_MARKER}{log_format}']
+        
+        if commits is not None:
+            # Передаем хэши через stdin, чтобы не упираться в ограничение длины командной строки
+            cmd.extend(['--no-walk=unsorted', '--stdin'])
+        else:
+            # Добавляем диапазон дат, если указан
+            if config.START_DATE:
+                cmd.append(f'--since={config.START_DATE}')
+            if config.END_DATE:
+                cmd.append(f'--until={config.END_DATE}')
+        return cmd
+    
+    @staticmethod
+    def _write_revisions(stream, commits):
+        """Записывает хэши коммитов в stdin процесса git и закрывает его."""
+        try:
+            for commit in commits:
+                stream.write(commit['hash'] + '\n')
+        except (BrokenPipeError, OSError):
+            pass
+        finally:
+            try:
+                stream.close()
+            except (BrokenPipeError, OSError):
+                pass
+    
+    def _parse_log_stream(self, lines):
+        """
+        Инкрементально разбирает вывод `git log --raw --numstat -p`.
+        
+        Args:
+            lines: итерируемый источник строк вывода git log
+            
+        Yields:
+            tuple: (commit, commit_detail, file_changes) для каждого неотфильтрованного коммита
+        """
+        header = None
+        section = []  # Строки заголовка, --raw и --numstat текущего коммита
+        diffs = []    # Блоки diff текущего коммита
+        
+        for line in lines:
+            line = line.rstrip('\n')
+            
+            if line.startswith(COMMIT_MARKER):
+                if header is not None:
+                    record = self._build_stream_record(header, section, diffs)
+                    if record is not None:
+                        yield record
+                header = line[len(COMMIT_MARKER):].split(FIELD_SEPARATOR, 5)
+                section = [line]
+                diffs = []
+            elif header is None:
+                continue
+            elif line.startswith('diff --git '):
+                diffs.append([line])
+            elif diffs:
+                diffs[-1].append(line)
+            else:
+                section.append(line)
+        
+        if header is not None:
+            record = self._build_stream_record(header, section, diffs)
+            if record is not None:
+                yield record
+    
+    def _build_stream_record(self, header, section, diffs):
+        """Формирует записи коммита, его статистики и изменений файлов из блока потока git log."""
+        if len(header) < 6:
+            print(f"Предупреждение: пропуск коммита с неполными данными: {header}")
+            return None
+        
+        commit_hash, parents, author_name, author_email, timestamp, subject = header
+        commit = self._build_commit(commit_hash, author_name, author_email, timestamp, subject)
+        if commit is None:
+            return None
+        
+        stats, raw_entries, _ = self._parse_raw_numstat(section[1:])
+        
+        # Для merge-коммитов git show не выводит список файлов, сохраняем это поведение
+        changes = []
+        if len(parents.split()) <= 1:
+            for i, (change_type, file_path) in enumerate(raw_entries):
+                # Пропускаем игнорируемые файлы
+                if classify_path(file_path).name in config.IGNORED_FILES:
+                    continue
+                
+                if change_type[:1] in ('R', 'C'):
+                    # Покоммитный режим запрашивает diff по старому пути, и для переименования
+                    # git show выводит удаление файла целиком, а не блок переименования из потока
+                    file_diff = self._get_file_diff(commit_hash, file_path)
+                else:
+                    # Блоки diff идут в том же порядке, что и строки --raw
+                    file_diff = '\n'.join(diffs[i]) + '\n' if i < len(diffs) else ""
+                changes.append(self._build_file_change(change_type, file_path, file_diff, subject))
+        
+        commit_detail = self._build_commit_detail('\n'.join(section) + '\n', stats)
+        return commit, commit_detail, changes
+    
+    @staticmethod
+    def _parse_raw_numstat(lines):
+        """
+        Разбирает строки --raw и --numstat одного коммита.
+        
+        Returns:
+            tuple: (stats, raw_entries, numstat_entries), где raw_entries - список
+                   (статус, путь), а numstat_entries - список (добавлено, удалено, путь)
+                   в порядке вывода git (для бинарных файлов счетчики равны '-')
+        """
+        stats = CommitStats()
+        raw_entries = []
+        numstat_entries = []
+        
+        for line in lines:
+            if line.startswith(':'):
+                # Строка --raw: ":<режимы> <хэши> <статус>\t<путь>[\t<новый путь>]"
+                parts = line.split('\t')
+                if len(parts) >= 2:
+                    raw_entries.append((parts[0].split(' ')[-1], parts[1]))
+            elif line:
+                # Строка --numstat: "<добавлено>\t<удалено>\t<путь>", для бинарных файлов "-\t-"
+                parts = line.split('\t', 2)
+                if len(parts) < 3:
+                    continue
+                numstat_entries.append(tuple(parts))
+                stats['files_changed'] += 1
+                stats['insertions'] += int(parts[0]) if parts[0].isdigit() else 0
+                stats['deletions'] += int(parts[1]) if parts[1].isdigit() else 0
+        
+        return stats, raw_entries, numstat_entries
+    
+    def _iter_numstat(self, commits=None):
+        """
+        Быстрый режим: существенность изменений определяется по счетчикам строк git
+        без получения текста патчей.
+        
+        Выполняются два прохода git log без -p, читаемые параллельно: `--raw --numstat`
+        дает статистику и список файлов, а `--numstat -w` - количество строк без учета
+        пробелов (файлы, изменившиеся только в пробелах, в нем отсутствуют). Бинарные
+        файлы git отмечает в numstat как "-\t-". Текст diff запрашивается только для
+        файлов, существенность которых зависит от оценки сложности изменений.
+        
+        Args:
+            commits: список коммитов для обработки (опционально)
+        
+        Yields:
+            tuple: (commit, commit_detail, file_changes)
+        """
+        options = ['--numstat', '--diff-merges=first-parent']
+        full_cmd = self._log_command(LOG_FIELDS, ['--raw'] + options, commits)
+        whitespace_cmd = self._log_command('%H', ['-w'] + options, commits)
+        
+        print("\nПолучение статистики изменений по numstat...")
+        
+        with self._git_log_output(full_cmd, commits) as full_lines, \
+                self._git_log_output(whitespace_cmd, commits) as whitespace_lines:
+            whitespace_blocks = self._split_log_blocks(whitespace_lines)
+            for section in self._split_log_blocks(full_lines):
+                whitespace_section = next(whitespace_blocks, None)
+                commit_hash = section[0][len(COMMIT_MARKER):].split(FIELD_SEPARATOR, 1)[0]
+                if whitespace_section is None or whitespace_section[0][len(COMMIT_MARKER):] != commit_hash:
+                    raise Exception(f"Несогласованный вывод git log для коммита {commit_hash}")
+                
+                record = self._build_numstat_record(section, whitespace_section)
+                self._update_progress()
+                if record is not None:
+                    yield record
+            
+            # Дочитываем вывод второго процесса до конца
+            for _ in whitespace_blocks:
+                pass
+        
+        print("\nПолучение статистики изменений завершено.")
+    
+    @staticmethod
+    def _split_log_blocks(lines):
+        """Делит вывод git log без патчей на блоки коммитов (первая строка блока - заголовок)."""
+        section = None
+        for line in lines:
+            line = line.rstrip('\n')
+            if line.startswith(COMMIT_MARKER):
+                if section is not None:
+                    yield section
+                section = [line]
+            elif section is not None:
+                section.append(line)
+        if section is not None:
+            yield section
+    
+    def _build_numstat_record(self, section, whitespace_section):
+        """Формирует записи коммита, статистики и изменений файлов по выводу numstat."""
+        header = section[0][len(COMMIT_MARKER):].split(FIELD_SEPARATOR, 5)
+        if len(header) < 6:
+            print(f"Предупреждение: пропуск коммита с неполными данными: {header}")
+            return None
+        
+        commit_hash, parents, author_name, author_email, timestamp, subject = header
+        commit = self._build_commit(commit_hash, author_name, author_email, timestamp, subject)
+        if commit is None:
+            return None
+        
+        stats, raw_entries, numstat_entries = self._parse_raw_numstat(section[1:])
+        _, _, whitespace_entries = self._parse_raw_numstat(whitespace_section[1:])
+        substantive_lines = {
+            path: int(added) + int(removed)
+            for added, removed, path in whitespace_entries
+            if added.isdigit() and removed.isdigit()
+        }
+        
+        # Для merge-коммитов git show не выводит список файлов, сохраняем это поведение
+        changes = []
+        if len(parents.split()) <= 1:
+            for i, (change_type, file_path) in enumerate(raw_entries):
+                # Пропускаем игнорируемые файлы
+                if classify_path(file_path).name in config.IGNORED_FILES:
+                    continue
+                
+                # Строки --numstat идут в том же порядке, что и строки --raw
+                added, removed, numstat_path = numstat_entries[i] if i < len(numstat_entries) else ('0', '0', file_path)
+                is_binary = not (added.isdigit() and removed.isdigit())
+                changed_lines = 0 if is_binary else int(added) + int(removed)
+                changes.append(self._build_counted_file_change(
+                    commit_hash, change_type, file_path, subject,
+                    is_binary, changed_lines, substantive_lines.get(numstat_path, 0)
+                ))
+        
+        commit_detail = self._build_commit_detail('\n'.join(section) + '\n', stats)
+        return commit, commit_detail, changes
+    
+    def _build_counted_file_change(self, commit_hash, change_type, file_path, commit_subject,
+                                   is_binary, changed_lines, substantive_lines):
+        """
+        Создает запись об изменении файла по счетчикам строк git.
+        
+        Args:
+            is_binary: git считает файл бинарным
+            changed_lines: количество добавленных и удаленных строк
+            substantive_lines: то же без учета изменений в пробелах (git log -w)
+        """
+        file_diff = ""
+        if is_binary or not changed_lines:
+            is_substantial = False
+        elif config.IGNORE_WHITESPACE_ONLY and not substantive_lines:
+            # Изменения только в пробелах
+            is_substantial = False
+        elif hasattr(config, 'ADVANCED_CHANGE_ANALYSIS') and config.ADVANCED_CHANGE_ANALYSIS:
+            loaded = []
+            
+            def load_diff():
+                loaded.append(self._get_file_diff(commit_hash, file_path))
+                return loaded[-1]
+            
+            is_substantial = self.change_analyzer.is_substantial_from_counts(
+                changed_lines, file_path, commit_subject, load_diff
+            )
+            if loaded:
+                file_diff = loaded[-1]
+        else:
+            is_substantial = changed_lines >= config.MIN_CODE_CHANGE_SIZE
+        
+        return self._file_change_record(change_type, file_path, file_diff, is_substantial)
+    
+    def _iter_native(self, commits=None):
+        """
+        Выдает коммиты, статистику и изменения файлов, читая объекты
+        репозитория напрямую (NativeObjectStore) без запуска git.
+        
+        Args:
+            commits: список коммитов для обработки (опционально). Если не указан,
+                     обходится вся история от HEAD с учетом диапазона дат.
+        
+        Yields:
+            tuple: (commit, commit_detail, file_changes)
+        """
+        store = self.object_reader
+        
+        if commits is None:
+            since, until = self._native_date_range()
+            history = list(store.iter_history('HEAD', since, until))
+            self.total_commits = len(history)
+            self.progress.set_total(self.total_commits)
+            print(f"Всего коммитов в репозитории: {self.total_commits}")
+        else:
+            history = [store.read_commit(commit['hash']) for commit in commits]
+        
+        print("\nОбработка истории коммитов без запуска git...")
+        
+        for native_commit in history:
+            if native_commit is None:
+                continue
+            record = self._build_native_record(store, native_commit)
+            self._update_progress()
+            if record is not None:
+                yield record
+        
+        print("\nОбработка истории завершена.")
+    
+    def _native_date_range(self):
+        """
+        Возвращает диапазон дат из настроек в виде unix timestamp.
+        
+        Границы вычисляются так же, как git разбирает --since/--until: дата без
+        времени означает этот день в текущее время суток (а не его начало или конец),
+        поэтому режим native выбирает те же коммиты, что и остальные режимы.
+        """
+        time_of_day = datetime.now().replace(microsecond=0).time()
+        since = until = None
+        if config.START_DATE:
+            since = datetime.combine(datetime.strptime(config.START_DATE, '%Y-%m-%d').date(), time_of_day).timestamp()
+        if config.END_DATE:
+            until = datetime.combine(datetime.strptime(config.END_DATE, '%Y-%m-%d').date(), time_of_day).timestamp()
+        return since, until
+    
+    def _build_native_record(self, store, native_commit):
+        """Формирует записи коммита, статистики и изменений файлов по разобранному объекту коммита."""
+        commit = self._build_commit(native_commit.sha, native_commit.author_name, native_commit.author_email,
+                                    native_commit.author_time, native_commit.subject)
+        if commit is None:
+            return None
+        
+        # Как и git show, сравниваем с первым родителем
+        parent_tree = None
+        if native_commit.parents:
+            parent = store.read_commit(native_commit.parents[0])
+            parent_tree = parent.tree if parent is not None else None
+        
+        stats = CommitStats()
+        changes = []
+        is_merge_commit = len(native_commit.parents) > 1
+        
+        for change in store.diff_trees(parent_tree, native_commit.tree):
+            file_diff = self._native_file_diff(store, change)
+            added_lines, removed_lines = self._count_diff_lines(file_diff)
+            stats['files_changed'] += 1
+            stats['insertions'] += added_lines
+            stats['deletions'] += removed_lines
+            
+            # Для merge-коммитов git show не выводит список файлов, сохраняем это поведение
+            if is_merge_commit:
+                continue
+            # Путь записывается так же, как в выводе git (в кавычках для путей вне ASCII)
+            file_path = quote_path(change.path)
+            if classify_path(file_path).name in config.IGNORED_FILES:
+                continue
+            changes.append(self._build_file_change(change.status, file_path, file_diff, native_commit.subject))
+        
+        commit_detail = self._build_commit_detail(native_commit.raw.decode('utf-8', errors='replace'), stats)
+        return commit, commit_detail, changes
+    
+    def _native_file_diff(self, store, change):
+        """Строит diff файла по хэшам его версий из сравнения деревьев."""
+        # Содержимое подмодулей находится в другом репозитории
+        if GITLINK_MODE in (change.old_mode, change.new_mode):
+            return ""
+        old_blob = store.read_object(change.old_sha) if change.old_sha else None
+        new_blob = store.read_object(change.new_sha) if change.new_sha else None
+        return blob_diff(
+            old_blob.data if old_blob is not None else None,
+            new_blob.data if new_blob is not None else None,
+            change.path
+        )
+    
+    @staticmethod
+    def _count_diff_lines(file_diff):
+        """Считает добавленные и удаленные строки в diff, пропуская заголовки файла."""
+        added_lines = removed_lines = 0
+        in_hunk = False
+        for line in file_diff.split('\n'):
+            if line.startswith('@@'):
+                in_hunk = True
+            elif not in_hunk:
+                continue
+            elif line.startswith('+'):
+                added_lines += 1
+            elif line.startswith('-'):
+                removed_lines += 1
+        return added_lines, removed_lines
+    
     def _get_developer_info(self, commits):
         """Получение информации о разработчиках."""
         developer_info = {}
         
         # Для каждого уникального email разработчика
         for commit in commits:
-            email = commit['author_email'].lower()
-            
-            if email not in developer_info:
-                developer_info[email] = {
-                    'name': commit['author_name'],
-                    'email': email,
-                    'first_commit_date': commit['date'],
-                    'last_commit_date': commit['date'],
-                    'first_commit_timestamp': commit['timestamp'],
-                    'last_commit_timestamp': commit['timestamp'],
-                }
-            else:
-                # Обновляем даты первого и последнего коммита
-                if commit['timestamp'] < developer_info[email]['first_commit_timestamp']:
-                    developer_info[email]['first_commit_date'] = commit['date']
-                    developer_info[email]['first_commit_timestamp'] = commit['timestamp']
-                    
-                if commit['timestamp'] > developer_info[email]['last_commit_timestamp']:
-                    developer_info[email]['last_commit_date'] = commit['date']
-                    developer_info[email]['last_commit_timestamp'] = commit['timestamp']
+            update_developer_info(developer_info, commit)
         
         return developer_info
     
     def _get_file_diff(self, commit_hash, file_path):
         """Получение diff для конкретного файла в коммите."""
+        if getattr(config, 'OBJECT_BACKEND', 'show') in ('cat-file', 'native'):
+            # Читаем обе версии файла через читатель объектов
+            # и строим diff без запуска отдельного процесса git show
+            old_blob, new_blob = self.object_reader.read_objects([
+                f'{commit_hash}^:{file_path}',
+                f'{commit_hash}:{file_path}'
+            ])
+            return blob_diff(
+                old_blob.data if old_blob is not None else None,
+                new_blob.data if new_blob is not None else None,
+                file_path
+            )
+        
         cmd = ['git', 'show', '--format=', commit_hash, '--', file_path]
         result = subprocess.run(cmd, cwd=self.repo_path, capture_output=True, text=True)
+        profiler.record_subprocess(result.stdout)
         
         if result.returncode != 0:
             return ""
@@ -284,36 +1009,18 @@ class GitDataCollector:
         if self._is_binary_file(file_path):
             return False
             
+        stats = diff_statistics(diff)
+        
         # Если настроено игнорирование изменений только в пробелах, проверяем
-        if config.IGNORE_WHITESPACE_ONLY:
-            # Удаляем все строки, которые изменяют только пробелы
-            clean_diff = []
-            for line in diff.split('\n'):
-                if line.startswith('+') or line.startswith('-'):
-                    # Удаляем пробелы и проверяем, осталось ли что-то
-                    content_line = re.sub(r'\s', '', line[1:])
-                    if content_line:
-                        clean_diff.append(line)
-                else:
-                    clean_diff.append(line)
-                    
-            # Если не осталось существенных строк, это изменение только пробелов
-            if not any(line.startswith('+') or line.startswith('-') for line in clean_diff):
-                return False
+        if config.IGNORE_WHITESPACE_ONLY and stats.only_whitespace:
+            return False
                 
         # Проверяем, соответствует ли размер изменения минимальному порогу
-        added_lines = sum(1 for line in diff.split('\n') if line.startswith('+') and not line.startswith('+++'))
-        removed_lines = sum(1 for line in diff.split('\n') if line.startswith('-') and not line.startswith('---'))
-        
-        return (added_lines + removed_lines) >= config.MIN_CODE_CHANGE_SIZE
+        return stats.total >= config.MIN_CODE_CHANGE_SIZE
     
     def _parse_commit_stats(self, commit_output):
         """Парсинг статистики коммита из вывода git show."""
-        stats = {
-            'files_changed': 0,
-            'insertions': 0,
-            'deletions': 0
-        }
+        stats = CommitStats()
         
         # Ищем итоговую строку в конце вывода коммита
         summary_match = re.search(r'(\d+) files? changed(?:, (\d+) insertions?\(\+\))?(?:, (\d+) deletions?\(-\))?', commit_output)
@@ -338,5 +1045,27 @@ class GitDataCollector:
             '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
         }
         
-        ext = os.path.splitext(file_path)[1].lower()
-        return ext in binary_extensions
+        return classify_path(file_path).ext in binary_extensions
+
+def _collect_chunk(repo_path, commits, settings):
+    """
+    Обрабатывает блок коммитов в дочернем процессе пула.
+    
+    Args:
+        repo_path: путь к репозиторию
+        commits: список коммитов блока
+        settings: значения настроек config родительского процесса
+        
+    Returns:
+        tuple: (commit_details, file_changes) для коммитов блока
+    """
+    for name, value in settings.items():
+        setattr(config, name, value)
+    
+    # Прогресс отображает родительский процесс, вывод дочерних процессов подавляем
+    collector = GitDataCollector(repo_path, progress=ProgressReporter())
+    try:
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            return collector._collect_sequential(commits)
+    finally:
+        collector.close()
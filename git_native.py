@@ -0,0 +1,627 @@
+import heapq
+import mmap
+import os
+import re
+import struct
+import threading
+import zlib
+from collections import OrderedDict, namedtuple
+
+from git_objects import GitObject, GitObjectInfo
+from profiling import profiler
+
+# Типы объектов в pack-файлах
+OBJ_COMMIT = 1
+OBJ_TREE = 2
+OBJ_BLOB = 3
+OBJ_TAG = 4
+OBJ_OFS_DELTA = 6
+OBJ_REF_DELTA = 7
+
+TYPE_NAMES = {
+    OBJ_COMMIT: 'commit',
+    OBJ_TREE: 'tree',
+    OBJ_BLOB: 'blob',
+    OBJ_TAG: 'tag',
+}
+TYPE_NUMBERS = {name: number for number, name in TYPE_NAMES.items()}
+
+# Режим записи дерева для подмодулей (gitlink): объект находится в другом репозитории
+GITLINK_MODE = '160000'
+
+# Размер порции сжатых данных, передаваемой zlib за один вызов
+INFLATE_CHUNK_SIZE = 64 * 1024
+
+# Разобранный объект коммита
+NativeCommit = namedtuple('NativeCommit', [
+    'sha', 'tree', 'parents', 'author_name', 'author_email',
+    'author_time', 'committer_time', 'subject', 'raw'
+])
+
+# Запись дерева: режим, имя и хэш объекта
+TreeEntry = namedtuple('TreeEntry', ['mode', 'name', 'sha'])
+
+# Изменение файла между двумя деревьями
+TreeChange = namedtuple('TreeChange', ['status', 'path', 'old_mode', 'old_sha', 'new_mode', 'new_sha'])
+
+_REV_PATTERN = re.compile(r'^(?P<base>[^~^]+)(?P<suffix>(?:[~^]\d*)*)$')
+_SUFFIX_PATTERN = re.compile(r'([~^])(\d*)')
+
+class _PackIndex:
+    """Индекс pack-файла версии 2, отображенный в память через mmap."""
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._map[:4] != b'\xfftOc' or struct.unpack('>I', self._map[4:8])[0] != 2:
+            self.close()
+            raise ValueError(f"Неподдерживаемый формат индекса: {path}")
+
+        self.fanout = struct.unpack('>256I', self._map[8:8 + 1024])
+        self.count = self.fanout[255]
+        self._sha_start = 8 + 1024
+        self._offset_start = self._sha_start + 24 * self.count  # SHA-1 (20 байт) + CRC32 (4 байта)
+        self._large_offset_start = self._offset_start + 4 * self.count
+
+    def find(self, sha):
+        """Возвращает смещение объекта в pack-файле или None."""
+        first = sha[0]
+        lo = self.fanout[first - 1] if first else 0
+        hi = self.fanout[first]
+        m = self._map
+        start = self._sha_start
+
+        while lo < hi:
+            mid = (lo + hi) // 2
+            current = m[start + 20 * mid:start + 20 * mid + 20]
+            if current < sha:
+                lo = mid + 1
+            elif current > sha:
+                hi = mid
+            else:
+                return self._offset(mid)
+        return None
+
+    def _offset(self, position):
+        pos = self._offset_start + 4 * position
+        offset = struct.unpack('>I', self._map[pos:pos + 4])[0]
+        if offset & 0x80000000:
+            # Смещения больше 2 ГБ хранятся в отдельной таблице 8-байтовых значений
+            pos = self._large_offset_start + 8 * (offset & 0x7fffffff)
+            offset = struct.unpack('>Q', self._map[pos:pos + 8])[0]
+        return offset
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+class _Pack:
+    """Pack-файл, отображенный в память, вместе с его индексом."""
+
+    def __init__(self, pack_path):
+        self.path = pack_path
+        self.index = _PackIndex(pack_path[:-len('.pack')] + '.idx')
+        self._file = open(pack_path, 'rb')
+        self.map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self.map[:4] != b'PACK':
+            self.close()
+            raise ValueError(f"Некорректный pack-файл: {pack_path}")
+
+    def close(self):
+        self.map.close()
+        self._file.close()
+        self.index.close()
+
+class _LRUCache:
+    """Кэш с вытеснением давно не использованных записей и ограничением суммарного размера."""
+
+    def __init__(self, max_size, size_of=len):
+        self.max_size = max_size
+        self._size_of = size_of
+        self._items = OrderedDict()
+        self._size = 0
+
+    def get(self, key):
+        value = self._items.get(key)
+        if value is not None:
+            self._items.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        if key in self._items:
+            return
+        size = self._size_of(value)
+        if size > self.max_size:
+            return
+        self._items[key] = value
+        self._size += size
+        while self._size > self.max_size:
+            _, evicted = self._items.popitem(last=False)
+            self._size -= self._size_of(evicted)
+
+def apply_delta(base, delta):
+    """Восстанавливает объект из базового объекта и delta-инструкций git."""
+    pos = 0
+    _, pos = _read_size(delta, pos)  # Размер базового объекта
+    target_size, pos = _read_size(delta, pos)
+
+    out = bytearray()
+    length = len(delta)
+    while pos < length:
+        opcode = delta[pos]
+        pos += 1
+        if opcode & 0x80:
+            # Копирование диапазона из базового объекта
+            offset = 0
+            size = 0
+            for i in range(4):
+                if opcode & (1 << i):
+                    offset |= delta[pos] << (8 * i)
+                    pos += 1
+            for i in range(3):
+                if opcode & (0x10 << i):
+                    size |= delta[pos] << (8 * i)
+                    pos += 1
+            if size == 0:
+                size = 0x10000
+            out += base[offset:offset + size]
+        elif opcode:
+            # Вставка новых данных
+            out += delta[pos:pos + opcode]
+            pos += opcode
+        else:
+            raise ValueError("Некорректная delta-инструкция")
+
+    if len(out) != target_size:
+        raise ValueError("Размер восстановленного объекта не совпадает с заголовком delta")
+    return bytes(out)
+
+def _read_size(data, pos):
+    """Читает размер в формате переменной длины, используемом в delta."""
+    size = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        size |= (byte & 0x7f) << shift
+        shift += 7
+        if not byte & 0x80:
+            return size, pos
+
+def _inflate(buffer, pos):
+    """Распаковывает zlib-поток, начинающийся с указанной позиции буфера."""
+    decompressor = zlib.decompressobj()
+    parts = []
+    while not decompressor.eof:
+        chunk = buffer[pos:pos + INFLATE_CHUNK_SIZE]
+        if not chunk:
+            raise ValueError("Неожиданный конец сжатых данных")
+        parts.append(decompressor.decompress(chunk))
+        pos += INFLATE_CHUNK_SIZE
+    return b''.join(parts)
+
+def _git_sort_key(entry):
+    """Ключ сортировки записей дерева в порядке git: каталоги сравниваются как 'имя/'."""
+    name, is_tree = entry
+    return name + '/' if is_tree else name
+
+# Символы, которые git записывает в кавычках буквенными escape-последовательностями
+_QUOTE_ESCAPES = {0x07: 'a', 0x08: 'b', 0x09: 't', 0x0a: 'n', 0x0b: 'v', 0x0c: 'f', 0x0d: 'r',
+                  0x22: '"', 0x5c: '\\'}
+
+def quote_path(path):
+    """
+    Записывает путь так же, как git в выводе --name-status, --raw и --numstat
+    (core.quotePath по умолчанию): путь с управляющими символами, кавычками,
+    обратной косой чертой или байтами вне ASCII заключается в кавычки, а такие
+    символы заменяются escape-последовательностями C, байты вне ASCII - восьмеричными кодами.
+    """
+    data = path.encode('utf-8', errors='surrogateescape')
+    if all(0x20 <= byte < 0x7f and byte not in _QUOTE_ESCAPES for byte in data):
+        return path
+    quoted = []
+    for byte in data:
+        if byte in _QUOTE_ESCAPES:
+            quoted.append('\\' + _QUOTE_ESCAPES[byte])
+        elif 0x20 <= byte < 0x7f:
+            quoted.append(chr(byte))
+        else:
+            quoted.append(f'\\{byte:03o}')
+    return '"' + ''.join(quoted) + '"'
+
+class NativeObjectStore:
+    """
+    Чтение объектов Git без запуска git: loose-объекты (zlib) и pack-файлы
+    с индексами через mmap, включая восстановление delta-объектов.
+
+    Предоставляет тот же интерфейс, что и CatFileReader, а также методы для
+    обхода истории и сравнения деревьев внутри процесса.
+    """
+
+    def __init__(self, repo_path, delta_cache_size=64 * 1024 * 1024, tree_cache_size=4096):
+        self.repo_path = repo_path
+        self.git_dir = self._find_git_dir(repo_path)
+        self.objects_dir = os.path.join(self.git_dir, 'objects')
+        self._packs = None
+        self._lock = threading.RLock()
+        # Кэш базовых объектов для delta-цепочек, ограниченный суммарным размером
+        self._delta_base_cache = _LRUCache(delta_cache_size, size_of=lambda item: len(item[1]))
+        # Разобранные деревья общие для всех коммитов, ограничены количеством
+        self._tree_cache = _LRUCache(tree_cache_size, size_of=lambda item: 1)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # Интерфейс, совместимый с CatFileReader
+
+    def read_object(self, rev):
+        """Читает объект по имени ревизии; возвращает GitObject или None."""
+        with self._lock:
+            sha = self.resolve(rev)
+            if sha is None:
+                return None
+            found = self._read_raw(bytes.fromhex(sha))
+            if found is None:
+                return None
+            obj_type, data = found
+            profiler.count('native_bytes_read', len(data))
+            return GitObject(sha, obj_type, len(data), data)
+
+    def read_objects(self, revs):
+        """Читает несколько объектов; возвращает GitObject или None для каждой ревизии."""
+        return [self.read_object(rev) for rev in revs]
+
+    def object_info(self, rev):
+        """Возвращает GitObjectInfo или None, если объект не найден."""
+        obj = self.read_object(rev)
+        return GitObjectInfo(obj.sha, obj.type, obj.size) if obj is not None else None
+
+    def objects_info(self, revs):
+        return [self.object_info(rev) for rev in revs]
+
+    def close(self):
+        """Освобождает отображенные в память pack-файлы."""
+        with self._lock:
+            for pack in self._packs or []:
+                pack.close()
+            self._packs = None
+
+    # Разрешение ревизий
+
+    def resolve(self, rev):
+        """
+        Преобразует имя ревизии в полный хэш объекта.
+
+        Поддерживаются полные хэши, HEAD и ссылки, суффиксы `^`, `^N`, `~N`
+        и выражения `<ревизия>:<путь>`.
+        """
+        path = None
+        if ':' in rev:
+            rev, path = rev.split(':', 1)
+
+        match = _REV_PATTERN.match(rev)
+        if not match:
+            return None
+
+        sha = self._resolve_name(match.group('base'))
+        for operator, number in _SUFFIX_PATTERN.findall(match.group('suffix')):
+            if sha is None:
+                return None
+            if operator == '^':
+                # <ревизия>^N - N-й родитель, <ревизия>^0 - сам коммит
+                index = int(number) if number else 1
+                if index == 0:
+                    continue
+                commit = self.read_commit(self._peel(sha))
+                sha = commit.parents[index - 1] if commit and len(commit.parents) >= index else None
+            else:
+                # <ревизия>~N - N-й предок по первым родителям
+                for _ in range(int(number) if number else 1):
+                    commit = self.read_commit(self._peel(sha)) if sha else None
+                    sha = commit.parents[0] if commit and commit.parents else None
+
+        if sha is None or path is None:
+            return sha
+
+        commit = self.read_commit(self._peel(sha))
+        if commit is None:
+            return None
+        return self._lookup_path(commit.tree, path)
+
+    def _resolve_name(self, name):
+        if re.fullmatch(r'[0-9a-f]{40}', name):
+            return name
+
+        candidates = [name] if name.startswith('refs/') or name == 'HEAD' else [
+            name, f'refs/{name}', f'refs/tags/{name}', f'refs/heads/{name}', f'refs/remotes/{name}'
+        ]
+        for candidate in candidates:
+            sha = self._read_ref(candidate)
+            if sha is not None:
+                return sha
+        return None
+
+    def _read_ref(self, ref, depth=0):
+        if depth > 10:
+            return None
+
+        ref_path = os.path.join(self.git_dir, *ref.split('/'))
+        if os.path.isfile(ref_path):
+            with open(ref_path, 'r', encoding='utf-8') as f:
+                value = f.read().strip()
+            if value.startswith('ref: '):
+                return self._read_ref(value[5:], depth + 1)
+            return value
+
+        packed_refs = os.path.join(self.git_dir, 'packed-refs')
+        if os.path.isfile(packed_refs):
+            with open(packed_refs, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.startswith('#') or line.startswith('^'):
+                        continue
+                    parts = line.strip().split(' ', 1)
+                    if len(parts) == 2 and parts[1] == ref:
+                        return parts[0]
+        return None
+
+    def _peel(self, sha):
+        """Разворачивает аннотированные теги до объекта, на который они указывают."""
+        while True:
+            found = self._read_raw(bytes.fromhex(sha))
+            if found is None or found[0] != 'tag':
+                return sha
+            sha = found[1].split(b'\n', 1)[0].split(b' ', 1)[1].decode('ascii')
+
+    def _lookup_path(self, tree_sha, path):
+        sha = tree_sha
+        for component in [part for part in path.split('/') if part]:
+            entries = self.read_tree(sha)
+            entry = next((e for e in entries if e.name == component), None)
+            if entry is None:
+                return None
+            sha = entry.sha
+        return sha
+
+    # Коммиты и деревья
+
+    def read_commit(self, sha):
+        """Читает и разбирает объект коммита; возвращает NativeCommit или None."""
+        found = self._read_raw(bytes.fromhex(sha))
+        if found is None or found[0] != 'commit':
+            return None
+        raw = found[1]
+
+        header, _, message = raw.partition(b'\n\n')
+        tree = None
+        parents = []
+        author_name = author_email = ''
+        author_time = committer_time = 0
+        for line in header.split(b'\n'):
+            key, _, value = line.partition(b' ')
+            if key == b'tree':
+                tree = value.decode('ascii')
+            elif key == b'parent':
+                parents.append(value.decode('ascii'))
+            elif key == b'author':
+                author_name, author_email, author_time = self._parse_identity(value)
+            elif key == b'committer':
+                committer_time = self._parse_identity(value)[2]
+
+        # Тема коммита (%s) - первый абзац сообщения, объединенный в одну строку
+        first_paragraph = message.decode('utf-8', errors='replace').strip('\n').split('\n\n', 1)[0]
+        subject = ' '.join(line.strip() for line in first_paragraph.split('\n'))
+
+        return NativeCommit(sha, tree, parents, author_name, author_email,
+                            author_time, committer_time, subject, raw)
+
+    @staticmethod
+    def _parse_identity(value):
+        """Разбирает строку вида 'Имя <email> время часовой_пояс'."""
+        text = value.decode('utf-8', errors='replace')
+        name, _, rest = text.partition(' <')
+        email, _, rest = rest.partition('> ')
+        timestamp = rest.split(' ')[0]
+        return name, email, int(timestamp) if timestamp.isdigit() else 0
+
+    def read_tree(self, sha):
+        """Читает дерево; разобранные деревья кэшируются и общие для всех коммитов."""
+        cached = self._tree_cache.get(sha)
+        if cached is not None:
+            return cached
+
+        found = self._read_raw(bytes.fromhex(sha))
+        if found is None or found[0] != 'tree':
+            raise ValueError(f"Объект {sha} не является деревом")
+
+        data = found[1]
+        entries = []
+        pos = 0
+        length = len(data)
+        while pos < length:
+            space = data.index(b' ', pos)
+            nul = data.index(b'\0', space)
+            mode = data[pos:space].decode('ascii')
+            name = data[space + 1:nul].decode('utf-8', errors='surrogateescape')
+            entries.append(TreeEntry(mode.zfill(6), name, data[nul + 1:nul + 21].hex()))
+            pos = nul + 21
+
+        entries = tuple(entries)
+        self._tree_cache.put(sha, entries)
+        return entries
+
+    def diff_trees(self, old_tree, new_tree, prefix=''):
+        """
+        Сравнивает два дерева рекурсивно, пропуская совпадающие поддеревья.
+
+        Args:
+            old_tree: хэш старого дерева или None
+            new_tree: хэш нового дерева или None
+
+        Returns:
+            list: TreeChange со статусами 'A', 'M', 'D' в порядке путей git
+        """
+        if old_tree == new_tree:
+            return []
+
+        old_entries = {e.name: e for e in self.read_tree(old_tree)} if old_tree else {}
+        new_entries = {e.name: e for e in self.read_tree(new_tree)} if new_tree else {}
+
+        keys = set()
+        for name, entry in old_entries.items():
+            keys.add((name, entry.mode == '040000'))
+        for name, entry in new_entries.items():
+            keys.add((name, entry.mode == '040000'))
+
+        changes = []
+        for name, is_tree in sorted(keys, key=_git_sort_key):
+            old = old_entries.get(name)
+            new = new_entries.get(name)
+            old = old if old is not None and (old.mode == '040000') == is_tree else None
+            new = new if new is not None and (new.mode == '040000') == is_tree else None
+            path = prefix + name
+
+            if is_tree:
+                changes.extend(self.diff_trees(old.sha if old else None, new.sha if new else None, path + '/'))
+            elif old is None:
+                changes.append(TreeChange('A', path, None, None, new.mode, new.sha))
+            elif new is None:
+                changes.append(TreeChange('D', path, old.mode, old.sha, None, None))
+            elif old.sha != new.sha or old.mode != new.mode:
+                changes.append(TreeChange('M', path, old.mode, old.sha, new.mode, new.sha))
+        return changes
+
+    def iter_history(self, start='HEAD', since=None, until=None):
+        """
+        Обходит историю от указанной ревизии в порядке git log по умолчанию
+        (по убыванию времени коммита).
+
+        Args:
+            since: минимальное время коммита (unix timestamp) или None
+            until: максимальное время коммита (unix timestamp) или None
+
+        Yields:
+            NativeCommit
+        """
+        start_sha = self.resolve(start)
+        if start_sha is None:
+            return
+
+        start_commit = self.read_commit(self._peel(start_sha))
+        if start_commit is None:
+            return
+
+        seen = {start_commit.sha}
+        queue = [(-start_commit.committer_time, 0, start_commit)]
+        counter = 1
+        while queue:
+            _, _, commit = heapq.heappop(queue)
+            if (since is None or commit.committer_time >= since) and \
+                    (until is None or commit.committer_time <= until):
+                yield commit
+
+            for parent_sha in commit.parents:
+                if parent_sha in seen:
+                    continue
+                seen.add(parent_sha)
+                parent = self.read_commit(parent_sha)
+                if parent is not None:
+                    heapq.heappush(queue, (-parent.committer_time, counter, parent))
+                    counter += 1
+
+    # Чтение объектов из хранилища
+
+    def _read_raw(self, sha):
+        """Возвращает (тип, содержимое) объекта по двоичному хэшу или None."""
+        with self._lock:
+            loose = self._read_loose(sha)
+            if loose is not None:
+                return loose
+
+            for pack in self._get_packs():
+                offset = pack.index.find(sha)
+                if offset is not None:
+                    type_num, data = self._read_packed(pack, offset)
+                    return TYPE_NAMES[type_num], data
+            return None
+
+    def _read_loose(self, sha):
+        hex_sha = sha.hex()
+        path = os.path.join(self.objects_dir, hex_sha[:2], hex_sha[2:])
+        if not os.path.isfile(path):
+            return None
+        with open(path, 'rb') as f:
+            raw = zlib.decompress(f.read())
+        header, _, data = raw.partition(b'\0')
+        obj_type = header.split(b' ', 1)[0].decode('ascii')
+        return obj_type, data
+
+    def _get_packs(self):
+        if self._packs is None:
+            self._packs = []
+            pack_dir = os.path.join(self.objects_dir, 'pack')
+            if os.path.isdir(pack_dir):
+                for name in sorted(os.listdir(pack_dir)):
+                    if name.endswith('.pack') and os.path.isfile(os.path.join(pack_dir, name[:-5] + '.idx')):
+                        self._packs.append(_Pack(os.path.join(pack_dir, name)))
+        return self._packs
+
+    def _read_packed(self, pack, offset):
+        """Читает объект pack-файла по смещению с восстановлением delta-цепочек."""
+        m = pack.map
+        pos = offset
+        byte = m[pos]
+        pos += 1
+        type_num = (byte >> 4) & 7
+        while byte & 0x80:
+            byte = m[pos]
+            pos += 1
+
+        if type_num == OBJ_OFS_DELTA:
+            byte = m[pos]
+            pos += 1
+            distance = byte & 0x7f
+            while byte & 0x80:
+                byte = m[pos]
+                pos += 1
+                distance = ((distance + 1) << 7) | (byte & 0x7f)
+            base_type, base_data = self._read_delta_base(pack, offset - distance)
+            return base_type, apply_delta(base_data, _inflate(m, pos))
+
+        if type_num == OBJ_REF_DELTA:
+            base_sha = m[pos:pos + 20]
+            pos += 20
+            base_offset = pack.index.find(base_sha)
+            if base_offset is not None:
+                base_type, base_data = self._read_delta_base(pack, base_offset)
+            else:
+                base_name, base_data = self._read_raw(base_sha)
+                base_type = TYPE_NUMBERS[base_name]
+            return base_type, apply_delta(base_data, _inflate(m, pos))
+
+        return type_num, _inflate(m, pos)
+
+    def _read_delta_base(self, pack, offset):
+        """Читает базовый объект delta-цепочки через ограниченный кэш."""
+        key = (pack.path, offset)
+        cached = self._delta_base_cache.get(key)
+        if cached is not None:
+            return cached
+        result = self._read_packed(pack, offset)
+        self._delta_base_cache.put(key, result)
+        return result
+
+    @staticmethod
+    def _find_git_dir(repo_path):
+        git_path = os.path.join(repo_path, '.git')
+        if os.path.isfile(git_path):
+            # Рабочие деревья и подмодули хранят путь к каталогу репозитория в файле .git
+            with open(git_path, 'r', encoding='utf-8') as f:
+                content = f.read().strip()
+            if content.startswith('gitdir: '):
+                return os.path.normpath(os.path.join(repo_path, content[len('gitdir: '):]))
+        return git_path
@@ -0,0 +1,203 @@
+import difflib
+import subprocess
+import threading
+from collections import namedtuple
+from profiling import profiler
+
+# Объект Git: полный хэш, тип (blob, tree, commit, tag), размер и содержимое
+GitObject = namedtuple('GitObject', ['sha', 'type', 'size', 'data'])
+
+# Сведения об объекте без содержимого (ответ --batch-check)
+GitObjectInfo = namedtuple('GitObjectInfo', ['sha', 'type', 'size'])
+
+# Git считает файл бинарным, если в первых 8000 байтах есть нулевой байт
+BINARY_CHECK_SIZE = 8000
+
+class CatFileReader:
+    """
+    Сервис чтения объектов Git через постоянные процессы `git cat-file --batch`
+    и `git cat-file --batch-check`.
+
+    Процессы запускаются один раз на репозиторий, запросы передаются через каналы,
+    а пакеты запросов записываются целиком до чтения ответов (конвейерная обработка).
+    """
+
+    def __init__(self, repo_path):
+        self.repo_path = repo_path
+        self._batch = None
+        self._batch_check = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def read_object(self, rev):
+        """
+        Читает объект по имени ревизии (хэш, `<коммит>:<путь>` и т.п.).
+
+        Returns:
+            GitObject или None, если объект не найден
+        """
+        return self.read_objects([rev])[0]
+
+    def read_objects(self, revs):
+        """
+        Читает несколько объектов за один проход по каналу.
+
+        Returns:
+            list: GitObject или None для каждой ревизии в исходном порядке
+        """
+        if not revs:
+            return []
+        with self._lock:
+            if self._batch is None:
+                self._batch = self._start('--batch')
+            process = self._batch
+            writer = self._send_requests(process, revs)
+            try:
+                results = []
+                for _ in revs:
+                    header = self._read_header(process)
+                    if header is None:
+                        results.append(None)
+                        continue
+                    sha, obj_type, size = header
+                    data = process.stdout.read(size)
+                    process.stdout.read(1)  # Завершающий перевод строки
+                    profiler.count('cat_file_bytes_read', size)
+                    results.append(GitObject(sha, obj_type, size, data))
+            finally:
+                writer.join()
+            return results
+
+    def object_info(self, rev):
+        """
+        Возвращает тип и размер объекта без чтения содержимого.
+
+        Returns:
+            GitObjectInfo или None, если объект не найден
+        """
+        return self.objects_info([rev])[0]
+
+    def objects_info(self, revs):
+        """Возвращает GitObjectInfo (или None) для каждой ревизии в исходном порядке."""
+        if not revs:
+            return []
+        with self._lock:
+            if self._batch_check is None:
+                self._batch_check = self._start('--batch-check')
+            process = self._batch_check
+            writer = self._send_requests(process, revs)
+            try:
+                results = []
+                for _ in revs:
+                    header = self._read_header(process)
+                    results.append(GitObjectInfo(*header) if header else None)
+            finally:
+                writer.join()
+            return results
+
+    def close(self):
+        """Завершает процессы git cat-file."""
+        with self._lock:
+            for process in (self._batch, self._batch_check):
+                if process is None:
+                    continue
+                try:
+                    process.stdin.close()
+                except OSError:
+                    pass
+                process.stdout.close()
+                process.wait()
+            self._batch = None
+            self._batch_check = None
+
+    def _start(self, mode):
+        """Запускает процесс git cat-file в указанном режиме."""
+        profiler.record_subprocess()
+        return subprocess.Popen(
+            ['git', 'cat-file', mode],
+            cwd=self.repo_path,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+
+    @staticmethod
+    def _send_requests(process, revs):
+        """
+        Записывает пакет запросов в stdin процесса в отдельном потоке,
+        чтобы большой пакет не блокировался на заполненном канале вывода.
+        """
+        payload = ''.join(rev + '\n' for rev in revs).encode('utf-8')
+
+        def write():
+            process.stdin.write(payload)
+            process.stdin.flush()
+
+        writer = threading.Thread(target=write)
+        writer.daemon = True
+        writer.start()
+        return writer
+
+    @staticmethod
+    def _read_header(process):
+        """
+        Читает строку заголовка ответа.
+
+        Returns:
+            tuple: (sha, type, size) или None для отсутствующих объектов
+        """
+        line = process.stdout.readline()
+        if not line:
+            raise RuntimeError("Процесс git cat-file неожиданно завершился")
+        # "<ревизия> missing" или "<ревизия> ambiguous"; ревизия может содержать пробелы
+        # (путь к файлу), поэтому ответ определяется по последнему слову
+        parts = line.decode('utf-8', errors='replace').rstrip('\n').rsplit(' ', 2)
+        if len(parts) != 3 or parts[2] in ('missing', 'ambiguous') or not parts[2].isdigit():
+            return None
+        return parts[0], parts[1], int(parts[2])
+
+def is_binary_content(data):
+    """Определяет бинарное содержимое тем же способом, что и git."""
+    return b'\0' in data[:BINARY_CHECK_SIZE]
+
+def _split_lines(text):
+    """
+    Разбивает текст на строки так же, как git: только по '\n'
+    (str.splitlines разбивает и по '\x0b', '\x0c', '\x85', '\u2028' и т.п.).
+    """
+    lines = text.split('\n')
+    if lines[-1] == '':
+        lines.pop()
+    return lines
+
+def blob_diff(old_data, new_data, file_path):
+    """
+    Строит diff в формате git для двух версий файла.
+
+    Args:
+        old_data: содержимое до изменения (bytes) или None, если файл добавлен
+        new_data: содержимое после изменения (bytes) или None, если файл удален
+        file_path: путь к файлу
+
+    Returns:
+        str: unified diff с заголовками git или пустая строка, если изменений нет
+    """
+    if old_data == new_data:
+        return ""
+
+    header = f"diff --git a/{file_path} b/{file_path}\n"
+    old_name = f"a/{file_path}" if old_data is not None else "/dev/null"
+    new_name = f"b/{file_path}" if new_data is not None else "/dev/null"
+
+    if is_binary_content(old_data or b'') or is_binary_content(new_data or b''):
+        return header + f"Binary files {old_name} and {new_name} differ\n"
+
+    old_lines = _split_lines((old_data or b'').decode('utf-8', errors='replace'))
+    new_lines = _split_lines((new_data or b'').decode('utf-8', errors='replace'))
+    diff_lines = difflib.unified_diff(old_lines, new_lines, old_name, new_name, lineterm='')
+    return header + ''.join(line + '\n' for line in diff_lines)
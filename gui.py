@@ -380,6 +380,26 @@ class GitDevProductivityGUI:
         )
         advanced_analysis_check.pack(side=tk.LEFT) 
         
+        # Опции сбора данных
+        collection_frame = ttk.Frame(options_frame)
+        collection_frame.pack(fill=tk.X, pady=5)
+        
+        self.streaming_collection_var = tk.BooleanVar(value=False)
+        streaming_collection_check = ttk.Checkbutton(
+            collection_frame,
+            text="Потоковый сбор истории (один процесс git log)",
+            variable=self.streaming_collection_var
+        )
+        streaming_collection_check.pack(side=tk.LEFT, padx=(0, 20))
+        
+        self.use_cache_var = tk.BooleanVar(value=False)
+        use_cache_check = ttk.Checkbutton(
+            collection_frame,
+            text="Использовать кэш (обрабатывать только новые коммиты)",
+            variable=self.use_cache_var
+        )
+        use_cache_check.pack(side=tk.LEFT)
+        
         # Настройки вывода HTML
         html_frame = ttk.LabelFrame(analysis_tab, text="Настройки HTML-отчета", padding=10)
         html_frame.pack(fill=tk.X, padx=10, pady=10)
@@ -499,6 +519,10 @@ class GitDevProductivityGUI:
         load_weights_button = ttk.Button(buttons_frame, text="Загрузить веса", command=self.load_weights)
         load_weights_button.pack(side=tk.RIGHT, padx=5)
         
+        # Пересчет рейтинга по уже созданному отчету, без повторного анализа репозитория
+        rerank_button = ttk.Button(buttons_frame, text="Пересчитать рейтинг", command=self.rerank_weights)
+        rerank_button.pack(side=tk.LEFT, padx=5)
+        
     def setup_exclude_tab(self):
         exclude_tab = ttk.Frame(self.notebook)
         self.notebook.add(exclude_tab, text="Исключение разработчиков")
@@ -764,6 +788,42 @@ class GitDevProductivityGUI:
         except Exception as e:
             messagebox.showerror("Ошибка", f"Не удалось загрузить настройки: {str(e)}")
             
+    def rerank_weights(self):
+        """Пересчитывает рейтинг полезности по сохраненному отчету с текущими весами"""
+        output_file = self.output_file_var.get()
+        if not output_file or not os.path.exists(output_file):
+            messagebox.showerror("Ошибка", "Отчет не найден. Сначала запустите анализ репозитория")
+            return
+        
+        from output_generator import rerank_report
+        
+        custom_weights = {weight_id: var.get() for weight_id, var in self.weight_vars.items()}
+        
+        # Вывод пересчета попадает в журнал
+        redirect = RedirectText(self.log_text)
+        sys.stdout = redirect
+        try:
+            print(f"\n=== Пересчет рейтинга по отчету {output_file} ===")
+            output_data = rerank_report(
+                output_file, output_file,
+                custom_weights=custom_weights,
+                excluded_developers=self.excluded_developers if self.excluded_developers else None
+            )
+            
+            if self.generate_html_var.get():
+                self._generate_html_report(output_file)
+            
+            print("\nТоп-3 разработчика по полезности:")
+            for i, (dev_id, rating) in enumerate(list(output_data['usefulness_rating'].items())[:3], 1):
+                print(f"{i}. {output_data['developers'][dev_id]['name']} ({dev_id}) - {rating['score']:.2f} баллов")
+            self.status_var.set("Рейтинг пересчитан")
+        except Exception as e:
+            print(f"Ошибка при пересчете рейтинга: {str(e)}")
+            messagebox.showerror("Ошибка", f"Ошибка при пересчете рейтинга: {str(e)}")
+        finally:
+            redirect.flush()
+            sys.stdout = sys.__stdout__
+            
     def add_excluded_developer(self):
         """Добавляет разработчика в список исключений"""
         email = self.dev_email_var.get().strip()
@@ -884,7 +944,7 @@ class GitDevProductivityGUI:
             
             # Создаем коллектор и собираем данные
             repo_path = self.repo_path_var.get()
-            collector = GitDataCollector(repo_path)
+            collector = GitDataCollector(repo_path, progress=self._make_progress_reporter())
             git_data = collector.collect_data()
             
             # Получаем список разработчиков
@@ -1018,6 +1078,8 @@ class GitDevProductivityGUI:
             config.END_DATE = self.end_date_var.get() if self.end_date_var.get() else None
             config.MIN_CODE_CHANGE_SIZE = self.min_changes_var.get()
             config.ADVANCED_CHANGE_ANALYSIS = self.advanced_analysis_var.get()
+            config.COLLECTION_MODE = 'streaming' if self.streaming_collection_var.get() else 'per_commit'
+            config.CACHE_ENABLED = self.use_cache_var.get()
             
             # Создаем директорию для выходного файла, если она не существует
             output_dir = os.path.dirname(os.path.abspath(output_file))
@@ -1028,7 +1090,7 @@ class GitDevProductivityGUI:
             print("\n=== Сбор данных из Git ===")
             
             # Собираем данные из Git
-            collector = GitDataCollector(repo_path)
+            collector = GitDataCollector(repo_path, progress=self._make_progress_reporter())
             git_data = collector.collect_data()
             
             print(f"Собрано {len(git_data['commits'])} коммитов")
@@ -1094,30 +1156,7 @@ class GitDevProductivityGUI:
             
             # Генерируем HTML-отчет, если это запрошено
             if self.generate_html_var.get():
-                print("\n=== Генерация HTML-отчета ===")
-                
-                # Определяем имя HTML-файла на основе имени JSON-файла
-                base_name = os.path.basename(output_file)
-                name_without_ext = os.path.splitext(base_name)[0]
-                html_filename = name_without_ext + ".html"
-                
-                # Используем директорию JSON-файла, если не указано иное
-                html_output_dir = self.html_dir_var.get()
-                if html_output_dir == 'git_stats_report':  # Если используется значение по умолчанию
-                    html_output_dir = os.path.dirname(os.path.abspath(output_file))
-                
-                print(f"Директория для HTML: {html_output_dir}")
-                print(f"Имя HTML-файла: {html_filename}")
-                
-                html_gen = HTMLGenerator(
-                    output_file, 
-                    html_output_dir,
-                    html_filename=html_filename
-                )
-                html_gen.generate()
-                
-                html_path = os.path.join(html_output_dir, html_filename)
-                print(f"HTML-отчет сгенерирован: {html_path}")
+                self._generate_html_report(output_file)
                 
             # Добавляем метку времени в конец лога
             timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -1149,6 +1188,35 @@ class GitDevProductivityGUI:
             # Восстанавливаем стандартный вывод
             sys.stdout = sys.__stdout__
             
+    def _generate_html_report(self, output_file):
+        """Генерирует HTML-отчет по JSON-файлу"""
+        from html_generator import HTMLGenerator
+        
+        print("\n=== Генерация HTML-отчета ===")
+        
+        # Определяем имя HTML-файла на основе имени JSON-файла
+        base_name = os.path.basename(output_file)
+        name_without_ext = os.path.splitext(base_name)[0]
+        html_filename = name_without_ext + ".html"
+        
+        # Используем директорию JSON-файла, если не указано иное
+        html_output_dir = self.html_dir_var.get()
+        if html_output_dir == 'git_stats_report':  # Если используется значение по умолчанию
+            html_output_dir = os.path.dirname(os.path.abspath(output_file))
+        
+        print(f"Директория для HTML: {html_output_dir}")
+        print(f"Имя HTML-файла: {html_filename}")
+        
+        html_gen = HTMLGenerator(
+            output_file, 
+            html_output_dir,
+            html_filename=html_filename
+        )
+        html_gen.generate()
+        
+        html_path = os.path.join(html_output_dir, html_filename)
+        print(f"HTML-отчет сгенерирован: {html_path}")
+        
     def _update_developer_list_if_needed(self, analysis_results):
         """Обновляет список разработчиков после анализа, если список пуст"""
         if not self.excluded_developers:
@@ -1165,6 +1233,16 @@ class GitDevProductivityGUI:
             # Обновляем список разработчиков
             self._update_developer_list(dev_info)
 
+    def _make_progress_reporter(self):
+        """Создает источник событий прогресса, отображающий ход сбора данных в строке состояния"""
+        from progress import ProgressReporter, format_event
+        
+        # События приходят не чаще раза в PROGRESS_INTERVAL секунд, поэтому
+        # обновление интерфейса не замедляет сбор данных
+        reporter = ProgressReporter()
+        reporter.subscribe(lambda event: self._safe_update_ui(self.status_var.set, format_event(event)))
+        return reporter
+        
     def _safe_update_ui(self, func, *args, **kwargs):
         """Безопасно обновляет UI из другого потока"""
         if not self.root.winfo_exists():
@@ -3,6 +3,7 @@ import os
 import json
 import shutil
 from datetime import datetime
+from profiling import profiler
 
 class HTMLGenerator:
     """
@@ -248,7 +249,8 @@ class HTMLGenerator:
         html_content = html_content.replace('/* JS_PLACEHOLDER */', js_content)
         
         # Заменяем плейсхолдер JSON данных
-        json_data_str = json.dumps(self.data, ensure_ascii=False)
+        with profiler.stage('html_json_serialization'):
+            json_data_str = json.dumps(self.data, ensure_ascii=False)
         html_content = html_content.replace('/* JSON_DATA_PLACEHOLDER */', json_data_str)
         
         # Обновляем дату генерации
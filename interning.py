@@ -0,0 +1,113 @@
+from functools import lru_cache
+
+class StringTable:
+    """
+    Таблица интернированных строк.
+
+    Каждой уникальной строке сопоставляется целочисленный id (в порядке первого
+    появления), а все вхождения строки заменяются одним общим объектом.
+    Используется для путей файлов и email авторов, которые повторяются
+    в изменениях файлов, статистике разработчиков и статистике команды.
+    """
+
+    __slots__ = ('_ids', 'strings')
+
+    def __init__(self, strings=()):
+        self._ids = {}
+        self.strings = []
+        for value in strings:
+            self.intern(value)
+
+    def intern(self, value):
+        """Возвращает id строки, добавляя ее в таблицу при первом появлении."""
+        string_id = self._ids.get(value)
+        if string_id is None:
+            string_id = self._ids[value] = len(self.strings)
+            self.strings.append(value)
+        return string_id
+
+    def canonical(self, value):
+        """Возвращает общий объект строки, равной value."""
+        return self.strings[self.intern(value)]
+
+    def lookup(self, string_id):
+        """Возвращает строку по id."""
+        return self.strings[string_id]
+
+    def __contains__(self, value):
+        return value in self._ids
+
+    def __len__(self):
+        return len(self.strings)
+
+    def __reduce__(self):
+        return (StringTable, (self.strings,))
+
+@lru_cache(maxsize=65536)
+def developer_id(email):
+    """ID разработчика по email (email в нижнем регистре, вычисляется один раз на адрес)."""
+    return email.lower()
+
+def intern_output_paths(output_data):
+    """
+    Заменяет пути файлов в выводе на id из общей таблицы строк.
+
+    Пути в 'files_modified' и 'most_modified_files' разработчиков и в
+    'total_files_modified' команды заменяются на целочисленные id (ключи
+    'most_modified_files' - на id в виде строк, так как ключи JSON - строки),
+    а сами пути записываются один раз в output_data['string_tables']['paths'].
+    Статистика разработчиков копируется, исходные словари не изменяются.
+
+    Args:
+        output_data: данные вывода JSONOutputGenerator
+
+    Returns:
+        dict: данные вывода с интернированными путями
+    """
+    paths = StringTable()
+    developers = {}
+    for dev_id, stats in output_data['developers'].items():
+        stats = dict(stats)
+        if isinstance(stats['files_modified'], list):  # В приближенном режиме - количество файлов
+            stats['files_modified'] = [paths.intern(path) for path in stats['files_modified']]
+        stats['most_modified_files'] = {
+            str(paths.intern(path)): count for path, count in stats['most_modified_files'].items()
+        }
+        developers[dev_id] = stats
+
+    interned = dict(output_data, developers=developers)
+    team_stats = output_data.get('team_stats')
+    if team_stats is not None and isinstance(team_stats['total_files_modified'], list):
+        interned['team_stats'] = dict(
+            team_stats, total_files_modified=[paths.intern(path) for path in team_stats['total_files_modified']]
+        )
+    interned['string_tables'] = {'paths': paths.strings}
+    return interned
+
+def resolve_output_paths(output_data):
+    """
+    Восстанавливает пути файлов в выводе, записанном с INTERN_OUTPUT_PATHS
+    (обратное преобразование к intern_output_paths).
+    """
+    string_tables = output_data.get('string_tables')
+    if not string_tables:
+        return output_data
+    paths = string_tables['paths']
+    developers = {}
+    for dev_id, stats in output_data['developers'].items():
+        stats = dict(stats)
+        if isinstance(stats['files_modified'], list):
+            stats['files_modified'] = [paths[path_id] for path_id in stats['files_modified']]
+        stats['most_modified_files'] = {
+            paths[int(path_id)]: count for path_id, count in stats['most_modified_files'].items()
+        }
+        developers[dev_id] = stats
+
+    resolved = dict(output_data, developers=developers)
+    del resolved['string_tables']
+    team_stats = output_data.get('team_stats')
+    if team_stats is not None and isinstance(team_stats['total_files_modified'], list):
+        resolved['team_stats'] = dict(
+            team_stats, total_files_modified=[paths[path_id] for path_id in team_stats['total_files_modified']]
+        )
+    return resolved
@@ -5,6 +5,7 @@ from git_collector import GitDataCollector
 from analyzer import DevActivityAnalyzer
 from output_generator import JSONOutputGenerator
 import config
+from profiling import profiler, finish_profiling
 
 def main():
     # Парсим аргументы командной строки
@@ -16,6 +17,41 @@ def main():
     parser.add_argument('--start-date', help='Начальная дата для анализа (YYYY-MM-DD)')
     parser.add_argument('--end-date', help='Конечная дата для анализа (YYYY-MM-DD)')
     parser.add_argument('--min-changes', type=int, default=5, help='Минимальное количество изменений для существенного коммита')
+    parser.add_argument('--collection-mode', choices=['per_commit', 'streaming', 'native'], default=config.COLLECTION_MODE,
+                        help='Режим сбора данных: отдельные вызовы git show, один поток git log или чтение объектов без git '
+                            '(native - приближенный: количество строк может немного отличаться от git, '
+                            'переименования учитываются как удаление и добавление)')
+    parser.add_argument('--object-backend', choices=['show', 'cat-file', 'native'], default=config.OBJECT_BACKEND,
+                        help='Источник содержимого файлов для diff: git show на каждый файл, постоянный git cat-file --batch или чтение объектов без git')
+    parser.add_argument('--workers', type=int, default=config.COLLECTION_WORKERS,
+                        help='Количество процессов для параллельного сбора данных (0 - по количеству ядер)')
+    parser.add_argument('--cache', action='store_true',
+                        help='Использовать постоянный кэш и обрабатывать только новые коммиты')
+    parser.add_argument('--cache-path', help='Путь к файлу кэша (по умолчанию внутри каталога .git репозитория)')
+    parser.add_argument('--score-cache', action='store_true',
+                        help='Сохранять оценки diff между запусками (одинаковые изменения не оцениваются повторно)')
+    parser.add_argument('--score-cache-path', help='Путь к файлу кэша оценок diff (по умолчанию внутри каталога .git репозитория)')
+    parser.add_argument('--score-cache-size', type=int,
+                        help='Количество оценок diff в памяти (включает кэш оценок в пределах запуска; 0 - отключен)')
+    parser.add_argument('--streaming-analysis', action='store_true',
+                        help='Анализировать коммиты по мере сбора, не храня всю историю в памяти')
+    parser.add_argument('--compact', action='store_true',
+                        help='Не хранить сырой вывод git и тексты diff в собранных данных')
+    parser.add_argument('--diff-store', action='store_true',
+                        help='В компактном режиме сохранять тексты diff на диск с адресацией по хэшу')
+    parser.add_argument('--diff-store-path', help='Каталог хранилища diff (по умолчанию внутри каталога .git репозитория)')
+    parser.add_argument('--numstat-fast-path', action='store_true',
+                        help='В потоковом режиме определять существенность по git log --numstat без получения текста патчей')
+    parser.add_argument('--columnar', action='store_true',
+                        help='Колоночный анализ: метрики по коммитам вычисляются групповыми операциями над массивами')
+    parser.add_argument('--approximate-file-stats', action='store_true',
+                        help='Приближенная статистика файлов (HyperLogLog и Misra-Gries) с ограниченной памятью')
+    parser.add_argument('--distinct-error', type=float, default=0.01,
+                        help='Относительная ошибка оценки количества файлов в приближенном режиме (по умолчанию: 0.01)')
+    parser.add_argument('--top-files-error', type=float, default=0.001,
+                        help='Максимальное занижение частоты файла в приближенном режиме, доля изменений (по умолчанию: 0.001)')
+    parser.add_argument('--intern-paths', action='store_true',
+                        help='Записывать пути файлов в JSON один раз (таблица string_tables.paths), а в статистике - их id')
     parser.add_argument('--generate-html', action='store_true', help='Генерировать HTML-отчет')
     parser.add_argument('--html-output-dir', default='git_stats_report', help='Директория для сохранения HTML-отчета')
     parser.add_argument('--inline-html', action='store_true', 
@@ -41,12 +77,38 @@ def main():
     parser.add_argument('--exclude-developers', nargs='+', 
                         help='Список email разработчиков, которых нужно исключить из отчета')
     
+    # Профилирование
+    parser.add_argument('--profile', action='store_true',
+                        help='Профилировать этапы анализа: время, пиковая память, запуски git и объем прочитанных данных')
+    parser.add_argument('--profile-output', help='Сохранить профиль cProfile в файл (включает --profile)')
+    parser.add_argument('--trace-output',
+                        help='Сохранить timeline этапов в формате Chrome trace_event JSON (включает --profile)')
+    
     args = parser.parse_args()
 
     # Настраиваем конфигурацию
     config.IGNORE_REVERTS = args.ignore_reverts
     config.IGNORE_MERGES = args.ignore_merges
     config.REPO_PATH = args.repo_path
+    config.COLLECTION_MODE = args.collection_mode
+    config.COLLECTION_WORKERS = args.workers
+    config.OBJECT_BACKEND = args.object_backend
+    config.CACHE_ENABLED = args.cache
+    config.CACHE_PATH = args.cache_path
+    config.SCORE_CACHE_ENABLED = args.score_cache
+    config.SCORE_CACHE_PATH = args.score_cache_path
+    if args.score_cache_size is not None:
+        config.DIFF_SCORE_CACHE_SIZE = args.score_cache_size
+    config.STREAMING_ANALYSIS = args.streaming_analysis
+    config.COMPACT_COLLECTION = args.compact
+    config.DIFF_STORE_ENABLED = args.diff_store
+    config.DIFF_STORE_PATH = args.diff_store_path
+    config.NUMSTAT_FAST_PATH = args.numstat_fast_path
+    config.COLUMNAR_ANALYSIS = args.columnar
+    config.APPROXIMATE_FILE_STATS = args.approximate_file_stats
+    config.APPROXIMATE_DISTINCT_ERROR = args.distinct_error
+    config.APPROXIMATE_TOP_FILES_ERROR = args.top_files_error
+    config.INTERN_OUTPUT_PATHS = args.intern_paths
 
     # Собираем пользовательские веса в словарь
     custom_weights = {}
@@ -73,31 +135,52 @@ def main():
     else:
         print("Используются стандартные веса для расчета рейтинга полезности")
     
-    # Генерируем выходные данные
-    output_generator = JSONOutputGenerator(analysis_results)
-    output_data = output_generator.generate_output(
-        args.output_file, 
-        custom_weights=custom_weights if custom_weights else None,
-        excluded_developers=args.exclude_developers
-    )
+    if args.profile or args.profile_output or args.trace_output:
+        profiler.enable(track_memory=True, cprofile=bool(args.profile_output))
+    
+    try:
+        # Собираем и анализируем данные из Git
+        collector = GitDataCollector(args.repo_path)
+        if config.STREAMING_ANALYSIS:
+            analyzer = DevActivityAnalyzer()
+            with profiler.stage('collect_and_analyze'):
+                analysis_results = analyzer.analyze_stream(collector.iter_records())
+        else:
+            with profiler.stage('collect_data'):
+                git_data = collector.collect_data()
+            analyzer = DevActivityAnalyzer(git_data)
+            with profiler.stage('analyze'):
+                analysis_results = analyzer.analyze()
+    
+        # Генерируем выходные данные
+        output_generator = JSONOutputGenerator(analysis_results)
+        with profiler.stage('generate_output'):
+            output_data = output_generator.generate_output(
+                args.output_file, 
+                custom_weights=custom_weights if custom_weights else None,
+                excluded_developers=args.exclude_developers
+            )
     
-    print(f"Анализ завершен. Результаты сохранены в {args.output_file}")
+        print(f"Анализ завершен. Результаты сохранены в {args.output_file}")
     
-    # Генерируем HTML-отчет, если это запрошено
-    if args.generate_html:
-        # Определяем имя HTML-файла на основе имени JSON-файла
-        base_name = os.path.basename(args.output_file)
-        name_without_ext = os.path.splitext(base_name)[0]
-        html_filename = name_without_ext + ".html"
+        # Генерируем HTML-отчет, если это запрошено
+        if args.generate_html:
+            # Определяем имя HTML-файла на основе имени JSON-файла
+            base_name = os.path.basename(args.output_file)
+            name_without_ext = os.path.splitext(base_name)[0]
+            html_filename = name_without_ext + ".html"
         
-        from html_generator import HTMLGenerator
+            from html_generator import HTMLGenerator
         
-        html_gen = HTMLGenerator(
-            args.output_file, 
-            args.html_output_dir,
-            html_filename=html_filename
-        )
-        html_gen.generate()
+            html_gen = HTMLGenerator(
+                args.output_file, 
+                args.html_output_dir,
+                html_filename=html_filename
+            )
+            with profiler.stage('generate_html'):
+                html_gen.generate()
+    finally:
+        finish_profiling(args.profile_output, args.trace_output)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,12 +1,75 @@
 import json
 import datetime
 from collections import defaultdict
+from profiling import profiler
+from interning import intern_output_paths, resolve_output_paths
+from sketches import HyperLogLog
+import config
+
+# Факторы рейтинга полезности (в порядке весов) и их имена в разделе 'factors' вывода
+USEFULNESS_FACTORS = [
+    ('substantial_commits', 'substantial_commits'),
+    ('lines', 'lines_contributed'),
+    ('impact', 'commit_impact'),
+    ('substantive_ratio', 'substantive_ratio'),
+    ('revert_penalty', 'revert_penalty'),
+    ('daily_activity', 'daily_activity'),
+    ('merge_penalty', 'merge_penalty'),
+]
+
+def calculate_usefulness_factors(analysis_results):
+    """
+    Рассчитывает нормализованные (0-1) факторы рейтинга полезности.
+    
+    Рейтинг разработчика - сумма факторов, умноженных на веса с теми же
+    именами (см. USEFULNESS_FACTORS), умноженная на 100.
+    
+    Returns:
+        dict: dev_id -> {вес: значение фактора}
+    """
+    # Получаем максимальные значения для нормализации
+    max_substantial_commits = max((dev['substantial_commits'] for dev in analysis_results.values()), default=1)
+    max_lines = max((dev['lines_added'] + dev['lines_removed'] for dev in analysis_results.values()), default=1)
+    max_impact = max((dev['commit_impact'] for dev in analysis_results.values()), default=1)
+    max_active_days = max((dev.get('active_days', 1) for dev in analysis_results.values()), default=1)
+    
+    factors = {}
+    for dev_id, stats in analysis_results.items():
+        # Нормализуем значения от 0 до 1
+        substantial_commits_norm = stats['substantial_commits'] / max_substantial_commits if max_substantial_commits > 0 else 0
+        lines_norm = (stats['lines_added'] + stats['lines_removed']) / max_lines if max_lines > 0 else 0
+        impact_norm = stats['commit_impact'] / max_impact if max_impact > 0 else 0
+        
+        # Рассчитываем соотношение существенных коммитов
+        substantive_ratio = stats['substantial_commits'] / stats['total_commits'] if stats['total_commits'] > 0 else 0
+        
+        # Нормализуем количество revert-коммитов (отрицательный фактор)
+        revert_penalty = stats['reverts_count'] / stats['total_commits'] if stats['total_commits'] > 0 else 0
+        
+        # Нормализуем количество merge-коммитов (отрицательный фактор)
+        merge_penalty = stats.get('merge_count', 0) / stats['total_commits'] if stats['total_commits'] > 0 else 0
+        
+        # Нормализуем активность по времени (коммиты в день)
+        active_days = stats.get('active_days', 1)
+        daily_activity = (stats['total_commits'] / active_days) / (max_active_days / active_days) if active_days > 0 else 0
+        
+        factors[dev_id] = {
+            'substantial_commits': substantial_commits_norm,
+            'lines': lines_norm,
+            'impact': impact_norm,
+            'substantive_ratio': substantive_ratio,
+            'revert_penalty': revert_penalty,
+            'daily_activity': daily_activity,
+            'merge_penalty': merge_penalty,
+        }
+    return factors
 
 class JSONOutputGenerator:
     def __init__(self, analysis_results):
         self.analysis_results = analysis_results
         
-    def generate_output(self, output_file, custom_weights=None, excluded_developers=None):
+    def generate_output(self, output_file, custom_weights=None, excluded_developers=None, metadata=None,
+                        intern_paths=None, saved_team_stats=None):
         """
         Генерирует JSON-вывод из результатов анализа.
         
@@ -14,6 +77,11 @@ class JSONOutputGenerator:
             output_file (str): Путь к выходному JSON-файлу
             custom_weights (dict, optional): Пользовательские веса для расчета рейтинга полезности
             excluded_developers (list, optional): Список email разработчиков, которых нужно исключить из отчета
+            metadata (dict, optional): Дополнительные поля раздела metadata
+            intern_paths (bool, optional): Записать пути через таблицу строк
+                                           (по умолчанию - настройка INTERN_OUTPUT_PATHS)
+            saved_team_stats (dict, optional): Статистика команды из сохраненного отчета
+                                               с тем же составом разработчиков (см. _calculate_team_stats)
         """
         print(f"Формируем вывод в {output_file}...")
         
@@ -28,6 +96,11 @@ class JSONOutputGenerator:
                 else:
                     print(f"  - Предупреждение: разработчик {dev_email} не найден в данных")
         
+        # В приближенном режиме вместо списка файлов выводится оценка их количества
+        for dev_id, stats in developers_data.items():
+            if isinstance(stats['files_modified'], HyperLogLog):
+                developers_data[dev_id] = dict(stats, files_modified=len(stats['files_modified']))
+        
         # Подготавливаем данные для JSON-сериализации
         output_data = {
             'metadata': {
@@ -37,15 +110,19 @@ class JSONOutputGenerator:
             },
             'developers': developers_data
         }
+        if metadata:
+            output_data['metadata'].update(metadata)
         
         # Рассчитываем статистику на уровне команды
         print("Расчет статистики на уровне команды...")
-        team_stats = self._calculate_team_stats(excluded_developers)
+        with profiler.stage('team_stats'):
+            team_stats = self._calculate_team_stats(excluded_developers, saved_team_stats)
         output_data['team_stats'] = team_stats
         
         # Добавляем рейтинг полезности
         print("Расчет рейтинга полезности разработчиков...")
-        output_data['usefulness_rating'] = self._calculate_usefulness_rating(custom_weights)
+        with profiler.stage('usefulness_rating'):
+            output_data['usefulness_rating'] = self._calculate_usefulness_rating(custom_weights)
         
         # Добавляем использованные веса для расчета рейтинга
         default_weights = {
@@ -63,20 +140,33 @@ class JSONOutputGenerator:
             
         output_data['weights_used'] = weights_used
         
+        # Заменяем повторяющиеся пути файлов на id из таблицы строк
+        if intern_paths is None:
+            intern_paths = getattr(config, 'INTERN_OUTPUT_PATHS', False)
+        if intern_paths:
+            output_data = intern_output_paths(output_data)
+        
         # Записываем в JSON-файл
         print(f"Записываем результаты в файл {output_file}...")
-        with open(output_file, 'w', encoding='utf-8') as f:
+        with profiler.stage('json_serialization'), open(output_file, 'w', encoding='utf-8') as f:
             json.dump(output_data, f, indent=2, ensure_ascii=False)
             
         print(f"Данные успешно сохранены в {output_file}")
         return output_data
 
-    def _calculate_team_stats(self, excluded_developers=None):
+    def _calculate_team_stats(self, excluded_developers=None, saved_team_stats=None):
         """
         Рассчитывает статистику на уровне команды.
         
+        Для сохраненного отчета приближенного режима известно только количество файлов
+        каждого разработчика. Количество файлов команды берется из saved_team_stats,
+        а без него (состав разработчиков изменился) записывается лишь верхняя оценка
+        total_files_modified_upper_bound - сумма по разработчикам.
+        
         Args:
             excluded_developers (list, optional): Список email разработчиков, которых нужно исключить из расчетов
+            saved_team_stats (dict, optional): Статистика команды из сохраненного отчета
+                                               с тем же составом разработчиков
         """
         print("Рассчитываем статистику для команды...")
         team_stats = {
@@ -102,12 +192,21 @@ class JSONOutputGenerator:
         
         # Агрегируем статистику
         print("Агрегируем статистику по разработчикам...")
+        files_upper_bound = None
         for dev_id, stats in analysis_results.items():
             team_stats['total_commits'] += stats['total_commits']
             team_stats['total_substantial_commits'] += stats['substantial_commits']
             team_stats['total_lines_added'] += stats['lines_added']
             team_stats['total_lines_removed'] += stats['lines_removed']
-            team_stats['total_files_modified'].update(stats['files_modified'])
+            if isinstance(stats['files_modified'], HyperLogLog) and isinstance(team_stats['total_files_modified'], set):
+                # Приближенный режим: объединяем скетчи разработчиков
+                team_stats['total_files_modified'] = stats['files_modified'].copy()
+            if isinstance(stats['files_modified'], int):
+                # Сохраненный отчет приближенного режима: известно только количество
+                # файлов разработчика, поэтому для команды - верхняя оценка (сумма)
+                files_upper_bound = (files_upper_bound or 0) + stats['files_modified']
+            else:
+                team_stats['total_files_modified'].update(stats['files_modified'])
             team_stats['total_file_types'].update(stats['file_types_modified'])
             
             # Агрегируем распределение коммитов
@@ -118,7 +217,8 @@ class JSONOutputGenerator:
         print(f"Существенных коммитов: {team_stats['total_substantial_commits']}")
         print(f"Всего строк добавлено: {team_stats['total_lines_added']}")
         print(f"Всего строк удалено: {team_stats['total_lines_removed']}")
-        print(f"Всего файлов изменено: {len(team_stats['total_files_modified'])}")
+        total_files = team_stats['total_files_modified']
+        print(f"Всего файлов изменено: {total_files if isinstance(total_files, int) else len(total_files)}")
         print(f"Типов файлов: {len(team_stats['total_file_types'])}")
                 
         # Находим наиболее активных и влиятельных разработчиков
@@ -174,7 +274,20 @@ class JSONOutputGenerator:
             print(f"Среднее влияние коммита: {team_stats['average_commit_impact']:.2f}")
             
         # Преобразуем множества в списки для JSON-сериализации
-        team_stats['total_files_modified'] = list(team_stats['total_files_modified'])
+        # (в приближенном режиме - оценка количества измененных файлов)
+        if files_upper_bound is not None:
+            if saved_team_stats is not None:
+                # Состав разработчиков не изменился - оценка из отчета остается верной
+                team_stats['total_files_modified'] = saved_team_stats.get('total_files_modified')
+                if 'total_files_modified_upper_bound' in saved_team_stats:
+                    team_stats['total_files_modified_upper_bound'] = saved_team_stats['total_files_modified_upper_bound']
+            else:
+                team_stats['total_files_modified'] = None
+                team_stats['total_files_modified_upper_bound'] = files_upper_bound
+        elif isinstance(team_stats['total_files_modified'], HyperLogLog):
+            team_stats['total_files_modified'] = len(team_stats['total_files_modified'])
+        else:
+            team_stats['total_files_modified'] = list(team_stats['total_files_modified'])
         team_stats['total_file_types'] = list(team_stats['total_file_types'])
         
         return team_stats
@@ -232,12 +345,9 @@ class JSONOutputGenerator:
         
         # Создаем словарь только с весами для расчетов
         weight_values = {param: info['weight'] for param, info in weights.items()}
-            
-        # Получаем максимальные значения для нормализации
-        max_substantial_commits = max((dev['substantial_commits'] for dev in self.analysis_results.values()), default=1)
-        max_lines = max((dev['lines_added'] + dev['lines_removed'] for dev in self.analysis_results.values()), default=1)
-        max_impact = max((dev['commit_impact'] for dev in self.analysis_results.values()), default=1)
-        max_active_days = max((dev.get('active_days', 1) for dev in self.analysis_results.values()), default=1)
+        
+        # Нормализованные факторы разработчиков
+        factors = calculate_usefulness_factors(self.analysis_results)
         
         print(f"Расчет рейтинга полезности с следующими весами:")
         for param, info in weights.items():
@@ -245,38 +355,21 @@ class JSONOutputGenerator:
         
         for dev_id, stats in self.analysis_results.items():
             print(f"Расчет рейтинга для разработчика: {stats['name']} <{dev_id}>")
-            
-            # Нормализуем значения от 0 до 1
-            substantial_commits_norm = stats['substantial_commits'] / max_substantial_commits if max_substantial_commits > 0 else 0
-            lines_norm = (stats['lines_added'] + stats['lines_removed']) / max_lines if max_lines > 0 else 0
-            impact_norm = stats['commit_impact'] / max_impact if max_impact > 0 else 0
-            
-            # Рассчитываем соотношение существенных коммитов
-            substantive_ratio = stats['substantial_commits'] / stats['total_commits'] if stats['total_commits'] > 0 else 0
-            
-            # Нормализуем количество revert-коммитов (отрицательный фактор)
-            revert_penalty = stats['reverts_count'] / stats['total_commits'] if stats['total_commits'] > 0 else 0
-            
-            # Нормализуем количество merge-коммитов (отрицательный фактор)
-            merge_penalty = stats.get('merge_count', 0) / stats['total_commits'] if stats['total_commits'] > 0 else 0
-            
-            # Нормализуем активность по времени (коммиты в день)
-            active_days = stats.get('active_days', 1)
-            daily_activity = (stats['total_commits'] / active_days) / (max_active_days / active_days) if active_days > 0 else 0
+            dev_factors = factors[dev_id]
             
             # Рассчитываем итоговый рейтинг (с весами)
             usefulness_score = (
-                substantial_commits_norm * weight_values['substantial_commits'] +
-                lines_norm * weight_values['lines'] +
-                impact_norm * weight_values['impact'] +
-                substantive_ratio * weight_values['substantive_ratio'] +
-                revert_penalty * weight_values['revert_penalty'] +
-                daily_activity * weight_values['daily_activity']
+                dev_factors['substantial_commits'] * weight_values['substantial_commits'] +
+                dev_factors['lines'] * weight_values['lines'] +
+                dev_factors['impact'] * weight_values['impact'] +
+                dev_factors['substantive_ratio'] * weight_values['substantive_ratio'] +
+                dev_factors['revert_penalty'] * weight_values['revert_penalty'] +
+                dev_factors['daily_activity'] * weight_values['daily_activity']
             )
             
             # Добавляем штраф за merge-коммиты, если указан
             if 'merge_penalty' in weight_values:
-                usefulness_score += merge_penalty * weight_values['merge_penalty']
+                usefulness_score += dev_factors['merge_penalty'] * weight_values['merge_penalty']
             
             print(f"  - Итоговый рейтинг перед нормализацией: {usefulness_score}")
             
@@ -288,13 +381,7 @@ class JSONOutputGenerator:
             usefulness_rating[dev_id] = {
                 'score': normalized_score,
                 'factors': {
-                    'substantial_commits': round(substantial_commits_norm * 100, 2),
-                    'lines_contributed': round(lines_norm * 100, 2),
-                    'commit_impact': round(impact_norm * 100, 2),
-                    'substantive_ratio': round(substantive_ratio * 100, 2),
-                    'revert_penalty': round(revert_penalty * 100, 2),
-                    'daily_activity': round(daily_activity * 100, 2),
-                    'merge_penalty': round(merge_penalty * 100, 2)
+                    name: round(dev_factors[param] * 100, 2) for param, name in USEFULNESS_FACTORS
                 },
                 'factor_descriptions': {
                     param: info['description'] for param, info in weights.items()
@@ -303,3 +390,51 @@ class JSONOutputGenerator:
         
         # Сортируем по убыванию рейтинга
         return dict(sorted(usefulness_rating.items(), key=lambda x: x[1]['score'], reverse=True))
+
+def load_report(report_file):
+    """Загружает сохраненный JSON-отчет (например, developer_stats.json)."""
+    with open(report_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def rerank_report(report_file, output_file, custom_weights=None, excluded_developers=None):
+    """
+    Пересчитывает рейтинг полезности и статистику команды по сохраненному отчету
+    без повторного сбора и анализа данных.
+    
+    Статистика разработчиков берется из отчета как есть. Веса отчета
+    (weights_used) служат основой, custom_weights их переопределяют.
+    Разработчики, исключенные при создании отчета, в нем отсутствуют
+    и в пересчете не участвуют. Количество файлов команды в отчете приближенного
+    режима сохраняется, если разработчики не исключаются дополнительно.
+    
+    Args:
+        report_file (str): Путь к ранее созданному JSON-отчету
+        output_file (str): Путь к выходному JSON-файлу (может совпадать с report_file)
+        custom_weights (dict, optional): Веса, переопределяющие веса отчета
+        excluded_developers (list, optional): Дополнительно исключаемые разработчики
+    
+    Returns:
+        dict: Данные нового отчета
+    """
+    report = load_report(report_file)
+    # Пути, записанные через таблицу строк, восстанавливаются и в новом отчете записываются так же
+    intern_paths = 'string_tables' in report or getattr(config, 'INTERN_OUTPUT_PATHS', False)
+    report = resolve_output_paths(report)
+    weights = dict(report.get('weights_used', {}))
+    weights.update(custom_weights or {})
+    
+    previous_excluded = report.get('metadata', {}).get('excluded_developers', [])
+    excluded = [email for email in excluded_developers or [] if email not in previous_excluded]
+    
+    output_data = JSONOutputGenerator(report['developers']).generate_output(
+        output_file,
+        custom_weights=weights or None,
+        excluded_developers=excluded or None,
+        metadata={
+            'excluded_developers': previous_excluded + excluded,
+            'reranked_from': report_file,
+        },
+        intern_paths=intern_paths,
+        saved_team_stats=None if excluded else report.get('team_stats')
+    )
+    return output_data
@@ -0,0 +1,107 @@
+import os
+import re
+from functools import lru_cache
+import config
+
+# Имена директорий с тестами
+TEST_DIRECTORY_NAMES = ('test', 'tests', 'testing', 'spec', 'specs')
+
+# Фрагменты имени файла, по которым он считается тестом (в порядке проверки)
+TEST_NAME_MARKERS = ('test_', '_test', '.test', 'spec_', '_spec')
+
+# Компонент пути (в нижнем регистре), совпадающий с именем тестовой директории
+_SEPARATOR = re.escape(os.path.sep)
+_TEST_DIRECTORY = re.compile(
+    f"(?:^|{_SEPARATOR})(?:{'|'.join(TEST_DIRECTORY_NAMES)})(?:{_SEPARATOR}|$)"
+)
+
+_SOURCE_EXTENSIONS = {'.py', '.js', '.jsx', '.ts', '.tsx', '.java', '.c', '.cpp', '.h', '.cs', '.go', '.rb', '.php'}
+_DOC_EXTENSIONS = {'.md', '.rst', '.txt', '.pdf', '.doc', '.docx'}
+_CONFIG_EXTENSIONS = {'.json', '.yaml', '.yml', '.toml', '.ini', '.config', '.conf', '.xml'}
+_ASSET_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.svg', '.ico', '.css', '.scss', '.sass', '.less'}
+
+class PathInfo:
+    """
+    Признаки пути к файлу, вычисляемые один раз (см. classify_path).
+
+    Атрибуты:
+        path: путь к файлу
+        name: имя файла (os.path.basename)
+        ext: расширение в нижнем регистре ('' - без расширения)
+        test_marker: первый из TEST_NAME_MARKERS, входящий в имя файла, или None
+        in_test_dir: True, если один из компонентов пути - тестовая директория
+        category: категория изменения ('code', 'test', 'doc', 'config', 'asset', 'other')
+        file_category: категория по расширению для статистики разработчика
+                       ('code', 'markup', 'style', 'config', 'other'; None без расширения)
+    """
+
+    __slots__ = ('path', 'name', 'ext', 'test_marker', 'in_test_dir', 'category', 'file_category')
+
+    def __init__(self, path):
+        path_lower = path.lower()
+        name_lower = os.path.basename(path_lower)
+
+        self.path = path
+        self.name = os.path.basename(path)
+        self.ext = os.path.splitext(path)[1].lower()
+        self.test_marker = next((marker for marker in TEST_NAME_MARKERS if marker in name_lower), None)
+        self.in_test_dir = _TEST_DIRECTORY.search(path_lower) is not None
+        self.category = _change_category(path_lower, self.ext)
+        self.file_category = extension_category(self.ext)
+
+    def __repr__(self):
+        return f"PathInfo({self.path!r})"
+
+def _change_category(path_lower, ext):
+    """Категория изменения по пути (см. utils.categorize_changes)."""
+    is_test = 'test' in path_lower or 'spec' in path_lower
+
+    # Исходный код
+    if ext in _SOURCE_EXTENSIONS:
+        return 'test' if is_test else 'code'
+
+    # Тесты
+    if is_test:
+        return 'test'
+
+    # Документация
+    if ext in _DOC_EXTENSIONS or 'readme' in path_lower or 'doc' in path_lower:
+        return 'doc'
+
+    # Конфигурация
+    if ext in _CONFIG_EXTENSIONS or 'config' in path_lower:
+        return 'config'
+
+    # Ресурсы
+    if ext in _ASSET_EXTENSIONS:
+        return 'asset'
+
+    # Другое
+    return 'other'
+
+@lru_cache(maxsize=1024)
+def extension_category(ext):
+    """Категория файла по расширению и спискам расширений из config."""
+    if not ext:
+        return None
+    if ext in config.CODE_FILE_EXTENSIONS:
+        return 'code'
+    if ext in config.MARKUP_FILE_EXTENSIONS:
+        return 'markup'
+    if ext in config.STYLE_FILE_EXTENSIONS:
+        return 'style'
+    if ext in config.CONFIG_FILE_EXTENSIONS:
+        return 'config'
+    return 'other'
+
+@lru_cache(maxsize=65536)
+def classify_path(path):
+    """
+    Возвращает признаки пути (PathInfo).
+
+    Результат кэшируется для каждого различного пути, поэтому часто изменяемые
+    файлы разбираются один раз. Списки расширений из config читаются при первой
+    классификации пути; после их изменения кэши сбрасываются
+    classify_path.cache_clear() и extension_category.cache_clear().
+    """
+    return PathInfo(path)
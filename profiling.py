@@ -0,0 +1,213 @@
+import cProfile
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+class Profiler:
+    """
+    Инструментирование этапов анализа: таймеры, счетчики и пиковый объем памяти.
+
+    Этапы (stage) вкладываются друг в друга и попадают в timeline формата Chrome
+    trace_event; накопительные таймеры (timer) суммируют время часто вызываемых
+    участков без записи отдельных событий. При выключенном профилировщике
+    все вызовы сводятся к проверке флага.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.track_memory = False
+        self.counters = {}
+        self.stages = []       # Завершенные этапы в порядке завершения
+        self.trace_events = []
+        self._stack = []       # Открытые этапы: [имя, начало, максимум памяти вложенных этапов]
+        self._origin = time.perf_counter()
+        self._cprofile = None
+        self._lock = threading.Lock()
+
+    def enable(self, track_memory=True, cprofile=False):
+        """
+        Включает сбор данных профилирования.
+
+        Args:
+            track_memory: отслеживать пиковый объем памяти этапов через tracemalloc
+            cprofile: дополнительно собирать профиль cProfile
+        """
+        self.reset()
+        self.enabled = True
+        self.track_memory = track_memory
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if cprofile:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def disable(self):
+        """Выключает сбор данных (собранные результаты сохраняются)."""
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self.track_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.enabled = False
+
+    def reset(self):
+        self.counters = {}
+        self.stages = []
+        self.trace_events = []
+        self._stack = []
+        self._origin = time.perf_counter()
+        self._cprofile = None
+
+    def stage(self, name):
+        """Контекстный менеджер этапа конвейера (время, память, событие timeline)."""
+        if not self.enabled:
+            return nullcontext()
+        return self._stage(name)
+
+    @contextmanager
+    def _stage(self, name):
+        if self.track_memory:
+            # Пик памяти внешних этапов сохраняется до сброса для вложенного этапа
+            peak = tracemalloc.get_traced_memory()[1]
+            for frame in self._stack:
+                frame[2] = max(frame[2], peak)
+            tracemalloc.reset_peak()
+        frame = [name, time.perf_counter(), 0]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self._stack.pop()
+            record = {
+                'name': name,
+                'start': round(frame[1] - self._origin, 6),
+                'seconds': round(end - frame[1], 6),
+                'depth': len(self._stack),
+            }
+            if self.track_memory:
+                peak = max(frame[2], tracemalloc.get_traced_memory()[1])
+                record['peak_memory_bytes'] = peak
+                if self._stack:
+                    self._stack[-1][2] = max(self._stack[-1][2], peak)
+            self.stages.append(record)
+            self.trace_events.append({
+                'name': name,
+                'cat': 'stage',
+                'ph': 'X',
+                'ts': round((frame[1] - self._origin) * 1e6, 3),
+                'dur': round((end - frame[1]) * 1e6, 3),
+                'pid': os.getpid(),
+                'tid': threading.get_ident(),
+                'args': {key: value for key, value in record.items() if key not in ('name', 'start', 'seconds')},
+            })
+
+    def timer(self, name):
+        """Накопительный таймер: суммирует время и количество вызовов участка кода."""
+        if not self.enabled:
+            return nullcontext()
+        return self._timer(name)
+
+    @contextmanager
+    def _timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.counters[f'{name}.seconds'] = self.counters.get(f'{name}.seconds', 0.0) + elapsed
+                self.counters[f'{name}.calls'] = self.counters.get(f'{name}.calls', 0) + 1
+
+    def count(self, name, value=1):
+        """Увеличивает счетчик."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def record_subprocess(self, output=None):
+        """Учитывает запуск внешнего процесса и объем прочитанного из него вывода."""
+        if not self.enabled:
+            return
+        self.count('subprocess_spawns')
+        if output:
+            self.count('subprocess_bytes_read', len(output))
+
+    def metered(self, lines, name='subprocess_bytes_read'):
+        """Оборачивает построчный поток вывода, подсчитывая объем прочитанных данных."""
+        if not self.enabled:
+            return lines
+        return self._metered(lines, name)
+
+    def _metered(self, lines, name):
+        total = 0
+        try:
+            for line in lines:
+                total += len(line)
+                yield line
+        finally:
+            self.count(name, total)
+
+    def summary(self):
+        """Возвращает собранные данные в виде словаря."""
+        return {
+            'stages': list(self.stages),
+            'counters': dict(sorted(self.counters.items())),
+        }
+
+    def format_summary(self):
+        """Возвращает собранные данные в виде строк для вывода."""
+        lines = ["Профилирование этапов:"]
+        for record in sorted(self.stages, key=lambda item: item['start']):
+            text = f"{'  ' * (record['depth'] + 1)}{record['name']}: {record['seconds']:.3f} с"
+            if 'peak_memory_bytes' in record:
+                text += f", пик памяти {record['peak_memory_bytes'] / 1024 / 1024:.1f} МБ"
+            lines.append(text)
+        if self.counters:
+            lines.append("Счетчики:")
+            for name, value in sorted(self.counters.items()):
+                value = f"{value:.3f}" if isinstance(value, float) else value
+                lines.append(f"  {name}: {value}")
+        return lines
+
+    def write_trace(self, path):
+        """Сохраняет timeline этапов в формате Chrome trace_event (chrome://tracing, Perfetto)."""
+        events = list(self.trace_events)
+        end_ts = round((time.perf_counter() - self._origin) * 1e6, 3)
+        for name, value in sorted(self.counters.items()):
+            events.append({'name': name, 'ph': 'C', 'ts': end_ts, 'pid': os.getpid(), 'args': {'value': value}})
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+    def write_cprofile(self, path):
+        """Сохраняет профиль cProfile (для pstats или snakeviz)."""
+        if self._cprofile is None:
+            raise ValueError("Профиль cProfile не собирался")
+        self._cprofile.dump_stats(path)
+
+# Профилировщик процесса, используемый модулями анализатора
+profiler = Profiler()
+
+def finish_profiling(profile_output=None, trace_output=None, log=print):
+    """
+    Выключает профилировщик, выводит сводку и сохраняет запрошенные файлы.
+
+    Args:
+        profile_output: путь для профиля cProfile (опционально)
+        trace_output: путь для timeline в формате Chrome trace_event (опционально)
+        log: функция вывода строк сводки
+    """
+    if not profiler.enabled:
+        return
+    profiler.disable()
+    for line in profiler.format_summary():
+        log(line)
+    if profile_output:
+        profiler.write_cprofile(profile_output)
+        log(f"Профиль cProfile сохранен в {profile_output}")
+    if trace_output:
+        profiler.write_trace(trace_output)
+        log(f"Timeline этапов сохранен в {trace_output}")
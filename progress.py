@@ -0,0 +1,138 @@
+import logging
+import sys
+import threading
+import time
+from collections import namedtuple
+import config
+
+# Событие прогресса: название этапа, обработано/всего, скорость (единиц в секунду),
+# время с начала этапа и признак завершения этапа
+ProgressEvent = namedtuple('ProgressEvent', ['stage', 'done', 'total', 'rate', 'elapsed', 'finished'])
+
+class ProgressReporter:
+    """
+    Источник событий прогресса с ограничением частоты.
+
+    Этап начинается вызовом start(), продвигается вызовами advance() и завершается
+    вызовом finish(). Подписчики получают ProgressEvent не чаще одного раза
+    в interval секунд (или каждые every единиц, если задано), а также в начале
+    и в конце этапа, поэтому стоимость вывода не зависит от количества коммитов.
+    """
+
+    def __init__(self, interval=None, every=None):
+        self.interval = interval if interval is not None else getattr(config, 'PROGRESS_INTERVAL', 0.25)
+        self.every = every if every is not None else getattr(config, 'PROGRESS_EVERY', 0)
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._reset(None, 0)
+
+    def subscribe(self, callback):
+        """
+        Подписывает обработчик на события прогресса.
+
+        Args:
+            callback: функция, принимающая ProgressEvent
+
+        Returns:
+            callback (для последующей отписки)
+        """
+        self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        """Отписывает обработчик от событий прогресса."""
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def start(self, stage, total=0):
+        """Начинает новый этап обработки с известным (или нулевым) общим количеством."""
+        with self._lock:
+            self._reset(stage, total)
+            event = self._event(False)
+        self._publish(event)
+
+    def set_total(self, total):
+        """Уточняет общее количество единиц текущего этапа."""
+        with self._lock:
+            self.total = total
+
+    def advance(self, count=1):
+        """Отмечает обработку count единиц; событие отправляется с учетом ограничения частоты."""
+        with self._lock:
+            self.done += count
+            now = time.monotonic()
+            due = (
+                now - self._last_emit_time >= self.interval or
+                (self.every and self.done - self._last_emit_done >= self.every)
+            )
+            if not due:
+                return
+            event = self._event(False, now)
+        self._publish(event)
+
+    def finish(self):
+        """Завершает текущий этап и отправляет итоговое событие."""
+        with self._lock:
+            if self.stage is None:
+                return
+            event = self._event(True)
+            self._reset(None, 0)
+        self._publish(event)
+
+    def _reset(self, stage, total):
+        self.stage = stage
+        self.total = total or 0
+        self.done = 0
+        self._start_time = time.monotonic()
+        self._last_emit_time = self._start_time
+        self._last_emit_done = 0
+
+    def _event(self, finished, now=None):
+        """Формирует событие по текущему состоянию (вызывается под блокировкой)."""
+        now = now if now is not None else time.monotonic()
+        elapsed = now - self._start_time
+        self._last_emit_time = now
+        self._last_emit_done = self.done
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        return ProgressEvent(self.stage, self.done, self.total, rate, elapsed, finished)
+
+    def _publish(self, event):
+        for callback in list(self._subscribers):
+            callback(event)
+
+def format_event(event):
+    """Форматирует событие прогресса в строку для отображения."""
+    if event.total:
+        percentage = min(100.0, event.done / event.total * 100)
+        text = f"{event.stage}: {percentage:.1f}% ({event.done}/{event.total})"
+    else:
+        text = f"{event.stage}: {event.done}"
+    if event.done:
+        text += f", {event.rate:.1f}/с"
+    if event.finished:
+        text += f" - завершено за {event.elapsed:.1f} с"
+    return text
+
+def console_sink(stream=None):
+    """
+    Создает обработчик, выводящий события прогресса в поток (по умолчанию sys.stdout).
+
+    Returns:
+        функция-подписчик для ProgressReporter.subscribe
+    """
+    def sink(event):
+        output = stream or sys.stdout
+        output.write(format_event(event) + '\n')
+        output.flush()
+    return sink
+
+def logging_sink(logger, level=logging.INFO):
+    """
+    Создает обработчик, записывающий события прогресса в лог.
+
+    Returns:
+        функция-подписчик для ProgressReporter.subscribe
+    """
+    def sink(event):
+        logger.log(level, format_event(event))
+    return sink
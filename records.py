@@ -0,0 +1,145 @@
+# Значение по умолчанию для необязательных полей: поле остается незаданным
+_UNSET = object()
+
+class Record:
+    """
+    Базовый класс компактных записей собранных данных.
+
+    Записи используют __slots__ вместо словаря атрибутов, поэтому занимают
+    в несколько раз меньше памяти, чем dict с теми же ключами. Для совместимости
+    с кодом, работающим со словарями, записи поддерживают доступ по ключу
+    (record['hash'], record.get('is_merge', False), 'diff' in record, items())
+    и сравнение со словарями. Необязательные поля, которые не были заданы,
+    ведут себя как отсутствующие ключи.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_dict(cls, data):
+        """Создает запись из словаря (например, загруженного из JSON)."""
+        return cls(**data)
+
+    def to_dict(self):
+        """Возвращает заданные поля записи в виде словаря (для JSON-сериализации)."""
+        return {key: getattr(self, key) for key in self.keys()}
+
+    def copy(self):
+        record = type(self).__new__(type(self))
+        for key in self.keys():
+            setattr(record, key, getattr(self, key))
+        return record
+
+    def keys(self):
+        return [key for key in self.__slots__ if hasattr(self, key)]
+
+    def values(self):
+        return [getattr(self, key) for key in self.keys()]
+
+    def items(self):
+        return [(key, getattr(self, key)) for key in self.keys()]
+
+    def get(self, key, default=None):
+        if key in self.__slots__:
+            return getattr(self, key, default)
+        return default
+
+    def __getitem__(self, key):
+        if key in self.__slots__:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                pass
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(f"{type(self).__name__} не содержит поля {key!r}")
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self.__slots__ and hasattr(self, key)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __eq__(self, other):
+        if isinstance(other, (Record, dict)):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+class Commit(Record):
+    """Метаданные коммита."""
+
+    __slots__ = ('hash', 'author_name', 'author_email', 'timestamp', 'subject', 'is_revert', 'is_merge')
+
+    def __init__(self, hash, author_name, author_email, timestamp, subject, is_revert=False, is_merge=False):
+        self.hash = hash
+        self.author_name = author_name
+        self.author_email = author_email
+        self.timestamp = timestamp
+        self.subject = subject
+        self.is_revert = is_revert
+        self.is_merge = is_merge
+
+class CommitStats(Record):
+    """Статистика изменений коммита."""
+
+    __slots__ = ('files_changed', 'insertions', 'deletions')
+
+    def __init__(self, files_changed=0, insertions=0, deletions=0):
+        self.files_changed = files_changed
+        self.insertions = insertions
+        self.deletions = deletions
+
+class CommitDetail(Record):
+    """Детали коммита: статистика и (вне компактного режима) сырой вывод git или его хэш."""
+
+    __slots__ = ('raw_output', 'stats', 'raw_digest')
+
+    def __init__(self, stats, raw_output=_UNSET, raw_digest=_UNSET):
+        self.stats = stats
+        if raw_output is not _UNSET:
+            self.raw_output = raw_output
+        if raw_digest is not _UNSET:
+            self.raw_digest = raw_digest
+
+    @classmethod
+    def from_dict(cls, data):
+        data = dict(data)
+        data['stats'] = CommitStats.from_dict(data['stats'])
+        return cls(**data)
+
+class FileChange(Record):
+    """Изменение файла в коммите: текст diff или (в компактном режиме) его хэш."""
+
+    __slots__ = ('change_type', 'file_path', 'file_ext', 'diff', 'diff_digest', 'is_substantial')
+
+    def __init__(self, change_type, file_path, file_ext, is_substantial, diff=_UNSET, diff_digest=_UNSET):
+        self.change_type = change_type
+        self.file_path = file_path
+        self.file_ext = file_ext
+        self.is_substantial = is_substantial
+        if diff is not _UNSET:
+            self.diff = diff
+        if diff_digest is not _UNSET:
+            self.diff_digest = diff_digest
+
+class DeveloperInfo(Record):
+    """Сведения о разработчике: имя и время первого и последнего коммита."""
+
+    __slots__ = ('name', 'email', 'first_commit_timestamp', 'last_commit_timestamp')
+
+    def __init__(self, name, email, first_commit_timestamp, last_commit_timestamp):
+        self.name = name
+        self.email = email
+        self.first_commit_timestamp = first_commit_timestamp
+        self.last_commit_timestamp = last_commit_timestamp
@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import sqlite3
+from collections import OrderedDict
+from profiling import profiler
+
+def diff_fingerprint(diff):
+    """
+    Отпечаток содержимого diff, не зависящий от номеров строк и заголовков файла.
+
+    Заголовок файла (diff --git, index с хэшами blob-объектов, ---/+++) и строки
+    '@@ -a,b +c,d @@' отбрасываются, поэтому одинаковые изменения, перенесенные
+    cherry-pick или backport в другое место истории, получают одинаковый отпечаток.
+    Строки '+'/'-' вне hunk учитываются так же, как при оценке (diff_statistics):
+    строки '+++'/'---' заменяются общей меткой, остальные сохраняются целиком.
+
+    Returns:
+        bytes: 16-байтовый хэш BLAKE2b
+    """
+    hunks = diff.split('\n@@')
+    digest = hashlib.blake2b(digest_size=16)
+
+    preamble = hunks[0]
+    if '\n+' in preamble or '\n-' in preamble or preamble[:1] in ('+', '-'):
+        marked = ['h' if line[:3] in ('+++', '---') else line
+                  for line in preamble.split('\n') if line[:1] in ('+', '-')]
+        digest.update('\n'.join(marked).encode('utf-8', 'surrogatepass'))
+
+    for hunk in hunks[1:]:
+        # Строка заголовка hunk (номера строк и контекст функции) не учитывается
+        digest.update(b'\0')
+        body_start = hunk.find('\n')
+        if body_start >= 0:
+            digest.update(hunk[body_start:].encode('utf-8', 'surrogatepass'))
+    return digest.digest()
+
+class DiffScore:
+    """Оценка содержимого diff, не зависящая от пути файла и сообщения коммита."""
+
+    __slots__ = ('total', 'only_whitespace', 'complexity')
+
+    def __init__(self, total, only_whitespace, complexity):
+        self.total = total                      # Количество добавленных и удаленных строк
+        self.only_whitespace = only_whitespace  # Изменены только пробелы
+        self.complexity = complexity            # Коэффициент сложности изменений
+
+class DiffScoreCache:
+    """
+    Кэш оценок diff по отпечатку содержимого (diff_fingerprint).
+
+    Оценки хранятся в памяти с вытеснением давно не использованных записей,
+    а при указании db_path - также в SQLite, поэтому повторные запуски на той же
+    истории и одинаковые изменения в разных репозиториях не оцениваются заново.
+    Записи в базе хранятся вместе с отпечатком настроек оценки (settings).
+    """
+
+    # Версия формата записей; увеличивается при изменении способа оценки
+    SCHEMA_VERSION = 1
+
+    # Количество новых записей, после которого они сохраняются в базу
+    _FLUSH_BATCH_SIZE = 1000
+
+    # Количество оценок в памяти по умолчанию
+    DEFAULT_MAX_ENTRIES = 65536
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, db_path=None, settings=''):
+        self.max_entries = max_entries
+        self.settings = settings
+        self._items = OrderedDict()
+        self._pending = []
+        self.connection = None
+
+        if db_path:
+            db_dir = os.path.dirname(os.path.abspath(db_path))
+            if db_dir and not os.path.exists(db_dir):
+                os.makedirs(db_dir, exist_ok=True)
+
+            # Базу могут одновременно использовать дочерние процессы параллельного сбора
+            self.connection = sqlite3.connect(db_path, timeout=30)
+            self.connection.execute('''
+                CREATE TABLE IF NOT EXISTS diff_scores (
+                    fingerprint BLOB NOT NULL,
+                    settings TEXT NOT NULL,
+                    total INTEGER NOT NULL,
+                    only_whitespace INTEGER NOT NULL,
+                    complexity REAL NOT NULL,
+                    PRIMARY KEY (fingerprint, settings)
+                )
+            ''')
+            self.connection.commit()
+
+    @staticmethod
+    def default_path(repo_path):
+        """Возвращает путь к файлу кэша оценок по умолчанию внутри каталога .git репозитория."""
+        return os.path.join(repo_path, '.git', 'dev_productivity_scores.sqlite')
+
+    @classmethod
+    def settings_fingerprint(cls, complexity_indicators, min_complexity, max_complexity):
+        """Отпечаток настроек, от которых зависит коэффициент сложности."""
+        settings = {
+            'schema_version': cls.SCHEMA_VERSION,
+            'complexity_indicators': list(complexity_indicators),
+            'complexity_range': [min_complexity, max_complexity],
+        }
+        encoded = json.dumps(settings, sort_keys=True).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
+
+    def get(self, fingerprint):
+        """Возвращает DiffScore для отпечатка или None."""
+        score = self._items.get(fingerprint)
+        if score is not None:
+            self._items.move_to_end(fingerprint)
+            profiler.count('diff_score_cache_hits')
+            return score
+
+        if self.connection is not None:
+            row = self.connection.execute(
+                'SELECT total, only_whitespace, complexity FROM diff_scores '
+                'WHERE fingerprint = ? AND settings = ?',
+                (fingerprint, self.settings)
+            ).fetchone()
+            if row is not None:
+                score = DiffScore(row[0], bool(row[1]), row[2])
+                self._remember(fingerprint, score)
+                profiler.count('diff_score_cache_hits')
+                return score
+
+        profiler.count('diff_score_cache_misses')
+        return None
+
+    def put(self, fingerprint, score):
+        """Сохраняет оценку diff."""
+        self._remember(fingerprint, score)
+        if self.connection is not None:
+            self._pending.append((fingerprint, self.settings, score.total, int(score.only_whitespace), score.complexity))
+            if len(self._pending) >= self._FLUSH_BATCH_SIZE:
+                self.flush()
+
+    def _remember(self, fingerprint, score):
+        if self.max_entries <= 0:
+            return
+        self._items[fingerprint] = score
+        if len(self._items) > self.max_entries:
+            self._items.popitem(last=False)
+
+    def flush(self):
+        """Записывает новые оценки в базу."""
+        if self.connection is None or not self._pending:
+            return
+        with self.connection:
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO diff_scores (fingerprint, settings, total, only_whitespace, complexity) '
+                'VALUES (?, ?, ?, ?, ?)',
+                self._pending
+            )
+        self._pending = []
+
+    def close(self):
+        """Сохраняет новые оценки и закрывает базу; кэш в памяти продолжает работать."""
+        if self.connection is not None:
+            self.flush()
+            self.connection.close()
+            self.connection = None
+
+    def __len__(self):
+        return len(self._items)
@@ -0,0 +1,195 @@
+import itertools
+import random
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен: без него используется реализация на циклах
+    np = None
+
+from output_generator import USEFULNESS_FACTORS, calculate_usefulness_factors
+
+# Параметры весов в порядке столбцов матрицы факторов
+WEIGHT_PARAMS = [param for param, _ in USEFULNESS_FACTORS]
+
+# Вес штрафа за merge-коммиты по умолчанию (как в _calculate_usefulness_rating);
+# в weights_used отчета он не записывается
+DEFAULT_MERGE_PENALTY = -0.05
+
+def base_weight_vector(weights_used):
+    """Вектор весов в порядке WEIGHT_PARAMS по весам отчета (weights_used)."""
+    weights = dict(weights_used)
+    weights.setdefault('merge_penalty', DEFAULT_MERGE_PENALTY)
+    return [float(weights[param]) for param in WEIGHT_PARAMS]
+
+def sample_weight_vectors(base, spread=0.5, samples=1000, method='random', grid_steps=3, fixed=(), seed=None):
+    """
+    Формирует набор векторов весов вокруг базового.
+
+    Каждый вес, кроме перечисленных в fixed, изменяется в пределах
+    w * (1 - spread) ... w * (1 + spread) (знак веса сохраняется, нулевые веса
+    не изменяются). Первый вектор набора - базовый.
+
+    Args:
+        base: базовый вектор весов (порядок WEIGHT_PARAMS)
+        spread: относительный диапазон изменения весов
+        samples: количество случайных векторов (method='random')
+        method: 'random' - равномерная случайная выборка, 'grid' - все сочетания
+                grid_steps значений каждого изменяемого веса
+        grid_steps: количество значений каждого веса в сетке
+        fixed: параметры, веса которых не изменяются
+        seed: зерно генератора случайных чисел
+
+    Returns:
+        list: векторы весов
+    """
+    varied = [i for i, param in enumerate(WEIGHT_PARAMS) if param not in fixed and base[i] != 0]
+    vectors = [list(base)]
+
+    if method == 'grid':
+        steps = [1 - spread + 2 * spread * k / (grid_steps - 1) for k in range(grid_steps)] if grid_steps > 1 else [1.0]
+        for factors in itertools.product(steps, repeat=len(varied)):
+            vector = list(base)
+            for i, factor in zip(varied, factors):
+                vector[i] = base[i] * factor
+            vectors.append(vector)
+    elif method == 'random':
+        rng = random.Random(seed)
+        for _ in range(samples):
+            vector = list(base)
+            for i in varied:
+                vector[i] = base[i] * (1 + rng.uniform(-spread, spread))
+            vectors.append(vector)
+    else:
+        raise ValueError(f"Неизвестный способ выборки весов: {method}")
+    return vectors
+
+def rank_matrix(factor_rows, weight_vectors):
+    """
+    Места разработчиков (1 - лучший) для каждого вектора весов.
+
+    Рейтинги всех разработчиков для всех векторов вычисляются одним
+    умножением матриц (факторы x веса); при равенстве рейтингов выше
+    разработчик, идущий раньше, как при сортировке в _calculate_usefulness_rating.
+
+    Args:
+        factor_rows: строки нормализованных факторов разработчиков (порядок WEIGHT_PARAMS)
+        weight_vectors: векторы весов
+
+    Returns:
+        матрица мест (разработчики x векторы весов): ndarray при наличии NumPy, иначе список списков
+    """
+    if np is not None:
+        scores = np.asarray(factor_rows, dtype=np.float64).reshape(len(factor_rows), len(WEIGHT_PARAMS)) \
+            @ np.asarray(weight_vectors, dtype=np.float64).T
+        order = np.argsort(-scores, axis=0, kind='stable')
+        ranks = np.empty_like(order)
+        np.put_along_axis(ranks, order, np.arange(1, len(factor_rows) + 1)[:, None], axis=0)
+        return ranks
+
+    ranks = [[0] * len(weight_vectors) for _ in factor_rows]
+    for j, weights in enumerate(weight_vectors):
+        scores = [sum(f * w for f, w in zip(row, weights)) for row in factor_rows]
+        for place, dev_index in enumerate(sorted(range(len(scores)), key=lambda i: -scores[i]), 1):
+            ranks[dev_index][j] = place
+    return ranks
+
+def _rank_statistics(ranks, top_n):
+    """
+    Показатели мест разработчиков по всем векторам весов.
+
+    Returns:
+        tuple: (список показателей по разработчикам, Counter составов top_n
+                в виде кортежей индексов разработчиков)
+    """
+    if np is not None:
+        total = ranks.shape[1]
+        top_counts = (ranks <= top_n).sum(axis=1)
+        columns = zip(ranks[:, 0].tolist(), top_counts.tolist(), ranks.mean(axis=1).tolist(),
+                      ranks.min(axis=1).tolist(), ranks.max(axis=1).tolist(), ranks.std(axis=1).tolist())
+        top_order = np.sort(np.argsort(ranks, axis=0, kind='stable')[:top_n], axis=0)
+        groups = Counter(map(tuple, top_order.T.tolist()))
+    else:
+        total = len(ranks[0]) if ranks else 0
+        columns = []
+        for dev_ranks in ranks:
+            mean_rank = sum(dev_ranks) / total
+            std = (sum((rank - mean_rank) ** 2 for rank in dev_ranks) / total) ** 0.5
+            columns.append((dev_ranks[0], sum(1 for rank in dev_ranks if rank <= top_n), mean_rank,
+                            min(dev_ranks), max(dev_ranks), std))
+        groups = Counter(
+            tuple(i for i, dev_ranks in enumerate(ranks) if dev_ranks[j] <= top_n) for j in range(total)
+        )
+
+    statistics = [
+        {
+            'baseline_rank': baseline,
+            'top_n_rate': round(in_top / total * 100, 2),
+            'mean_rank': round(mean_rank, 2),
+            'best_rank': best,
+            'worst_rank': worst,
+            'rank_std': round(std, 2),
+        }
+        for baseline, in_top, mean_rank, best, worst, std in columns
+    ]
+    return statistics, groups
+
+def analyze_sensitivity(developers, weights_used, top_n=3, **sampling):
+    """
+    Анализ устойчивости рейтинга полезности к изменению весов.
+
+    Args:
+        developers: статистика разработчиков (раздел 'developers' отчета или результат analyze())
+        weights_used: базовые веса (раздел 'weights_used' отчета)
+        top_n: размер группы лидеров, для которой считается частота попадания
+        **sampling: параметры sample_weight_vectors (spread, samples, method, grid_steps, fixed, seed)
+
+    Returns:
+        dict: параметры выборки, показатели устойчивости мест разработчиков
+              и самые частые составы top_n
+    """
+    dev_ids = list(developers)
+    factors = calculate_usefulness_factors(developers)
+    factor_rows = [[factors[dev_id][param] for param in WEIGHT_PARAMS] for dev_id in dev_ids]
+
+    base = base_weight_vector(weights_used)
+    vectors = sample_weight_vectors(base, **sampling)
+    total = len(vectors)
+    if not dev_ids:
+        statistics, top_groups = [], Counter({(): total})
+    else:
+        statistics, top_groups = _rank_statistics(rank_matrix(factor_rows, vectors), top_n)
+
+    stability = {}
+    for dev_id, info in zip(dev_ids, statistics):
+        stability[dev_id] = dict(name=developers[dev_id]['name'], **info)
+
+    # Составы группы лидеров (индексы разработчиков по возрастанию, без учета порядка внутри группы)
+    baseline_top = tuple(i for i, info in enumerate(statistics) if info['baseline_rank'] <= top_n)
+
+    return {
+        'samples': total,
+        'top_n': top_n,
+        'base_weights': dict(zip(WEIGHT_PARAMS, base)),
+        'sampling': {key: list(value) if key == 'fixed' else value for key, value in sampling.items()},
+        'baseline_top_rate': round(top_groups[baseline_top] / total * 100, 2),
+        'developers': dict(sorted(stability.items(), key=lambda x: x[1]['baseline_rank'])),
+        'top_groups': [
+            {'developers': [dev_ids[i] for i in group], 'rate': round(count / total * 100, 2)}
+            for group, count in top_groups.most_common(5)
+        ],
+    }
+
+def format_sensitivity(result):
+    """Текстовая сводка анализа устойчивости рейтинга."""
+    lines = [
+        f"Векторов весов: {result['samples']}",
+        f"Состав top-{result['top_n']} совпадает с базовым в {result['baseline_top_rate']}% случаев",
+        "",
+        f"{'Место':>5}  {'top-' + str(result['top_n']):>7}  {'ср. место':>9}  {'диапазон':>9}  Разработчик",
+    ]
+    for dev_id, info in result['developers'].items():
+        rank_range = f"{info['best_rank']}-{info['worst_rank']}"
+        lines.append(f"{info['baseline_rank']:>5}  {info['top_n_rate']:>6}%  {info['mean_rank']:>9}  "
+                     f"{rank_range:>9}  {info['name']} <{dev_id}>")
+    return '\n'.join(lines)
@@ -0,0 +1,191 @@
+import hashlib
+import heapq
+import math
+from functools import lru_cache
+
+@lru_cache(maxsize=65536)
+def _hash64(item):
+    """64-битный хэш строки (одинаковый во всех процессах, в отличие от hash())."""
+    digest = hashlib.blake2b(item.encode('utf-8', 'surrogatepass'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+class HyperLogLog:
+    """
+    Приближенный подсчет количества различных строк (HyperLogLog).
+
+    Память не зависит от количества элементов: 2^precision однобайтовых
+    регистров, где precision выбирается по заданной относительной стандартной
+    ошибке (1.04 / sqrt(2^precision) <= error). Пока заполнено мало регистров,
+    они хранятся в словаре, поэтому небольшие множества занимают мало памяти
+    и считаются практически точно (линейный подсчет).
+
+    Скетчи с одинаковой точностью объединяются через update() без потери
+    точности: результат равен скетчу объединения множеств.
+    """
+
+    __slots__ = ('precision', '_sparse', '_registers')
+
+    def __init__(self, error=0.01):
+        self.precision = min(18, max(4, math.ceil(math.log2((1.04 / error) ** 2))))
+        self._sparse = {}
+        self._registers = None
+
+    @property
+    def error(self):
+        """Относительная стандартная ошибка оценки."""
+        return 1.04 / math.sqrt(1 << self.precision)
+
+    def add(self, item):
+        """Добавляет строку в множество."""
+        value = _hash64(item)
+        width = 64 - self.precision
+        index = value >> width
+        rank = width - (value & ((1 << width) - 1)).bit_length() + 1
+        self._set_register(index, rank)
+
+    def _set_register(self, index, rank):
+        registers = self._registers
+        if registers is not None:
+            if rank > registers[index]:
+                registers[index] = rank
+            return
+        sparse = self._sparse
+        if rank > sparse.get(index, 0):
+            sparse[index] = rank
+            if len(sparse) > (1 << self.precision) // 16:
+                self._densify()
+
+    def _densify(self):
+        self._registers = bytearray(1 << self.precision)
+        for index, rank in self._sparse.items():
+            self._registers[index] = rank
+        self._sparse = {}
+
+    def _register_items(self):
+        if self._registers is None:
+            return self._sparse.items()
+        return ((index, rank) for index, rank in enumerate(self._registers) if rank)
+
+    def update(self, other):
+        """Добавляет элементы другого скетча (той же точности) или итерируемого набора строк."""
+        if not isinstance(other, HyperLogLog):
+            for item in other:
+                self.add(item)
+            return
+        if other.precision != self.precision:
+            raise ValueError(f"Нельзя объединить HyperLogLog с точностью {self.precision} и {other.precision}")
+        for index, rank in other._register_items():
+            self._set_register(index, rank)
+
+    def copy(self):
+        copied = HyperLogLog.__new__(HyperLogLog)
+        copied.precision = self.precision
+        copied._sparse = dict(self._sparse)
+        copied._registers = None if self._registers is None else bytearray(self._registers)
+        return copied
+
+    def estimate(self):
+        """Оценка количества различных элементов."""
+        m = 1 << self.precision
+        if self._registers is None:
+            zeros = m - len(self._sparse)
+            harmonic = zeros + sum(2.0 ** -rank for rank in self._sparse.values())
+        else:
+            zeros = self._registers.count(0)
+            harmonic = sum(2.0 ** -rank for rank in self._registers)
+
+        if m >= 128:
+            alpha = 0.7213 / (1 + 1.079 / m)
+        else:
+            alpha = {16: 0.673, 32: 0.697, 64: 0.709}[m]
+        estimate = alpha * m * m / harmonic
+
+        # Поправка для малых множеств: линейный подсчет по пустым регистрам
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return estimate
+
+    def __len__(self):
+        return int(round(self.estimate()))
+
+    def __getstate__(self):
+        return (self.precision, self._sparse, self._registers)
+
+    def __setstate__(self, state):
+        self.precision, self._sparse, self._registers = state
+
+    def __repr__(self):
+        return f"HyperLogLog(~{len(self)}, error={self.error:.4f})"
+
+class HeavyHitters:
+    """
+    Приближенный подсчет самых частых строк (алгоритм Misra-Gries).
+
+    Хранится не более 2 * capacity счетчиков, где capacity = ceil(1 / error).
+    Когда счетчиков становится больше, из всех вычитается (capacity + 1)-е по
+    величине значение, а обнулившиеся удаляются. Оценка частоты занижена
+    не более чем на error * total (точная граница - max_error), поэтому любой
+    элемент с частотой больше этой величины гарантированно остается в скетче.
+
+    Скетчи объединяются через merge() с той же гарантией для суммарного потока.
+    """
+
+    __slots__ = ('capacity', 'counts', 'total', 'max_error')
+
+    def __init__(self, error=0.001):
+        self.capacity = max(1, math.ceil(1 / error))
+        self.counts = {}
+        self.total = 0
+        self.max_error = 0
+
+    def add(self, item, count=1):
+        """Учитывает count появлений строки."""
+        counts = self.counts
+        counts[item] = counts.get(item, 0) + count
+        self.total += count
+        if len(counts) > 2 * self.capacity:
+            self._prune()
+
+    def _prune(self):
+        threshold = heapq.nlargest(self.capacity + 1, self.counts.values())[-1]
+        self.counts = {item: count - threshold for item, count in self.counts.items() if count > threshold}
+        self.max_error += threshold
+
+    def merge(self, other):
+        """Добавляет к скетчу другой скетч (например, следующего участка истории)."""
+        counts = self.counts
+        for item, count in other.counts.items():
+            counts[item] = counts.get(item, 0) + count
+        self.total += other.total
+        self.max_error += other.max_error
+        if len(counts) > 2 * self.capacity:
+            self._prune()
+
+    def items(self):
+        """Пары (строка, оценка частоты снизу) в порядке добавления."""
+        return self.counts.items()
+
+    def most_common(self, n=None):
+        """n самых частых строк по убыванию оценки частоты."""
+        ranked = sorted(self.counts.items(), key=lambda x: x[1], reverse=True)
+        return ranked if n is None else ranked[:n]
+
+    def copy(self):
+        copied = HeavyHitters.__new__(HeavyHitters)
+        copied.capacity = self.capacity
+        copied.counts = dict(self.counts)
+        copied.total = self.total
+        copied.max_error = self.max_error
+        return copied
+
+    def __len__(self):
+        return len(self.counts)
+
+    def __getstate__(self):
+        return (self.capacity, self.counts, self.total, self.max_error)
+
+    def __setstate__(self, state):
+        self.capacity, self.counts, self.total, self.max_error = state
+
+    def __repr__(self):
+        return f"HeavyHitters({len(self.counts)} items, total={self.total}, max_error={self.max_error})"
@@ -7,9 +7,24 @@ from unittest.mock import patch, MagicMock
 # Добавляем родительскую директорию в путь для импорта модулей
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from datetime import datetime
 from analyzer import DevActivityAnalyzer
+from utils import local_seconds, local_time_keys, format_month_key
 import config
 
+class _LinearScan:
+    """Прежний поиск коммита по хэшу перебором списка."""
+    
+    def __init__(self, commits):
+        self.commits = commits
+    
+    def get(self, commit_hash):
+        return next((commit for commit in self.commits if commit['hash'] == commit_hash), None)
+
+class _LinearScanAnalyzer(DevActivityAnalyzer):
+    def _get_commit_index(self):
+        return _LinearScan(self.commits)
+
 class TestDevActivityAnalyzer(unittest.TestCase):
     
     def setUp(self):
@@ -271,6 +286,31 @@ class TestDevActivityAnalyzer(unittest.TestCase):
         self.assertIn('2021-01', dev1['commit_distribution'])
         self.assertEqual(dev1['commit_distribution']['2021-01'], 2)
         
+    def test_advanced_metrics_match_linear_scan(self):
+        dev_stats = {
+            'email': 'dev1@example.com',
+            'total_commits': 3,
+            'active_days': 2,
+            'files_modified': {},
+            'time_of_day_distribution': {},
+            'commits': ['abcd1234', 'efgh5678', 'dup00001'],
+        }
+        def commits_with(timestamps):
+            commits = [dict(commit) for commit in self.test_git_data['commits']]
+            commits[0]['timestamp'], commits[1]['timestamp'] = timestamps
+            # Повтор хэша: используется первый коммит с этим хэшем
+            commits.append(dict(commits[0], hash='dup00001', timestamp=timestamps[0] + 3600))
+            commits.append(dict(commits[0], hash='dup00001', timestamp=timestamps[0] + 7200))
+            return commits
+
+        analyzer = DevActivityAnalyzer(self.test_git_data)
+        reference = _LinearScanAnalyzer(self.test_git_data)
+        for timestamps in [(1609459200, 1609462800), (1609459200, 1609545600)]:
+            # Новый список той же длины не должен использовать устаревший индекс
+            analyzer.commits = reference.commits = commits_with(timestamps)
+            self.assertEqual(analyzer.get_advanced_metrics(dict(dev_stats)),
+                             reference.get_advanced_metrics(dict(dev_stats)))
+
     def test_calculate_file_complexity(self):
         # Проверяем сложность различных типов файлов
         py_complexity = self.analyzer._calculate_file_complexity('src/module.py')
@@ -281,5 +321,18 @@ class TestDevActivityAnalyzer(unittest.TestCase):
         self.assertGreater(py_complexity, html_complexity)
         self.assertGreater(py_complexity, txt_complexity)
 
+    def test_local_time_keys_match_datetime(self):
+        # Ключи по местному времени совпадают с разбором datetime.fromtimestamp,
+        # в том числе около переходов на летнее время
+        first = datetime.fromtimestamp(1609459200)
+        for timestamp in range(1609459200, 1609459200 + 366 * 86400, 3 * 3600 + 17 * 60):
+            moment = datetime.fromtimestamp(timestamp)
+            day, month, hour = local_time_keys(timestamp)
+            self.assertEqual(format_month_key(month), moment.strftime('%Y-%m'))
+            self.assertEqual(hour, moment.hour)
+            self.assertEqual(day, (moment.date() - datetime(1970, 1, 1).date()).days)
+            self.assertEqual(local_seconds(timestamp) - local_seconds(1609459200),
+                             (moment - first).total_seconds())
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+import unittest
+import os
+import re
+import sys
+
+# Добавляем родительскую директорию в путь для импорта модулей
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from change_analyzer import ChangeAnalyzer, ComplexityScanner, _required_literal, diff_statistics
+
+class TestChangeAnalyzer(unittest.TestCase):
+
+    def setUp(self):
+        self.analyzer = ChangeAnalyzer()
+
+    def _line_by_line(self, lines):
+        # Эталон: каждый индикатор проверяется на каждой строке отдельно
+        return {pattern for line in lines for pattern in self.analyzer.complexity_indicators
+                if re.search(pattern, line)}
+
+    def test_scanner_matches_line_by_line_search(self):
+        samples = [
+            ['if (x > 0) {', '    return x.value(1)', '}'],
+            ['if', '(x)', 'for', '(;;)'],  # Совпадение не должно переходить через границу строки
+            ['@decorator', 'async def handler(request):', '    await queue.get()'],
+            ['try {', '} catch (Error e) {', 'case 1:', 'switch (y)'],
+            ['import os', 'class Foo:', 'function bar() {}', 'while (true)'],
+            ['  return', 'return  ', 'x.y()', ''],
+        ]
+        scanner = ComplexityScanner(tuple(self.analyzer.complexity_indicators))
+        for lines in samples:
+            self.assertEqual(scanner.find('\n'.join(lines)), self._line_by_line(lines), lines)
+
+    def test_scanner_matches_line_by_line_search_for_custom_patterns(self):
+        # Пользовательские выражения, которые могут совпасть с переводом строки
+        self.analyzer.complexity_indicators = [r'[\s,]value', r'x[^;]*y', r'a\Wb', r'(?s)p.q', r'if\s+\(', r'[]x]z']
+        samples = [
+            ['a', 'value'],
+            ['x', 'y'],
+            ['a', 'b'],
+            ['p', 'q'],
+            ['if', '(x)'],
+            ['], value', 'x = y', 'a-b', 'pxq', 'if (x)', ']z'],
+        ]
+        scanner = ComplexityScanner(tuple(self.analyzer.complexity_indicators))
+        for lines in samples:
+            self.assertEqual(scanner.find('\n'.join(lines)), self._line_by_line(lines), lines)
+
+    def test_required_literal(self):
+        self.assertEqual(_required_literal(r'\s*return\s+.+'), 'return')
+        self.assertEqual(_required_literal(r'\w+\.\w+\(.+\)'), '.')
+        self.assertEqual(_required_literal(r'try\s*{'), 'try')
+        self.assertEqual(_required_literal(r'ab?c'), 'a')
+        self.assertIsNone(_required_literal(r'foo|bar'))
+        self.assertIsNone(_required_literal(r'[ab]c'))
+
+    def test_diff_statistics(self):
+        diff = ('diff --git a/x.py b/x.py\n--- a/x.py\n+++ b/x.py\n@@ -1,3 +1,4 @@\n'
+                ' context\n-old = 1\n+new = 2\n+\t \n-\n+++counter\n')
+        stats = diff_statistics(diff)
+        self.assertEqual((stats.added, stats.removed, stats.whitespace_only, stats.header_lines),
+                         (2, 2, 2, 3))
+        self.assertEqual(stats.added_text, 'new = 2\n\t ')
+        self.assertFalse(stats.only_whitespace)
+
+        # Изменения только в пробелах (без заголовков файла, как в прежней проверке)
+        self.assertTrue(diff_statistics('@@ -1 +1 @@\n-  \n+\t\n context').only_whitespace)
+        self.assertTrue(diff_statistics('').only_whitespace)
+
+if __name__ == '__main__':
+    unittest.main()
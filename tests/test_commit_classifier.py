@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+import unittest
+import os
+import sys
+
+# Добавляем родительскую директорию в путь для импорта модулей
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from commit_classifier import KeywordMatcher, default_classifier
+from change_analyzer import ChangeAnalyzer
+
+class TestCommitClassifier(unittest.TestCase):
+
+    def test_matcher_finds_overlapping_keywords(self):
+        matcher = KeywordMatcher(['fix', 'hotfix', 'feat', 'feature', 'test', 'tests', 'est'])
+        self.assertEqual(matcher.find('hotfix for feature tests'),
+                         {'fix', 'hotfix', 'feat', 'feature', 'test', 'tests', 'est'})
+        self.assertEqual(matcher.find('refactoring'), frozenset())
+        self.assertEqual(KeywordMatcher([]).find('anything'), frozenset())
+        # Служебные символы регулярных выражений в ключевых словах экранируются
+        self.assertEqual(KeywordMatcher(['c++', 'a.b']).find('port to c++ (axb)'), {'c++'})
+
+    def test_subject_flags(self):
+        classify = default_classifier().classify
+        self.assertTrue(classify('Revert "Add cache"').is_revert)
+        self.assertTrue(classify("Merge branch 'main'").is_merge)
+        self.assertTrue(classify('Объединены изменения ветки').is_squash)
+        self.assertFalse(classify('Add feature').is_squash)
+        self.assertEqual(classify('Fix(Parser): handle tabs').conventional_type, 'fix')
+        # Результат кэшируется для темы
+        self.assertIs(classify('Add feature'), classify('Add feature'))
+
+    def test_commit_type_weight(self):
+        analyzer = ChangeAnalyzer()
+        self.assertEqual(analyzer._get_commit_type_weight('docs: update readme'), 0.7)
+        self.assertEqual(analyzer._get_commit_type_weight('Urgent hotfix for login'), 1.3)
+        self.assertEqual(analyzer._get_commit_type_weight('chore cleanup'), 1.0)
+
+        # Собственный набор ключевых слов
+        analyzer.commit_type_weights = {'security': 1.5, 'typo': 0.3}
+        self.assertEqual(analyzer._get_commit_type_weight('Security patch'), 1.5)
+        self.assertEqual(analyzer._get_commit_type_weight('fix typo'), 1.0)
+
+        # Ключ, добавленный в существующий словарь весов
+        analyzer.commit_type_weights['release'] = 1.4
+        self.assertEqual(analyzer._get_commit_type_weight('Prepare release'), 1.4)
+        self.assertIs(analyzer.classifier, analyzer.classifier)
+
+if __name__ == '__main__':
+    unittest.main()
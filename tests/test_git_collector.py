@@ -11,6 +11,15 @@ import shutil
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from git_collector import GitDataCollector
+from analyzer import DevActivityAnalyzer
+from progress import ProgressReporter
+from profiling import profiler
+import json
+import commit_table
+import pickle
+from analysis_state import AnalysisState
+from records import Commit, FileChange
+from output_generator import JSONOutputGenerator, rerank_report
 import config
 
 class TestGitDataCollector(unittest.TestCase):
@@ -71,7 +80,7 @@ class TestGitDataCollector(unittest.TestCase):
         self.assertIn('author_name', commit)
         self.assertIn('author_email', commit)
         self.assertIn('timestamp', commit)
-        self.assertIn('date', commit)
+        self.assertIsInstance(commit['timestamp'], int)
         self.assertIn('subject', commit)
         
         # Проверяем данные коммита
@@ -79,6 +88,23 @@ class TestGitDataCollector(unittest.TestCase):
         self.assertEqual(commit['author_email'], 'test@example.com')
         self.assertEqual(commit['subject'], 'Initial commit')
     
+    def test_records_behave_like_dicts(self):
+        commit = self.collector._get_commits()[0]
+        self.assertIsInstance(commit, Commit)
+        self.assertEqual(commit, dict(commit.items()))
+        self.assertEqual(pickle.loads(pickle.dumps(commit)), commit)
+        self.assertEqual(json.loads(json.dumps(commit.to_dict()))['hash'], commit['hash'])
+        
+        # Незаданные необязательные поля ведут себя как отсутствующие ключи
+        change = FileChange('M', 'a.py', '.py', True, diff_digest='abc')
+        self.assertNotIn('diff', change)
+        self.assertIsNone(change.get('diff'))
+        self.assertEqual(list(change), ['change_type', 'file_path', 'file_ext', 'diff_digest', 'is_substantial'])
+        with self.assertRaises(KeyError):
+            change['diff']
+        with self.assertRaises(KeyError):
+            change['unknown'] = 1
+    
     def test_ignores_reverts_when_configured(self):
         # Создаем revert-коммит
         test_file_path = os.path.join(self.git_repo_path, 'test_file.txt')
@@ -168,5 +194,508 @@ index 123456..789012 100644
         config.IGNORE_WHITESPACE_ONLY = False
         self.assertTrue(self.collector._is_substantial_change(whitespace_diff, 'test_file.txt'))
 
+    def test_streaming_collection_matches_per_commit(self):
+        # Добавляем несколько коммитов с изменениями разных типов
+        test_file_path = os.path.join(self.git_repo_path, 'test_file.txt')
+        with open(test_file_path, 'w') as f:
+            f.write('\n'.join(f'line {i}' for i in range(20)))
+        with open(os.path.join(self.git_repo_path, 'module.py'), 'w') as f:
+            f.write('def main():\n    return 1\n')
+        self._run_git_command(['git', 'add', '.'])
+        self._run_git_command(['git', 'commit', '-m', 'feat: add module'])
+        
+        self._run_git_command(['git', 'rm', '-q', 'module.py'])
+        with open(os.path.join(self.git_repo_path, 'package-lock.json'), 'w') as f:
+            f.write('{}')
+        self._run_git_command(['git', 'add', '.'])
+        self._run_git_command(['git', 'commit', '-m', 'Remove module'])
+        
+        # Переименование без изменения содержимого (R100)
+        self._run_git_command(['git', 'mv', 'test_file.txt', 'renamed_file.txt'])
+        self._run_git_command(['git', 'commit', '-m', 'Rename test file'])
+        
+        original_mode = config.COLLECTION_MODE
+        try:
+            config.COLLECTION_MODE = 'per_commit'
+            expected = GitDataCollector(self.git_repo_path).collect_data()
+            config.COLLECTION_MODE = 'streaming'
+            actual = GitDataCollector(self.git_repo_path).collect_data()
+        finally:
+            config.COLLECTION_MODE = original_mode
+        
+        self.assertEqual(actual['commits'], expected['commits'])
+        self.assertEqual(actual['file_changes'], expected['file_changes'])
+        self.assertEqual(actual['developer_info'], expected['developer_info'])
+        for commit_hash, detail in expected['commit_details'].items():
+            self.assertEqual(actual['commit_details'][commit_hash]['stats'], detail['stats'])
+
+    def test_cache_skips_already_collected_commits(self):
+        cache_path = os.path.join(self.temp_dir, 'cache.sqlite')
+        original = (config.CACHE_ENABLED, config.CACHE_PATH, config.COLLECTION_MODE)
+        try:
+            config.CACHE_ENABLED = True
+            config.CACHE_PATH = cache_path
+            config.COLLECTION_MODE = 'streaming'
+            first = GitDataCollector(self.git_repo_path).collect_data()
+            
+            # Новый коммит после первого запуска
+            with open(os.path.join(self.git_repo_path, 'new_file.py'), 'w') as f:
+                f.write('print(1)\n')
+            self._run_git_command(['git', 'add', 'new_file.py'])
+            self._run_git_command(['git', 'commit', '-m', 'Add new file'])
+            
+            collector = GitDataCollector(self.git_repo_path)
+            with patch.object(collector, '_iter_streaming', wraps=collector._iter_streaming) as streaming:
+                second = collector.collect_data()
+            
+            # Обрабатывается только новый коммит
+            processed = streaming.call_args[0][0]
+            self.assertEqual([commit['subject'] for commit in processed], ['Add new file'])
+        finally:
+            config.CACHE_ENABLED, config.CACHE_PATH, config.COLLECTION_MODE = original
+        
+        self.assertEqual(len(second['commits']), len(first['commits']) + 1)
+        old_hash = first['commits'][0]['hash']
+        self.assertEqual(second['commit_details'][old_hash]['stats'], first['commit_details'][old_hash]['stats'])
+        self.assertEqual(
+            [change['is_substantial'] for change in second['file_changes'][old_hash]],
+            [change['is_substantial'] for change in first['file_changes'][old_hash]]
+        )
+
+    def test_cache_is_not_shared_between_collection_modes(self):
+        # Путь с не-ASCII символами git выводит в кавычках: покоммитный режим не находит
+        # diff по такому пути, а потоковый берет его из вывода git log
+        with open(os.path.join(self.git_repo_path, 'модуль.py'), 'w') as f:
+            f.write('\n'.join(f'value_{i} = {i}' for i in range(10)))
+        self._run_git_command(['git', 'add', '.'])
+        self._run_git_command(['git', 'commit', '-m', 'Add module'])
+        
+        cache_path = os.path.join(self.temp_dir, 'cache.sqlite')
+        original = (config.CACHE_ENABLED, config.CACHE_PATH, config.COLLECTION_MODE)
+        try:
+            config.CACHE_ENABLED = False
+            config.COLLECTION_MODE = 'per_commit'
+            expected = GitDataCollector(self.git_repo_path).collect_data()
+            
+            config.CACHE_ENABLED = True
+            config.CACHE_PATH = cache_path
+            config.COLLECTION_MODE = 'streaming'
+            GitDataCollector(self.git_repo_path).collect_data()
+            config.COLLECTION_MODE = 'per_commit'
+            actual = GitDataCollector(self.git_repo_path).collect_data()
+        finally:
+            config.CACHE_ENABLED, config.CACHE_PATH, config.COLLECTION_MODE = original
+        
+        for commit_hash, changes in expected['file_changes'].items():
+            self.assertEqual([change['is_substantial'] for change in actual['file_changes'][commit_hash]],
+                             [change['is_substantial'] for change in changes])
+
+    def test_parallel_collection_matches_sequential(self):
+        for i in range(4):
+            with open(os.path.join(self.git_repo_path, f'file_{i}.py'), 'w') as f:
+                f.write('\n'.join(f'value_{j} = {j}' for j in range(i * 3 + 1)))
+            self._run_git_command(['git', 'add', '.'])
+            self._run_git_command(['git', 'commit', '-m', f'Add file {i}'])
+        
+        original = (config.COLLECTION_WORKERS, config.COLLECTION_CHUNK_SIZE)
+        try:
+            config.COLLECTION_WORKERS = 1
+            expected = GitDataCollector(self.git_repo_path).collect_data()
+            config.COLLECTION_WORKERS = 2
+            config.COLLECTION_CHUNK_SIZE = 2
+            actual = GitDataCollector(self.git_repo_path).collect_data()
+        finally:
+            config.COLLECTION_WORKERS, config.COLLECTION_CHUNK_SIZE = original
+        
+        self.assertEqual(actual, expected)
+        self.assertEqual(list(actual['file_changes']), list(expected['file_changes']))
+
+    def test_streaming_analysis_matches_batch_analysis(self):
+        for i in range(3):
+            with open(os.path.join(self.git_repo_path, f'module_{i}.py'), 'w') as f:
+                f.write('\n'.join(f'item_{j} = {j}' for j in range(i * 4 + 2)))
+            self._run_git_command(['git', 'add', '.'])
+            self._run_git_command(['git', 'commit', '-m', f'Add module {i}'])
+        
+        original = (config.STREAMING_BATCH_SIZE, config.COLLECTION_MODE)
+        try:
+            for mode in ('per_commit', 'streaming'):
+                config.COLLECTION_MODE = mode
+                config.STREAMING_BATCH_SIZE = 2
+                expected = DevActivityAnalyzer(GitDataCollector(self.git_repo_path).collect_data()).analyze()
+                
+                analyzer = DevActivityAnalyzer()
+                actual = analyzer.analyze_stream(GitDataCollector(self.git_repo_path).iter_records())
+                
+                for stats in list(expected.values()) + list(actual.values()):
+                    stats['files_modified'].sort()
+                    stats['file_types_modified'].sort()
+                self.assertEqual(actual, expected)
+        finally:
+            config.STREAMING_BATCH_SIZE, config.COLLECTION_MODE = original
+
+    def test_columnar_analysis_matches_row_analysis(self):
+        dates = ['2021-03-01T09:00:00', '2021-03-01T11:30:00', '2021-03-02T19:00:00',
+                 '2021-04-15T23:30:00', '2021-04-16T13:00:00']
+        for i, date in enumerate(dates):
+            with open(os.path.join(self.git_repo_path, f'module_{i}.py'), 'w') as f:
+                f.write('\n'.join(f'item_{j} = {j}' for j in range(i * 7 + 2)))
+            self._run_git_command(['git', 'add', '.'])
+            self._run_git_command(['git', 'commit', '-m', f'Add module {i}', '--date', date,
+                                   '--author', f'Dev {i % 2} <dev{i % 2}@example.com>'])
+        
+        git_data = GitDataCollector(self.git_repo_path).collect_data()
+        original = (config.COLUMNAR_ANALYSIS, commit_table.np)
+        try:
+            config.COLUMNAR_ANALYSIS = False
+            expected = DevActivityAnalyzer(git_data).analyze()
+            
+            # С NumPy (если установлен) и без него результат совпадает с обычным анализом
+            config.COLUMNAR_ANALYSIS = True
+            for numpy_module in {commit_table.np, None}:
+                commit_table.np = numpy_module
+                actual = DevActivityAnalyzer(GitDataCollector(self.git_repo_path).collect_data()).analyze()
+                self.assertEqual(actual, expected)
+                self.assertEqual(list(actual['dev0@example.com']['commit_distribution']),
+                                 list(expected['dev0@example.com']['commit_distribution']))
+        finally:
+            config.COLUMNAR_ANALYSIS, commit_table.np = original
+
+    def test_merged_shard_states_match_full_analysis(self):
+        for i in range(4):
+            with open(os.path.join(self.git_repo_path, f'module_{i}.py'), 'w') as f:
+                f.write('\n'.join(f'item_{j} = {j}' for j in range(i * 9 + 2)))
+            self._run_git_command(['git', 'add', '.'])
+            self._run_git_command(['git', 'commit', '-m', f'Add module {i}',
+                                   '--author', f'Dev {i % 2} <dev{i % 2}@example.com>'])
+        
+        git_data = GitDataCollector(self.git_repo_path).collect_data()
+        original = config.COLUMNAR_ANALYSIS
+        try:
+            for columnar in (False, True):
+                config.COLUMNAR_ANALYSIS = columnar
+                expected = DevActivityAnalyzer(git_data).analyze()
+                
+                # Части истории анализируются независимо (состояния переживают сериализацию)
+                states = []
+                for commits in (git_data['commits'][:2], git_data['commits'][2:]):
+                    shard = dict(git_data, commits=commits,
+                                 developer_info=self.collector._get_developer_info(commits))
+                    state = DevActivityAnalyzer(shard).build_state()
+                    states.append(pickle.loads(pickle.dumps(state)))
+                
+                merged = AnalysisState.merge_all(states)
+                analyzer = DevActivityAnalyzer()
+                self.assertEqual(analyzer.finalize(merged), expected)
+                # Завершение не изменяет состояние
+                self.assertEqual(analyzer.finalize(merged), expected)
+        finally:
+            config.COLUMNAR_ANALYSIS = original
+
+    def test_interned_output_paths_resolve_to_original(self):
+        for i in range(3):
+            with open(os.path.join(self.git_repo_path, 'shared.py'), 'w') as f:
+                f.write('\n'.join(f'value_{j} = {i}' for j in range(10)))
+            self._run_git_command(['git', 'add', '.'])
+            self._run_git_command(['git', 'commit', '-m', f'Update shared {i}',
+                                   '--author', f'Dev {i % 2} <dev{i % 2}@example.com>'])
+        
+        collector = GitDataCollector(self.git_repo_path)
+        git_data = collector.collect_data()
+        # Одинаковые пути в разных коммитах - один и тот же объект строки
+        shared = [change['file_path'] for changes in git_data['file_changes'].values()
+                  for change in changes if change['file_path'] == 'shared.py']
+        self.assertEqual(len(shared), 3)
+        self.assertTrue(all(path is shared[0] for path in shared))
+        
+        results = DevActivityAnalyzer(git_data).analyze()
+        output_file = os.path.join(self.temp_dir, 'out.json')
+        original = config.INTERN_OUTPUT_PATHS
+        try:
+            config.INTERN_OUTPUT_PATHS = False
+            expected = JSONOutputGenerator(results).generate_output(output_file)
+            config.INTERN_OUTPUT_PATHS = True
+            JSONOutputGenerator(results).generate_output(output_file)
+            with open(output_file, encoding='utf-8') as f:
+                actual = json.load(f)
+        finally:
+            config.INTERN_OUTPUT_PATHS = original
+        
+        paths = actual['string_tables']['paths']
+        self.assertEqual(sorted(paths), sorted(set(paths)))
+        self.assertEqual([paths[i] for i in actual['team_stats']['total_files_modified']],
+                         expected['team_stats']['total_files_modified'])
+        for dev_id, stats in expected['developers'].items():
+            interned = actual['developers'][dev_id]
+            self.assertEqual([paths[i] for i in interned['files_modified']], stats['files_modified'])
+            self.assertEqual({paths[int(i)]: count for i, count in interned['most_modified_files'].items()},
+                             stats['most_modified_files'])
+        # Исходные результаты анализа не изменяются
+        self.assertIn('shared.py', results['dev0@example.com']['files_modified'])
+
+    def test_approximate_file_stats_match_exact_on_small_history(self):
+        for i in range(4):
+            with open(os.path.join(self.git_repo_path, f'module_{i % 3}.py'), 'w') as f:
+                f.write('\n'.join(f'item_{j} = {i}' for j in range(8)))
+            self._run_git_command(['git', 'add', '.'])
+            self._run_git_command(['git', 'commit', '-m', f'Update module {i}',
+                                   '--author', f'Dev {i % 2} <dev{i % 2}@example.com>'])
+        
+        git_data = GitDataCollector(self.git_repo_path).collect_data()
+        output_file = os.path.join(self.temp_dir, 'out.json')
+        original = config.APPROXIMATE_FILE_STATS
+        try:
+            config.APPROXIMATE_FILE_STATS = False
+            expected = JSONOutputGenerator(DevActivityAnalyzer(git_data).analyze()).generate_output(output_file)
+            
+            config.APPROXIMATE_FILE_STATS = True
+            analyzer = DevActivityAnalyzer(git_data)
+            state = analyzer.build_state()
+            # Скетчи переживают сериализацию и объединение состояний
+            merged = pickle.loads(pickle.dumps(state)).merge(AnalysisState())
+            actual = JSONOutputGenerator(analyzer.finalize(merged)).generate_output(output_file)
+        finally:
+            config.APPROXIMATE_FILE_STATS = original
+        
+        self.assertEqual(actual['team_stats']['total_files_modified'],
+                         len(expected['team_stats']['total_files_modified']))
+        for dev_id, stats in expected['developers'].items():
+            approximate = actual['developers'][dev_id]
+            self.assertEqual(approximate['files_modified'], len(stats['files_modified']))
+            self.assertEqual(approximate['most_modified_files'], stats['most_modified_files'])
+            self.assertEqual(approximate['advanced_metrics'], stats['advanced_metrics'])
+            self.assertNotIn('file_type_files', approximate)
+
+    def test_rerank_report_reuses_saved_stats(self):
+        for i in range(3):
+            with open(os.path.join(self.git_repo_path, f'module_{i}.py'), 'w') as f:
+                f.write('\n'.join(f'item_{j} = {j}' for j in range(i * 6 + 2)))
+            self._run_git_command(['git', 'add', '.'])
+            self._run_git_command(['git', 'commit', '-m', f'Add module {i}',
+                                   '--author', f'Dev {i} <dev{i}@example.com>'])
+        
+        results = DevActivityAnalyzer(GitDataCollector(self.git_repo_path).collect_data()).analyze()
+        weights = {'lines': 0.6, 'impact': 0.0}
+        report_file = os.path.join(self.temp_dir, 'report.json')
+        reranked_file = os.path.join(self.temp_dir, 'reranked.json')
+        original = config.INTERN_OUTPUT_PATHS
+        try:
+            for intern_paths in (False, True):
+                config.INTERN_OUTPUT_PATHS = intern_paths
+                JSONOutputGenerator(results).generate_output(report_file)
+                expected = JSONOutputGenerator(results).generate_output(
+                    os.path.join(self.temp_dir, 'expected.json'), custom_weights=weights)
+                
+                config.INTERN_OUTPUT_PATHS = False
+                actual = rerank_report(report_file, reranked_file, custom_weights=weights)
+                with open(reranked_file, encoding='utf-8') as f:
+                    saved = json.load(f)
+                
+                # Пересчет без повторного анализа совпадает с полным прогоном
+                self.assertEqual(actual['usefulness_rating'], expected['usefulness_rating'])
+                self.assertEqual(actual['weights_used'], expected['weights_used'])
+                self.assertEqual(sorted(actual['team_stats'].pop('total_files_modified')),
+                                 sorted(expected['team_stats'].pop('total_files_modified')))
+                self.assertEqual(actual['team_stats'], expected['team_stats'])
+                self.assertEqual(saved['metadata']['reranked_from'], report_file)
+                self.assertEqual('string_tables' in saved, intern_paths)
+            
+            # Дополнительное исключение разработчика
+            actual = rerank_report(reranked_file, reranked_file, excluded_developers=['dev0@example.com'])
+            self.assertNotIn('dev0@example.com', actual['developers'])
+            self.assertEqual(actual['metadata']['excluded_developers'], ['dev0@example.com'])
+            self.assertEqual(actual['weights_used']['lines'], 0.6)
+        finally:
+            config.INTERN_OUTPUT_PATHS = original
+
+    def test_rerank_approximate_report_keeps_team_file_count(self):
+        # Оба разработчика изменяют общий файл, поэтому сумма по разработчикам больше оценки команды
+        for i in range(4):
+            with open(os.path.join(self.git_repo_path, 'shared.py'), 'w') as f:
+                f.write('\n'.join(f'shared_{j} = {j + i}' for j in range(5)))
+            with open(os.path.join(self.git_repo_path, f'module_{i}.py'), 'w') as f:
+                f.write('\n'.join(f'item_{j} = {j}' for j in range(i + 3)))
+            self._run_git_command(['git', 'add', '.'])
+            self._run_git_command(['git', 'commit', '-m', f'Update module {i}',
+                                   '--author', f'Dev {i % 2} <dev{i % 2}@example.com>'])
+        
+        report_file = os.path.join(self.temp_dir, 'report.json')
+        reranked_file = os.path.join(self.temp_dir, 'reranked.json')
+        original = config.APPROXIMATE_FILE_STATS
+        try:
+            config.APPROXIMATE_FILE_STATS = True
+            results = DevActivityAnalyzer(GitDataCollector(self.git_repo_path).collect_data()).analyze()
+            report = JSONOutputGenerator(results).generate_output(report_file)
+        finally:
+            config.APPROXIMATE_FILE_STATS = original
+        
+        saved_total = report['team_stats']['total_files_modified']
+        files_sum = sum(stats['files_modified'] for stats in report['developers'].values())
+        self.assertLess(saved_total, files_sum)
+        
+        # Изменение весов не меняет количество файлов команды
+        actual = rerank_report(report_file, reranked_file, custom_weights={'lines': 0.6})
+        self.assertEqual(actual['team_stats']['total_files_modified'], saved_total)
+        self.assertNotIn('total_files_modified_upper_bound', actual['team_stats'])
+        
+        # После исключения разработчика известна только верхняя оценка
+        actual = rerank_report(reranked_file, reranked_file, excluded_developers=['dev0@example.com'])
+        self.assertIsNone(actual['team_stats']['total_files_modified'])
+        self.assertEqual(actual['team_stats']['total_files_modified_upper_bound'],
+                         files_sum - report['developers']['dev0@example.com']['files_modified'])
+        
+        # Повторный пересчет без новых исключений сохраняет верхнюю оценку
+        actual = rerank_report(reranked_file, reranked_file, custom_weights={'lines': 0.3})
+        self.assertIsNone(actual['team_stats']['total_files_modified'])
+        self.assertEqual(actual['team_stats']['total_files_modified_upper_bound'],
+                         files_sum - report['developers']['dev0@example.com']['files_modified'])
+
+    def test_compact_collection_spills_diffs_to_store(self):
+        original = (config.COMPACT_COLLECTION, config.DIFF_STORE_ENABLED, config.DIFF_STORE_PATH)
+        try:
+            expected = GitDataCollector(self.git_repo_path).collect_data()
+            
+            config.COMPACT_COLLECTION = True
+            config.DIFF_STORE_ENABLED = True
+            config.DIFF_STORE_PATH = os.path.join(self.temp_dir, 'diffs')
+            collector = GitDataCollector(self.git_repo_path)
+            actual = collector.collect_data()
+            
+            for commit_hash, changes in expected['file_changes'].items():
+                self.assertNotIn('raw_output', actual['commit_details'][commit_hash])
+                self.assertEqual(actual['commit_details'][commit_hash]['stats'],
+                                 expected['commit_details'][commit_hash]['stats'])
+                for expected_change, actual_change in zip(changes, actual['file_changes'][commit_hash]):
+                    self.assertNotIn('diff', actual_change)
+                    self.assertEqual(actual_change['is_substantial'], expected_change['is_substantial'])
+                    # Текст diff загружается с диска по хэшу
+                    self.assertEqual(collector.load_diff(actual_change), expected_change['diff'])
+        finally:
+            config.COMPACT_COLLECTION, config.DIFF_STORE_ENABLED, config.DIFF_STORE_PATH = original
+
+    def test_progress_events_are_throttled(self):
+        for i in range(5):
+            self._run_git_command(['git', 'commit', '--allow-empty', '-m', f'Empty commit {i}'])
+        
+        events = []
+        progress = ProgressReporter(interval=3600)
+        progress.subscribe(events.append)
+        
+        original = config.COLLECTION_MODE
+        try:
+            config.COLLECTION_MODE = 'streaming'
+            data = GitDataCollector(self.git_repo_path, progress=progress).collect_data()
+        finally:
+            config.COLLECTION_MODE = original
+        
+        # Только начало и завершение этапа, без события на каждый коммит
+        self.assertEqual([(event.done, event.finished) for event in events],
+                         [(0, False), (len(data['commits']), True)])
+        self.assertEqual(events[-1].total, len(data['commits']))
+        
+        # Ограничение по количеству единиц
+        events = []
+        progress = ProgressReporter(interval=3600, every=2)
+        progress.subscribe(events.append)
+        progress.start('Этап', 5)
+        for _ in range(5):
+            progress.advance()
+        progress.finish()
+        self.assertEqual([event.done for event in events], [0, 2, 4, 5])
+
+    def test_batched_collection_reports_overall_progress(self):
+        for i in range(4):
+            self._run_git_command(['git', 'commit', '--allow-empty', '-m', f'Empty commit {i}'])
+        
+        events = []
+        progress = ProgressReporter(interval=0)
+        progress.subscribe(events.append)
+        
+        original = config.COLLECTION_MODE
+        try:
+            config.COLLECTION_MODE = 'per_commit'
+            records = list(GitDataCollector(self.git_repo_path, progress=progress).iter_records(batch_size=2))
+        finally:
+            config.COLLECTION_MODE = original
+        
+        # Один этап на всю историю: блоки не начинают этап заново
+        total = len(records)
+        self.assertEqual({(event.stage, event.total) for event in events}, {('Сбор данных', total)})
+        self.assertEqual([event.done for event in events], sorted(event.done for event in events))
+        self.assertEqual((events[-1].done, events[-1].finished), (total, True))
+
+    def test_profiler_records_stages_and_trace(self):
+        trace_path = os.path.join(self.temp_dir, 'trace.json')
+        try:
+            profiler.enable(track_memory=True)
+            with profiler.stage('collect_data'):
+                data = GitDataCollector(self.git_repo_path, progress=ProgressReporter()).collect_data()
+            with profiler.stage('analyze'):
+                DevActivityAnalyzer(data).analyze()
+            profiler.disable()
+            profiler.write_trace(trace_path)
+        finally:
+            profiler.disable()
+        
+        summary = profiler.summary()
+        stages = {record['name']: record for record in summary['stages']}
+        self.assertIn('collect_data', stages)
+        self.assertIn('finalize_stats', stages)
+        # Вложенный этап учитывается в пике памяти внешнего
+        self.assertEqual(stages['finalize_stats']['depth'], 1)
+        self.assertGreaterEqual(stages['analyze']['peak_memory_bytes'], stages['finalize_stats']['peak_memory_bytes'])
+        self.assertGreater(summary['counters']['subprocess_spawns'], 0)
+        
+        with open(trace_path, encoding='utf-8') as f:
+            events = json.load(f)['traceEvents']
+        self.assertIn('collect_data', [event['name'] for event in events if event['ph'] == 'X'])
+        self.assertIn('subprocess_spawns', [event['name'] for event in events if event['ph'] == 'C'])
+
+    def test_numstat_fast_path_matches_full_diff(self):
+        with open(os.path.join(self.git_repo_path, 'code.py'), 'w') as f:
+            f.write('\n'.join(f'def func_{i}():\n    return {i}' for i in range(6)) + '\n')
+        with open(os.path.join(self.git_repo_path, 'image.bin'), 'wb') as f:
+            f.write(b'\0\1\2\3')
+        self._run_git_command(['git', 'add', '.'])
+        self._run_git_command(['git', 'commit', '-m', 'feat: add code'])
+        
+        # Изменения только в отступах и небольшая правка
+        with open(os.path.join(self.git_repo_path, 'code.py'), 'w') as f:
+            f.write('\n'.join(f'def func_{i}():\n        return {i}' for i in range(6)) + '\n')
+        with open(os.path.join(self.git_repo_path, 'test_file.txt'), 'a') as f:
+            f.write('one more line\n')
+        self._run_git_command(['git', 'commit', '-am', 'Reindent code'])
+        
+        original = (config.COLLECTION_MODE, config.NUMSTAT_FAST_PATH, config.ADVANCED_CHANGE_ANALYSIS)
+        try:
+            config.COLLECTION_MODE = 'streaming'
+            for advanced in (True, False):
+                config.ADVANCED_CHANGE_ANALYSIS = advanced
+                config.NUMSTAT_FAST_PATH = False
+                expected = GitDataCollector(self.git_repo_path).collect_data()
+                config.NUMSTAT_FAST_PATH = True
+                actual = GitDataCollector(self.git_repo_path).collect_data()
+                
+                self.assertEqual(actual['commits'], expected['commits'])
+                reindent_hash = actual['commits'][0]['hash']
+                for commit_hash, changes in expected['file_changes'].items():
+                    self.assertEqual(actual['commit_details'][commit_hash]['stats'],
+                                     expected['commit_details'][commit_hash]['stats'])
+                    if commit_hash == reindent_hash:
+                        continue
+                    self.assertEqual(
+                        [(c['file_path'], c['is_substantial']) for c in actual['file_changes'][commit_hash]],
+                        [(c['file_path'], c['is_substantial']) for c in changes]
+                    )
+                
+                # git -w распознает изменение только в отступах (построчный разбор diff
+                # учитывает строки заголовка +++/--- как существенные)
+                self.assertEqual(
+                    [(c['file_path'], c['is_substantial']) for c in actual['file_changes'][reindent_hash]],
+                    [('code.py', False), ('test_file.txt', False)]
+                )
+        finally:
+            config.COLLECTION_MODE, config.NUMSTAT_FAST_PATH, config.ADVANCED_CHANGE_ANALYSIS = original
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+import unittest
+import os
+import tempfile
+import subprocess
+import sys
+import shutil
+
+# Добавляем родительскую директорию в путь для импорта модулей
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from git_objects import CatFileReader, blob_diff
+from git_native import NativeObjectStore
+from git_collector import GitDataCollector
+import config
+
+class TestCatFileReader(unittest.TestCase):
+
+    def setUp(self):
+        # Создаем временный репозиторий с двумя коммитами
+        self.temp_dir = tempfile.mkdtemp()
+        self.git_repo_path = os.path.join(self.temp_dir, 'test_repo')
+        os.makedirs(self.git_repo_path)
+
+        self._run_git_command(['git', 'init'])
+        self._run_git_command(['git', 'config', 'user.email', 'test@example.com'])
+        self._run_git_command(['git', 'config', 'user.name', 'Test User'])
+
+        self._write_file('module.py', 'a = 1\nb = 2\n')
+        self._run_git_command(['git', 'add', '.'])
+        self._run_git_command(['git', 'commit', '-m', 'Initial commit'])
+
+        self._write_file('module.py', 'a = 1\nb = 3\nc = 4\n')
+        self._run_git_command(['git', 'commit', '-am', 'Change module'])
+
+        self.reader = CatFileReader(self.git_repo_path)
+
+    def tearDown(self):
+        self.reader.close()
+        shutil.rmtree(self.temp_dir)
+
+    def _run_git_command(self, command):
+        subprocess.run(command, cwd=self.git_repo_path, check=True, capture_output=True)
+
+    def _write_file(self, name, content):
+        with open(os.path.join(self.git_repo_path, name), 'w') as f:
+            f.write(content)
+
+    def test_read_objects_pipelined(self):
+        old_blob, new_blob, missing = self.reader.read_objects(
+            ['HEAD^:module.py', 'HEAD:module.py', 'HEAD:absent.py']
+        )
+
+        self.assertEqual(old_blob.type, 'blob')
+        self.assertEqual(old_blob.data, b'a = 1\nb = 2\n')
+        self.assertEqual(new_blob.data, b'a = 1\nb = 3\nc = 4\n')
+        self.assertIsNone(missing)
+
+        # Процесс остается активным между запросами
+        commit = self.reader.read_object('HEAD')
+        self.assertEqual(commit.type, 'commit')
+        self.assertIn(b'Change module', commit.data)
+
+    def test_missing_path_with_space(self):
+        self._write_file('my file.py', 'x = 1\n')
+        self._run_git_command(['git', 'add', '.'])
+        self._run_git_command(['git', 'commit', '-m', 'Add file with space'])
+
+        # Для добавленного файла версии в родительском коммите нет
+        missing, added = self.reader.read_objects(['HEAD^:my file.py', 'HEAD:my file.py'])
+        self.assertIsNone(missing)
+        self.assertEqual(added.data, b'x = 1\n')
+        self.assertIsNone(self.reader.object_info('HEAD^:my file.py'))
+        self.assertEqual(self.reader.object_info('HEAD:my file.py').size, len(b'x = 1\n'))
+
+    def test_object_info(self):
+        info = self.reader.object_info('HEAD:module.py')
+        self.assertEqual(info.type, 'blob')
+        self.assertEqual(info.size, len(b'a = 1\nb = 3\nc = 4\n'))
+        self.assertIsNone(self.reader.object_info('HEAD:absent.py'))
+
+    def test_blob_diff(self):
+        diff = blob_diff(b'a = 1\nb = 2\n', b'a = 1\nb = 3\nc = 4\n', 'module.py')
+        lines = diff.split('\n')
+
+        self.assertEqual(lines[0], 'diff --git a/module.py b/module.py')
+        self.assertEqual(sum(1 for line in lines if line.startswith('+') and not line.startswith('+++')), 2)
+        self.assertEqual(sum(1 for line in lines if line.startswith('-') and not line.startswith('---')), 1)
+
+        # Строки разделяются только символом '\n', как в git
+        diff = blob_diff(b'x\n', 'a\x0cb\u2028c\x85d\n'.encode('utf-8'), 'page.txt')
+        added = [line for line in diff.split('\n') if line.startswith('+') and not line.startswith('+++')]
+        self.assertEqual(added, ['+a\x0cb\u2028c\x85d'])
+
+        # Бинарное содержимое не раскрывается построчно
+        self.assertIn('Binary files', blob_diff(None, b'\0\1\2', 'image.bin'))
+
+    def test_native_store_matches_cat_file(self):
+        # Упаковываем историю в pack-файл с delta-объектами и добавляем loose-объект
+        for i in range(5):
+            self._write_file('module.py', ''.join(f'line {j}\n' for j in range(40 + i)))
+            self._run_git_command(['git', 'commit', '-am', f'Grow module {i}'])
+        self._run_git_command(['git', 'repack', '-adf', '--depth=50'])
+        self._write_file('notes.md', 'loose object\n')
+        self._run_git_command(['git', 'add', 'notes.md'])
+        self._run_git_command(['git', 'commit', '-m', 'Add notes'])
+
+        result = subprocess.run(['git', 'rev-list', '--objects', '--all'], cwd=self.git_repo_path,
+                                check=True, capture_output=True, text=True)
+        revs = [line.split(' ')[0] for line in result.stdout.splitlines() if line]
+        revs += ['HEAD', 'HEAD~2', 'HEAD^:module.py', 'HEAD:absent.py']
+
+        with NativeObjectStore(self.git_repo_path) as store:
+            self.assertEqual(store.read_objects(revs), self.reader.read_objects(revs))
+
+            history = [commit.subject for commit in store.iter_history()]
+            self.assertEqual(history[0], 'Add notes')
+            self.assertEqual(history[-1], 'Initial commit')
+
+            changes = store.diff_trees(store.read_commit(store.resolve('HEAD^')).tree,
+                                       store.read_commit(store.resolve('HEAD')).tree)
+            self.assertEqual([(change.status, change.path) for change in changes], [('A', 'notes.md')])
+
+    def test_native_collection_matches_streaming(self):
+        # Пути вне ASCII git записывает в кавычках с восьмеричными кодами байтов
+        self._write_file('café two.py', 'x = 1\n')
+        self._run_git_command(['git', 'add', '.'])
+        self._run_git_command(['git', 'commit', '-m', 'Add file with non-ASCII name'])
+
+        original_mode = config.COLLECTION_MODE
+        try:
+            config.COLLECTION_MODE = 'streaming'
+            expected = GitDataCollector(self.git_repo_path).collect_data()
+            config.COLLECTION_MODE = 'native'
+            actual = GitDataCollector(self.git_repo_path).collect_data()
+        finally:
+            config.COLLECTION_MODE = original_mode
+
+        self.assertEqual(actual['commits'], expected['commits'])
+        self.assertEqual(actual['developer_info'], expected['developer_info'])
+        for commit_hash, changes in expected['file_changes'].items():
+            self.assertEqual(
+                [(c['change_type'], c['file_path'], c['is_substantial']) for c in actual['file_changes'][commit_hash]],
+                [(c['change_type'], c['file_path'], c['is_substantial']) for c in changes]
+            )
+            self.assertEqual(actual['commit_details'][commit_hash]['stats'],
+                             expected['commit_details'][commit_hash]['stats'])
+
+    def test_native_date_range_matches_streaming(self):
+        # Коммиты в первую и последнюю секунды суток на границах диапазона
+        for i, date in enumerate(['2022-01-04T12:00:00', '2022-01-05T00:00:01', '2022-01-05T23:59:59',
+                                  '2022-01-12T12:00:00', '2022-01-20T00:00:01', '2022-01-20T23:59:59',
+                                  '2022-01-21T12:00:00']):
+            self._write_file('module.py', f'value = {i}\n')
+            env = dict(os.environ, GIT_AUTHOR_DATE=date, GIT_COMMITTER_DATE=date)
+            subprocess.run(['git', 'commit', '-am', f'Commit at {date}'], cwd=self.git_repo_path,
+                           env=env, check=True, capture_output=True)
+
+        original = (config.COLLECTION_MODE, config.START_DATE, config.END_DATE)
+        try:
+            config.START_DATE, config.END_DATE = '2022-01-05', '2022-01-20'
+            config.COLLECTION_MODE = 'streaming'
+            expected = GitDataCollector(self.git_repo_path).collect_data()
+            config.COLLECTION_MODE = 'native'
+            actual = GitDataCollector(self.git_repo_path).collect_data()
+        finally:
+            config.COLLECTION_MODE, config.START_DATE, config.END_DATE = original
+
+        self.assertEqual([commit['hash'] for commit in actual['commits']],
+                         [commit['hash'] for commit in expected['commits']])
+        self.assertIn('Commit at 2022-01-12T12:00:00', [commit['subject'] for commit in actual['commits']])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+import unittest
+import os
+import sys
+
+# Добавляем родительскую директорию в путь для импорта модулей
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from path_classifier import classify_path, extension_category
+from change_analyzer import ChangeAnalyzer
+
+class TestPathClassifier(unittest.TestCase):
+
+    def test_path_attributes(self):
+        info = classify_path(os.path.join('src', 'Tests', 'Test_Parser.PY'))
+        self.assertEqual(info.name, 'Test_Parser.PY')
+        self.assertEqual(info.ext, '.py')
+        self.assertEqual(info.test_marker, 'test_')
+        self.assertTrue(info.in_test_dir)
+        self.assertEqual(info.category, 'test')
+        self.assertEqual(info.file_category, 'code')
+        # Повторная классификация берется из кэша
+        self.assertIs(classify_path(info.path), info)
+
+    def test_test_directory_is_whole_path_component(self):
+        for path, expected in [('tests/x.py', True), ('a/testing/b.c', True), ('specs', True),
+                               ('latest/x.py', False), ('tests_old/x.py', False), ('src/test.py', False)]:
+            self.assertEqual(classify_path(path.replace('/', os.path.sep)).in_test_dir, expected, path)
+
+    def test_categories_and_weights(self):
+        self.assertEqual(classify_path('docs/guide.md').category, 'doc')
+        self.assertEqual(classify_path('settings/app.yml').category, 'config')
+        self.assertEqual(classify_path('static/logo.png').category, 'asset')
+        self.assertIsNone(extension_category(''))
+        self.assertEqual(extension_category('.scss'), 'style')
+
+        analyzer = ChangeAnalyzer()
+        self.assertEqual(analyzer._get_file_weight('src/app.py'), 1.0)
+        self.assertEqual(analyzer._get_file_weight('src/app_test.go'), 0.7)
+        self.assertEqual(analyzer._get_file_weight(os.path.join('spec', 'README.md')), 0.5)
+
+if __name__ == '__main__':
+    unittest.main()
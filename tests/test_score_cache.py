@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+
+# Добавляем родительскую директорию в путь для импорта модулей
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from score_cache import DiffScore, DiffScoreCache, diff_fingerprint
+from change_analyzer import ChangeAnalyzer
+from git_collector import GitDataCollector
+import config
+
+DIFF = ('diff --git a/app.py b/app.py\n'
+        'index 1111111..2222222 100644\n'
+        '--- a/app.py\n'
+        '+++ b/app.py\n'
+        '@@ -10,3 +10,4 @@ def main():\n'
+        '     value = load()\n'
+        '-    return value\n'
+        '+    if value.ready():\n'
+        '+        return value.result(1)\n')
+
+class TestScoreCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_fingerprint_ignores_line_numbers_and_blob_ids(self):
+        # То же изменение после cherry-pick: другие хэши blob-объектов, пути и номера строк
+        picked = (DIFF.replace('1111111..2222222', '3333333..4444444')
+                  .replace('app.py', 'release/app.py')
+                  .replace('@@ -10,3 +10,4 @@ def main():', '@@ -52,3 +57,4 @@'))
+        self.assertEqual(diff_fingerprint(picked), diff_fingerprint(DIFF))
+        self.assertNotEqual(diff_fingerprint(DIFF.replace('result(1)', 'result(2)')), diff_fingerprint(DIFF))
+        # Наличие заголовков файла влияет на проверку изменений только в пробелах
+        self.assertNotEqual(diff_fingerprint(DIFF[DIFF.index('@@'):]), diff_fingerprint(DIFF))
+
+    def test_analyzer_reuses_cached_score(self):
+        analyzer = ChangeAnalyzer()
+        analyzer.score_cache = DiffScoreCache(16)
+        verdict = analyzer.is_substantial_change(DIFF, 'app.py', 'fix: ready check')
+        self.assertEqual(len(analyzer.score_cache), 1)
+
+        # Оценка совпадает с расчетом без кэша
+        score = analyzer.score_cache.get(diff_fingerprint(DIFF))
+        self.assertEqual(score.total, 3)
+        self.assertEqual(score.complexity, analyzer._analyze_complexity(DIFF))
+        uncached = ChangeAnalyzer()
+        uncached.score_cache = None
+        self.assertEqual(uncached.is_substantial_change(DIFF, 'app.py', 'fix: ready check'), verdict)
+
+        # Повторное изменение с другими номерами строк берется из кэша
+        analyzer.is_substantial_change(DIFF.replace('-10,3 +10,4', '-70,3 +75,4'), 'app.py')
+        self.assertEqual(len(analyzer.score_cache), 1)
+
+    def test_scores_persist_between_runs(self):
+        db_path = os.path.join(self.temp_dir, 'scores.sqlite')
+        fingerprint = diff_fingerprint(DIFF)
+
+        cache = DiffScoreCache(16, db_path=db_path, settings='a')
+        cache.put(fingerprint, DiffScore(3, False, 0.75))
+        cache.close()
+
+        reopened = DiffScoreCache(16, db_path=db_path, settings='a')
+        score = reopened.get(fingerprint)
+        self.assertEqual((score.total, score.only_whitespace, score.complexity), (3, False, 0.75))
+        reopened.close()
+
+        # Оценки, полученные с другими настройками, не используются
+        other = DiffScoreCache(16, db_path=db_path, settings='b')
+        self.assertIsNone(other.get(fingerprint))
+        other.close()
+
+    def test_cache_is_disabled_by_default(self):
+        original = (config.DIFF_SCORE_CACHE_SIZE, config.SCORE_CACHE_ENABLED, config.SCORE_CACHE_PATH)
+        try:
+            self.assertIsNone(ChangeAnalyzer().score_cache)
+
+            # Размер кэша в памяти включает кэш в пределах запуска
+            config.DIFF_SCORE_CACHE_SIZE = 16
+            self.assertEqual(ChangeAnalyzer().score_cache.max_entries, 16)
+
+            # Сохранение между запусками включает кэш в памяти и при нулевом размере
+            config.DIFF_SCORE_CACHE_SIZE = 0
+            config.SCORE_CACHE_ENABLED = True
+            config.SCORE_CACHE_PATH = os.path.join(self.temp_dir, 'scores.sqlite')
+            collector = GitDataCollector(self.temp_dir)
+            self.assertEqual(collector.change_analyzer.score_cache.max_entries, DiffScoreCache.DEFAULT_MAX_ENTRIES)
+            collector.change_analyzer.score_cache.close()
+        finally:
+            config.DIFF_SCORE_CACHE_SIZE, config.SCORE_CACHE_ENABLED, config.SCORE_CACHE_PATH = original
+
+if __name__ == '__main__':
+    unittest.main()
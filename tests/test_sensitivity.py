@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+import unittest
+import os
+import sys
+import io
+import contextlib
+
+# Добавляем родительскую директорию в путь для импорта модулей
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import sensitivity
+from sensitivity import analyze_sensitivity, sample_weight_vectors, base_weight_vector, WEIGHT_PARAMS
+from output_generator import JSONOutputGenerator
+
+class TestSensitivity(unittest.TestCase):
+
+    def setUp(self):
+        # Разработчики с разным профилем вклада
+        self.developers = {}
+        for i in range(8):
+            self.developers[f'dev{i}@example.com'] = {
+                'name': f'Dev {i}',
+                'total_commits': 10 + i * 3,
+                'substantial_commits': (i * 7) % 11 + 1,
+                'lines_added': 100 * ((i * 5) % 8 + 1),
+                'lines_removed': 30 * i,
+                'commit_impact': 50 * ((i * 3) % 8 + 1),
+                'reverts_count': i % 3,
+                'merge_count': i % 2,
+                'active_days': 5 + i,
+            }
+        self.weights = {'substantial_commits': 0.3, 'lines': 0.15, 'impact': 0.25,
+                        'substantive_ratio': 0.2, 'revert_penalty': -0.1, 'daily_activity': 0.2}
+
+    def test_baseline_ranks_match_usefulness_rating(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            rating = JSONOutputGenerator(self.developers)._calculate_usefulness_rating(self.weights)
+        result = analyze_sensitivity(self.developers, self.weights, top_n=3, samples=200, seed=7)
+
+        self.assertEqual(result['samples'], 201)
+        self.assertEqual(list(result['developers']), list(rating))
+        self.assertEqual([info['baseline_rank'] for info in result['developers'].values()], list(range(1, 9)))
+        # Каждый вектор весов дает ровно top_n лидеров
+        self.assertAlmostEqual(sum(info['top_n_rate'] for info in result['developers'].values()), 300, places=0)
+
+    def test_numpy_and_python_paths_agree(self):
+        original = sensitivity.np
+        try:
+            results = []
+            for numpy_module in {original, None}:
+                sensitivity.np = numpy_module
+                results.append(analyze_sensitivity(self.developers, self.weights, top_n=2,
+                                                   method='grid', grid_steps=3, fixed=['merge_penalty']))
+        finally:
+            sensitivity.np = original
+        self.assertEqual(results[0], results[-1])
+        self.assertEqual(results[0]['samples'], 3 ** 6 + 1)
+
+    def test_sample_weight_vectors_respect_spread_and_fixed(self):
+        base = base_weight_vector(self.weights)
+        vectors = sample_weight_vectors(base, spread=0.2, samples=50, fixed=['impact'], seed=1)
+        self.assertEqual(vectors[0], base)
+        impact = WEIGHT_PARAMS.index('impact')
+        for vector in vectors:
+            self.assertEqual(vector[impact], base[impact])
+            for value, base_value in zip(vector, base):
+                self.assertLessEqual(abs(value - base_value), abs(base_value) * 0.2 + 1e-12)
+
+if __name__ == '__main__':
+    unittest.main()
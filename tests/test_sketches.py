@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+import unittest
+import os
+import sys
+import pickle
+from collections import Counter
+
+# Добавляем родительскую директорию в путь для импорта модулей
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sketches import HyperLogLog, HeavyHitters
+
+class TestSketches(unittest.TestCase):
+
+    def test_hyperloglog_estimate_within_error(self):
+        sketch = HyperLogLog(error=0.01)
+        for i in range(50000):
+            sketch.add(f'src/module_{i}/file.py')
+            sketch.add(f'src/module_{i}/file.py')  # Повторы не учитываются
+        self.assertLess(abs(len(sketch) - 50000) / 50000, 3 * sketch.error)
+
+        # Небольшие множества считаются точно
+        small = HyperLogLog(error=0.01)
+        small.update(['a.py', 'b.py', 'a.py', 'c.md'])
+        self.assertEqual(len(small), 3)
+
+    def test_hyperloglog_merge_equals_union(self):
+        left, right, union = HyperLogLog(0.02), HyperLogLog(0.02), HyperLogLog(0.02)
+        for i in range(3000):
+            path = f'path/{i}'
+            (left if i % 2 else right).add(path)
+            if i < 2000:
+                left.add(path)
+            union.add(path)
+        merged = left.copy()
+        merged.update(right)
+        self.assertEqual(len(merged), len(union))
+        self.assertEqual(len(pickle.loads(pickle.dumps(merged))), len(merged))
+        with self.assertRaises(ValueError):
+            merged.update(HyperLogLog(0.1))
+
+    def test_heavy_hitters_error_bound(self):
+        stream = []
+        for i in range(2000):
+            stream.append(f'rare_{i}')
+            if i % 4 == 0:
+                stream.append('hot.py')
+            if i % 10 == 0:
+                stream.append('warm.py')
+        exact = Counter(stream)
+
+        # Поток делится на две части, скетчи которых объединяются
+        first, second = HeavyHitters(error=0.01), HeavyHitters(error=0.01)
+        middle = len(stream) // 2
+        for item in stream[:middle]:
+            first.add(item)
+        for item in stream[middle:]:
+            second.add(item)
+        first.merge(second)
+
+        self.assertEqual(first.total, len(stream))
+        self.assertLessEqual(first.max_error, len(stream) / (first.capacity + 1))
+        self.assertLessEqual(len(first), 2 * first.capacity)
+        self.assertEqual([item for item, _ in first.most_common(2)], ['hot.py', 'warm.py'])
+        for item, count in first.items():
+            self.assertLessEqual(count, exact[item])
+            self.assertGreaterEqual(count, exact[item] - first.max_error)
+
+if __name__ == '__main__':
+    unittest.main()
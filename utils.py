@@ -1,7 +1,21 @@
-import os
 import re
 import subprocess
-from datetime import datetime, timedelta
+import time
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from records import DeveloperInfo
+from interning import developer_id
+from path_classifier import classify_path
+from commit_classifier import default_classifier
+
+# Формат дат в результатах анализа
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Часовые пояса меняют смещение на границах 15-минутных интервалов UTC,
+# поэтому смещение достаточно вычислить один раз для каждого интервала
+OFFSET_BUCKET_SECONDS = 900
+
+EPOCH_DATE = date(1970, 1, 1)
 
 def is_binary_file(file_path):
     """Проверка, является ли файл бинарным."""
@@ -16,8 +30,7 @@ def is_binary_file(file_path):
         '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
     }
     
-    ext = os.path.splitext(file_path)[1].lower()
-    return ext in binary_extensions
+    return classify_path(file_path).ext in binary_extensions
 
 def normalize_author_name(name, email):
     """
@@ -26,16 +39,80 @@ def normalize_author_name(name, email):
     """
     return email.lower()  # Используем email как уникальный идентификатор
 
+@lru_cache(maxsize=65536)
+def _bucket_utc_offset(bucket):
+    return time.localtime(bucket * OFFSET_BUCKET_SECONDS).tm_gmtoff
+
+def utc_offset(timestamp):
+    """Смещение местного времени от UTC (в секундах) в момент timestamp."""
+    return _bucket_utc_offset(timestamp // OFFSET_BUCKET_SECONDS)
+
+def local_seconds(timestamp):
+    """
+    Переводит unix timestamp в секунды местного времени от начала эпохи.
+    
+    Разность двух таких значений совпадает с разностью соответствующих
+    наивных datetime.fromtimestamp().
+    """
+    return timestamp + utc_offset(timestamp)
+
+@lru_cache(maxsize=65536)
+def month_of_day(day):
+    """Ключ месяца (год * 12 + (месяц - 1)) для номера дня местного времени от начала эпохи."""
+    day_date = EPOCH_DATE + timedelta(days=day)
+    return day_date.year * 12 + day_date.month - 1
+
+def local_time_keys(timestamp):
+    """
+    Вычисляет ключи группировки коммита по местному времени.
+    
+    Returns:
+        tuple: (день, месяц, час), где день - номер дня от начала эпохи,
+               месяц - год * 12 + (месяц - 1); строки формируются только
+               при выводе (format_month_key)
+    """
+    seconds = local_seconds(timestamp)
+    day = seconds // 86400
+    return day, month_of_day(day), seconds % 86400 // 3600
+
+def format_month_key(month):
+    """Форматирует ключ месяца из local_time_keys в строку 'YYYY-MM'."""
+    year, month_index = divmod(month, 12)
+    return f'{year:04d}-{month_index + 1:02d}'
+
+def format_timestamp(timestamp):
+    """Форматирует unix timestamp в строку местного времени (DATE_FORMAT)."""
+    return datetime.fromtimestamp(timestamp).strftime(DATE_FORMAT)
+
+def update_developer_info(developer_info, commit):
+    """
+    Обновляет сведения о разработчике (имя, даты первого и последнего коммита)
+    по очередному коммиту.
+
+    Args:
+        developer_info: словарь email -> сведения о разработчике (изменяется на месте)
+        commit: запись коммита
+    """
+    email = developer_id(commit['author_email'])
+
+    if email not in developer_info:
+        developer_info[email] = DeveloperInfo(commit['author_name'], email, commit['timestamp'], commit['timestamp'])
+        return
+
+    # Обновляем даты первого и последнего коммита
+    info = developer_info[email]
+    if commit['timestamp'] < info['first_commit_timestamp']:
+        info['first_commit_timestamp'] = commit['timestamp']
+
+    if commit['timestamp'] > info['last_commit_timestamp']:
+        info['last_commit_timestamp'] = commit['timestamp']
+
 def detect_squash_commit(commit_message, stats):
     """
     Определяет, является ли коммит squash-коммитом на основе темы и статистики.
     """
     # Проверяем ключевые слова в сообщении коммита
-    message_lower = commit_message.lower()
-    if ('squash' in message_lower or 
-        'merge' in message_lower or 
-        'объединены изменения' in message_lower or
-        'combine' in message_lower):
+    if default_classifier().classify(commit_message).is_squash:
         return True
         
     # Проверяем статистику коммита (большие коммиты с множеством изменений)
@@ -49,33 +126,7 @@ def categorize_changes(file_path):
     Категоризирует файл на основе его расширения.
     Возвращает строку: 'code', 'test', 'doc', 'config', 'asset', 'other'
     """
-    path_lower = file_path.lower()
-    ext = os.path.splitext(file_path)[1].lower()
-    
-    # Исходный код
-    if ext in {'.py', '.js', '.jsx', '.ts', '.tsx', '.java', '.c', '.cpp', '.h', '.cs', '.go', '.rb', '.php'}:
-        if 'test' in path_lower or 'spec' in path_lower:
-            return 'test'
-        return 'code'
-        
-    # Тесты
-    if 'test' in path_lower or 'spec' in path_lower:
-        return 'test'
-        
-    # Документация
-    if ext in {'.md', '.rst', '.txt', '.pdf', '.doc', '.docx'} or 'readme' in path_lower or 'doc' in path_lower:
-        return 'doc'
-        
-    # Конфигурация
-    if ext in {'.json', '.yaml', '.yml', '.toml', '.ini', '.config', '.conf', '.xml'} or 'config' in path_lower:
-        return 'config'
-        
-    # Ресурсы
-    if ext in {'.png', '.jpg', '.jpeg', '.gif', '.svg', '.ico', '.css', '.scss', '.sass', '.less'}:
-        return 'asset'
-        
-    # Другое
-    return 'other'
+    return classify_path(file_path).category
 
 def get_developer_active_periods(repo_path, author_email):
     """